@@ -1,10 +1,21 @@
-import bpy
+try:
+    import bpy
+except ImportError:
+    # Plain Python process: only the Blender-free modes (e.g. --recolor) work
+    bpy = None
 import os
+import ast
 import glob
 import math
 import sys
+import time
+import json
+import csv
+import hashlib
+import shutil
+import re
+import contextlib
 
-import matplotlib.pyplot as plt
 import numpy as np
 
 import argparse
@@ -185,7 +196,7 @@ def get_custom_colormap(colormap_name):
 
         
 parser = argparse.ArgumentParser()
-parser.add_argument("input_tiff")
+parser.add_argument("input_tiff", help="input TIFF, NetCDF/Zarr, .npz point data (lat/lon/value), .expr expression, or a .json/.csv job list for batch mode")
 parser.add_argument("output_dir")
 parser.add_argument("--resource")
 parser.add_argument("--locations", default="Europe", help="comma separated list of locations to plot")
@@ -197,6 +208,8 @@ parser.add_argument("--vmax", default=10, type=float)
 parser.add_argument("--do-overlay", action="store_true")
 parser.add_argument("--overlay-theme", choices=["dark", "light"], default="light")
 parser.add_argument("--overlay-opacity", default=0, type=float)
+parser.add_argument("--overlay-only", action="store_true", help="write only the overlay composites, not the plain renders")
+parser.add_argument("--postprocess-workers", type=int, default=2, help="threads compositing and encoding overlays while the next view renders, 0: inline")
 
 
 parser.add_argument("--zoomlevel", type=float, default=0)
@@ -205,13 +218,89 @@ parser.add_argument("--dof", action="store_true")
 parser.add_argument("--effects", action="store_true", help="add some special effect, like glow")
 parser.add_argument("--lowres", action="store_true")
 
+parser.add_argument("--texture-width", type=int, default=0, help="data texture width, default: derived from output size and zoom")
+parser.add_argument("--full-texture", action="store_true", help="load the full resolution TIFF instead of a downsampled texture")
+
+parser.add_argument("--cache-dir", help="directory of the disk caches, default: ~/.cache/data_on_the_sphere")
+parser.add_argument("--texture-cache", action="store_true", help="keep downsampled texture levels of the inputs in the disk cache (pays off for repeated renders)")
+parser.add_argument("--cache-size", type=float, default=10, help="texture pyramid cache size limit in GB")
+parser.add_argument("--cache-dtype", choices=["float32", "float16"], default="float32", help="storage type of cached texture levels")
+parser.add_argument("--no-cache", action="store_true", help="disable the disk caches")
+
+parser.add_argument("--sphere-mesh", choices=["uv", "icosphere", "quadsphere", "cap"], default="uv",
+                    help="sphere geometry, icosphere and quadsphere are tessellated for the output size and zoom, cap only densely where each camera looks")
+parser.add_argument("--auto-border", action="store_true", help="path trace only the projected sphere bounds instead of the full frame")
+parser.add_argument("--nc-variable", help="variable of a NetCDF/Zarr input, default: --variable if present, else the only lat/lon variable")
+parser.add_argument("--time-index", type=int, default=0, help="time step of a NetCDF/Zarr input")
+parser.add_argument("--level", type=float, help="vertical level of a NetCDF/Zarr input (nearest coordinate value), default: the first")
+parser.add_argument("--point-method", choices=["nearest", "idw"], default="nearest", help="regridding of .npz point data (lat/lon/value) to the texture grid")
+parser.add_argument("--point-neighbours", type=int, default=4, help="neighbours of the inverse distance weighting")
+parser.add_argument("--stats", action="store_true", help="print area-weighted statistics of the TIFF, globally and for the visible cap of each location")
+parser.add_argument("--auto-range", nargs="?", const="2,98", default=None, metavar="LOW,HIGH",
+                    help="set vmin/vmax from area-weighted percentiles of the data (default 2,98), symmetric for *_dif colormaps")
+parser.add_argument("--incremental", action="store_true", help="skip views whose input, settings and script are unchanged since the last run")
+parser.add_argument("--texture-encoding", choices=["float32", "float16", "uint16"], default="float32",
+                    help="store the data texture as single channel half float or scaled uint16, decoded in the material")
+parser.add_argument("--viewport-crops", action="store_true", help="per camera high resolution texture of the visible window plus a low resolution global texture")
+
+parser.add_argument("--prebaked-colors", action="store_true", help="apply value range and colormap in NumPy and feed an RGB texture to the shader")
+parser.add_argument("--lut-size", type=int, default=1024, help="entries of the colormap lookup tables (256-4096)")
+parser.add_argument("--lut-texture", action="store_true", help="color through a 1D LUT image texture instead of the 32 stop ColorRamp")
+parser.add_argument("--build-luts", action="store_true", help="write the LUTs of all colormaps to the cache and exit (needs matplotlib)")
+parser.add_argument("--benchmark", choices=["prebaked", "border", "mesh"], help="compare render time and memory of render variants")
+
+parser.add_argument("--animate", action="store_true", help="render every band of a multi-band TIFF, or every TIFF of a directory, as a numbered frame sequence")
+parser.add_argument("--workers", type=int, default=0, help="number of parallel Blender worker processes (render farm)")
+parser.add_argument("--threads-per-worker", type=int, default=0, help="render threads per Blender process, default: all cores / workers")
+parser.add_argument("--retries", type=int, default=2, help="how often the render farm retries a failed view")
+parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+parser.add_argument("--serve", metavar="SOCKET", help="keep the scene warm and render jobs received on this Unix socket (render daemon)")
+parser.add_argument("--submit", metavar="SOCKET", help="send the TIFF or job list to a render daemon and print output paths and timings")
+
+parser.add_argument("--data-pass", action="store_true", help="render raw data value and lighting passes (.npz) for offline recoloring instead of PNGs")
+parser.add_argument("--preview", nargs="?", const="perspective", choices=["perspective", "orthographic"],
+                    help="fast NumPy preview without Blender (default camera: perspective)")
+parser.add_argument("--preview-size", type=int, default=400, help="preview resolution in pixels")
+parser.add_argument("--flatmap", choices=["robinson", "mollweide", "equalearth", "orthographic"],
+                    help="reproject the TIFF to a flat map with NumPy, without Blender (orthographic: one map per location)")
+parser.add_argument("--flatmap-width", type=int, default=0, help="flat map width in pixels, default: the Robinson render width")
+parser.add_argument("--resample", choices=["nearest", "bilinear"], default="bilinear", help="flat map resampling")
+parser.add_argument("--recolor", nargs="?", const="", default=None,
+                    help="recolor data passes without Blender, comma separated variable:vmin:vmax list (default: --variable/--vmin/--vmax)")
+
 if "--" in sys.argv:
     args = parser.parse_args(sys.argv[sys.argv.index("--") + 1:])
 else:
     args = parser.parse_args()
 
+def parse_locations(locations):
+    """Turn a comma separated string (or list) of locations into a list"""
+    if isinstance(locations, str):
+        return [s.strip() for s in locations.split(",") if s.strip()]
+    return [str(s).strip() for s in locations]
+
+def check_value_range(vmin, vmax):
+    """Raise ValueError for a value range the colormaps and colorbars can not normalise"""
+    if not (math.isfinite(vmin) and math.isfinite(vmax)) or vmin == vmax:
+        raise ValueError(f"Invalid value range {vmin:g} to {vmax:g}: vmin and vmax must be finite and differ")
+
+def parse_percentiles(text):
+    """Turn "LOW,HIGH" into a (low, high) percentile pair with 0 <= low < high <= 100"""
+    try:
+        low, high = (float(q) for q in text.split(","))
+    except ValueError:
+        raise ValueError(f"--auto-range takes two comma separated percentiles, not '{text}'")
+    if not 0 <= low < high <= 100:
+        raise ValueError(f"--auto-range percentiles must satisfy 0 <= low < high <= 100, not {low:g},{high:g}")
+    return low, high
+
 # parse location string into list
-args.locations = [s.strip() for s in args.locations.split(",")]
+args.locations = parse_locations(args.locations)
+try:
+    check_value_range(args.vmin, args.vmax)
+    auto_range_percentiles = parse_percentiles(args.auto_range or "2,98")
+except ValueError as e:
+    parser.error(str(e))
 
 # Map overlay theme to colors
 if args.overlay_theme == "dark":
@@ -241,7 +330,9 @@ OVERLAY_SETTINGS = {
     "colorbar_scale": 0.4,          # Scale relative to image height
     "colorbar_steps": 6,            # Number of tick marks
     "padding": 50,                  # Padding from edges
-    "background_opacity": args.overlay_opacity       # Background transparency
+    "background_opacity": args.overlay_opacity,       # Background transparency
+    "overlay_only": args.overlay_only,  # Skip the plain render PNGs when compositing in memory
+    "postprocess_workers": args.postprocess_workers  # Overlay threads running alongside the renders
 }
 
 # E) Plot Type and Styling
@@ -294,32 +385,185 @@ ROBINSON_SETTINGS = {
     "alpha_mask": "robinson_mask.tif"  # Alpha mask filename
 }
 
+# H) Data pass (render once, recolor offline)
+DATA_PASS = args.data_pass
+DATA_PASS_AOV = "data_value"
+DATA_PASS_EMISSION = 1.0    # Emission strength of the colored material (WOW: color^0.001, also ~1)
+
+# Pre-baked colors: map range and colormap applied in NumPy instead of shader nodes
+PREBAKED_COLORS = args.prebaked_colors and not DATA_PASS
+
+# Colormap LUTs
+COLORMAP_SETTINGS = {
+    "lut_size": args.lut_size,  # Entries of the linear RGBA lookup tables (256-4096)
+    "ramp_stops": 20            # Stops of matplotlib colormaps in a ColorRamp (max 32)
+}
+COLORMAP_LUTS = {}              # In-memory LUT cache by (name, size)
+LUT_TEXTURE = args.lut_texture and not PREBAKED_COLORS
+
+# I) Disk caches
+CACHE_SETTINGS = {
+    "enabled": not args.no_cache,
+    "pyramids": args.texture_cache and not args.no_cache,   # Opt-in, the first render hashes and copies the whole input
+    "dir": args.cache_dir or os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "data_on_the_sphere"),
+    "pyramid_max_bytes": int(args.cache_size * 1024 ** 3),  # LRU eviction above this size, level 0 is a full resolution copy
+    "pyramid_dtype": args.cache_dtype,                       # Storage type of the texture levels
+    "pyramid_min_width": 256                                 # Smallest pyramid level
+}
+
+# J) Flat maps (NumPy reprojection, no Blender)
+FLATMAP_SETTINGS = {
+    "projection": args.flatmap,
+    "width": args.flatmap_width or ROBINSON_SETTINGS["resolution_width"],
+    "resample": args.resample,
+    "newton_steps": 8       # Iterations of the Equal Earth inverse
+}
+
+# K) Point data input (reduced Gaussian / unstructured grids as .npz with lat, lon, value)
+POINT_DATA_EXTENSIONS = (".npz",)
+POINT_SETTINGS = {
+    "method": args.point_method,        # "nearest" or "idw" (inverse distance weighting)
+    "neighbours": args.point_neighbours,
+    "power": 2.0,                       # Inverse distance power
+    "band_rows": 256                    # Texture rows per KD-tree query, bounds the memory
+}
+
+# L) Expression inputs (derived fields computed from several TIFFs while reading)
+EXPRESSION_EXTENSIONS = (".expr",)
+EXPRESSION_FUNCTIONS = {
+    "abs": np.abs,
+    "sqrt": np.sqrt,
+    "log": np.log,
+    "exp": np.exp,
+    "minimum": np.minimum,
+    "maximum": np.maximum,
+    "mean": lambda *fields: sum(fields) / len(fields)   # Climatology of several operands
+}
+EXPRESSIONS = {}        # Parsed expression files by (path, mtime)
+
+# M) NetCDF / Zarr input (read lazily, no GeoTIFF conversion)
+DATASET_EXTENSIONS = (".nc", ".nc4", ".zarr")
+DATASET_SETTINGS = {
+    "variable": args.nc_variable,   # None: --variable if the dataset has it, else its only lat/lon variable
+    "time_index": args.time_index,  # First time step (animations render the following ones)
+    "level": args.level,            # Vertical level value (nearest), None: the first level
+    "max_open": 4                   # Datasets kept open, the least recently used is closed
+}
+DATASET_HANDLES = {}    # Open datasets by path, least recently used first
+DATASET_FIELDS = {}     # Selected variables by (path, variable, band)
+
+# N) Incremental rebuild (skip views whose outputs are up to date)
+INCREMENTAL_BUILD = args.incremental
+BUILD_MANIFEST_FILENAME = "build_manifest.json"  # Output name -> build key, in the output directory
+
+# O) Data statistics (automatic value ranges)
+STATS_SETTINGS = {
+    "percentiles": auto_range_percentiles,  # Range of --auto-range
+    "sketch_size": 2048     # Centroids of the percentile sketch, rank error about 1 / size
+}
+
+# P) Viewport crops (full detail only for the visible part of the globe)
+VIEWPORT_CROPS = args.viewport_crops and RENDER_OBJECT == "sphere" and not args.prebaked_colors
+CROP_SETTINGS = {
+    "global_width": 2048,   # Low resolution global fallback texture (limb, outside the crop)
+    "margin": 0.01,         # Extra window around the visible cap (fraction of the texture)
+    "boundary_samples": 360 # Points on the visible cap boundary used to find the window
+}
+CROP_SOURCE = {}        # Texture the crops of the last input are cut from, without the disk cache
+
+# Q) Auto border (path trace only the projected sphere bounds, output stays full size)
+AUTO_BORDER = args.auto_border
+BORDER_SETTINGS = {
+    "margin_px": 2,             # Extra pixels around the bounds (pixel filter width)
+    "displacement": 0.02,       # Radius added in WOW mode, the maximum displacement
+    "silhouette_samples": 360   # Points on the sphere silhouette that are projected
+}
+
+# R) Sphere geometry
+GEOMETRY_SETTINGS = {
+    "mesh": args.sphere_mesh,   # "uv": UV sphere + SUBSURF level 6, "icosphere"/"quadsphere": uniform, adaptive
+    "edge_px": 16,              # Target projected edge length of the smooth sphere (silhouette error << 1 px)
+    "displaced_edge_px": 6,     # Target edge length with WOW displacement, the detail the displacement can show
+    "max_ico_level": 9,         # Blender's icosphere limit (20 * 4^9 faces)
+    "max_quad_cells": 1024,     # Cells per cube face edge of the quad-sphere
+    "cap_margin_deg": 2.0,      # Dense patch beyond the visible cap (limb, defocus, displacement)
+    "coarse_edge_deg": 3.0      # Edge length of the coarse rest of the sphere (shadows, reflections)
+}
+
+# S) Texture encoding (single channel float16 or scaled uint16 instead of an RGBA float image)
+TEXTURE_ENCODING = "float32" if VIEWPORT_CROPS or PREBAKED_COLORS else args.texture_encoding
+UINT16_NAN_CODE = 0     # uint16 code of missing values, valid data uses 1-65535
+
 # ==============================================================================
 # COLORMAP LOADING SYSTEM
 # ==============================================================================
 
 
 def srgb_to_linear(srgb_value):
-    """Convert sRGB color value to linear RGB"""
-    if srgb_value <= 0.04045:
-        return srgb_value / 12.92
+    """Convert sRGB color values (scalar or array) to linear RGB"""
+    srgb_value = np.asarray(srgb_value, dtype=np.float64)
+    linear = np.where(srgb_value <= 0.04045, srgb_value / 12.92, np.power((srgb_value + 0.055) / 1.055, 2.4))
+    return float(linear) if linear.ndim == 0 else linear
+
+def compute_colormap_lut(colormap_name, size):
+    """Sample a colormap into a (size, 4) linear RGBA lookup table"""
+    samples = np.linspace(0.0, 1.0, size)
+    
+    if is_custom_colormap(colormap_name):
+        # Linear interpolation between the stops, like Blender's ColorRamp
+        colors = get_custom_colormap(colormap_name)
+        positions = np.array([pos for pos, _ in colors], dtype=np.float64)
+        stops = np.array([color for _, color in colors], dtype=np.float64)
+        lut = np.stack([np.interp(samples, positions, stops[:, c]) for c in range(4)], axis=-1)
+    elif is_matplotlib_colormap(colormap_name):
+        import matplotlib
+        lut = np.array(matplotlib.colormaps[colormap_name](samples), dtype=np.float64)
+        lut[:, :3] = srgb_to_linear(lut[:, :3])
+    else:
+        raise ValueError(f"Colormap '{colormap_name}' not found")
+    
+    return lut.astype(np.float32)
+
+def colormap_lut_path(colormap_name, size):
+    """Disk cache path of a LUT, custom colormaps are keyed by their stops"""
+    if is_custom_colormap(colormap_name):
+        digest = hashlib.sha256(repr(get_custom_colormap(colormap_name)).encode()).hexdigest()[:16]
+    else:
+        digest = "matplotlib"
+    return os.path.join(CACHE_SETTINGS["dir"], "luts", f"{colormap_name}_{size}_{digest}.npy")
+
+def build_colormap_lut(colormap_name, size=None):
+    """High resolution linear RGBA LUT of a colormap, cached in memory and on disk
+    
+    Cached LUTs of matplotlib colormaps mean matplotlib is not imported at render time.
+    """
+    size = size or COLORMAP_SETTINGS["lut_size"]
+    key = (colormap_name, size)
+    if key in COLORMAP_LUTS:
+        return COLORMAP_LUTS[key]
+    
+    lut_path = colormap_lut_path(colormap_name, size)
+    if CACHE_SETTINGS["enabled"] and os.path.exists(lut_path):
+        lut = np.load(lut_path)
     else:
-        return pow((srgb_value + 0.055) / 1.055, 2.4)
+        lut = compute_colormap_lut(colormap_name, size)
+        if CACHE_SETTINGS["enabled"]:
+            os.makedirs(os.path.dirname(lut_path), exist_ok=True)
+            tmp_path = f"{lut_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, lut)
+            os.replace(tmp_path, lut_path)
+    
+    COLORMAP_LUTS[key] = lut
+    return lut
 
 def matplotlib_to_blender_colormap(colormap_name, num_samples=20):
     """Convert a matplotlib colormap to Blender color ramp format with proper color space conversion"""
     
-    cmap = plt.get_cmap(colormap_name)
+    lut = build_colormap_lut(colormap_name)
     positions = np.linspace(0, 1, num_samples)
-    colors = []
-    
-    for pos in positions:
-        rgba_srgb = cmap(pos)
-        r_linear = srgb_to_linear(rgba_srgb[0])
-        g_linear = srgb_to_linear(rgba_srgb[1])
-        b_linear = srgb_to_linear(rgba_srgb[2])
-        a_linear = rgba_srgb[3]
-        colors.append((pos, [r_linear, g_linear, b_linear, a_linear]))
+    indices = np.rint(positions * (len(lut) - 1)).astype(np.intp)
+    colors = [(float(pos), lut[i].tolist()) for pos, i in zip(positions, indices)]
     
     print(f"✓ Converted matplotlib colormap '{colormap_name}' from sRGB to linear RGB")
     return colors
@@ -336,9 +580,1074 @@ def get_colormap_data(colormap_name):
     # Check if it's a matplotlib colormap
     elif is_matplotlib_colormap(colormap_name):
         print(f"Using matplotlib colormap: {colormap_name}")
-        return matplotlib_to_blender_colormap(colormap_name, num_samples=20)
+        return matplotlib_to_blender_colormap(colormap_name, num_samples=COLORMAP_SETTINGS["ramp_stops"])
             
 
+def colorbar_colors(colormap_name, size=256):
+    """sRGB colors for colorbars (custom stops are shown as stored, as before)"""
+    lut = build_colormap_lut(colormap_name, size)[:, :3]
+    if is_matplotlib_colormap(colormap_name):
+        return linear_to_srgb(lut)
+    return lut
+
+def build_all_colormap_luts():
+    """Write the LUTs of all known colormaps to the disk cache"""
+    start = time.perf_counter()
+    names = list(CUSTOM_COLOR_RAMPS) + MATPLOTLIB_COLORMAPS
+    for name in names:
+        build_colormap_lut(name)
+    print(f"Built {len(names)} colormap LUTs ({COLORMAP_SETTINGS['lut_size']} entries) in {time.perf_counter() - start:.2f}s: {os.path.join(CACHE_SETTINGS['dir'], 'luts')}")
+
+def apply_colormap_lut(values, lut, vmin, vmax):
+    """Map data values to linear RGBA through a LUT, clamped like ShaderNodeMapRange"""
+    t = (np.asarray(values, dtype=np.float32) - vmin) / (vmax - vmin)
+    t = np.clip(np.nan_to_num(t, nan=0.0), 0.0, 1.0)
+    return lut[np.rint(t * (len(lut) - 1)).astype(np.intp)]
+
+def linear_to_srgb(linear):
+    """Vectorized linear RGB to sRGB conversion"""
+    linear = np.clip(linear, 0.0, 1.0)
+    return np.where(linear <= 0.0031308, linear * 12.92, 1.055 * np.power(linear, 1 / 2.4) - 0.055)
+
+
+# ==============================================================================
+# TEXTURE INGESTION
+# ==============================================================================
+
+SPHERE_RADIUS = 2.0
+CAMERA_SENSOR_WIDTH = 36.0              # Blender default sensor width in mm
+TIFF_CHUNK_BYTES = 64 * 1024 * 1024     # Upper bound of a memory-mapped read chunk
+
+def tiff_shape(geotiff_path):
+    """(height, width) of the data TIFF without reading pixels"""
+    import tifffile
+    
+    if is_expression(geotiff_path):
+        return expression_shape(geotiff_path)
+    if is_dataset(geotiff_path):
+        return dataset_field(geotiff_path)["array"].shape
+    with tifffile.TiffFile(geotiff_path) as tif:
+        page = tif.pages[0]
+        return page.imagelength, page.imagewidth
+
+def select_band(array, axes, band=0):
+    """Drop sample/band axes of a TIFF page array, keeping sample band"""
+    for axis, name in reversed(list(enumerate(axes))):
+        if name not in "YX":
+            array = array.take(band if name == "S" else 0, axis=axis)
+    return array
+
+def tiff_band_count(geotiff_path):
+    """Number of bands: full size pages of a multi-page TIFF, else samples of the first page"""
+    import tifffile
+    
+    if is_dataset(geotiff_path):
+        return dataset_field(geotiff_path)["bands"]
+    with tifffile.TiffFile(geotiff_path) as tif:
+        first = tif.pages[0]
+        pages = [page for page in tif.pages if page.shape == first.shape]
+        return len(pages) if len(pages) > 1 else first.samplesperpixel
+
+def iter_tiff_chunks(geotiff_path, band=0):
+    """Yield (row, col, block) float32 chunks of a band without reading the whole raster
+    
+    Uncompressed files are memory-mapped and read in row bands, compressed files
+    are decoded strip by strip or tile by tile. Bands are pages of multi-page
+    TIFFs, samples otherwise.
+    """
+    import tifffile
+    
+    if is_expression(geotiff_path):
+        yield from iter_expression_chunks(geotiff_path, band)
+        return
+    if is_dataset(geotiff_path):
+        yield from iter_dataset_chunks(geotiff_path, band)
+        return
+    
+    with tifffile.TiffFile(geotiff_path) as tif:
+        multi_page = band > 0 and len(tif.pages) > 1 and tif.pages[0].samplesperpixel == 1
+        page_index, sample = (band, 0) if multi_page else (0, band)
+        page = tif.pages[page_index]
+        height, width = page.imagelength, page.imagewidth
+        
+        if page.is_memmappable:
+            data = select_band(tifffile.memmap(geotiff_path, page=page_index, mode='r'), page.axes, sample)
+            rows_per_chunk = max(1, TIFF_CHUNK_BYTES // (width * data.itemsize))
+            for row in range(0, height, rows_per_chunk):
+                yield row, 0, np.asarray(data[row:row + rows_per_chunk], dtype=np.float32)
+            return
+        
+        separate = page.planarconfig == 2
+        for segment, indices, _ in page.segments():
+            if indices[0] != (sample if separate else 0):
+                continue  # separate planes of other bands
+            row, col = indices[2], indices[3]
+            # Edge tiles are padded beyond the image
+            block = segment[0, :height - row, :width - col, 0 if separate else sample]
+            yield row, col, block.astype(np.float32, copy=False)
+
+def read_tiff_downsampled(geotiff_path, factor, band=0):
+    """Area-average a band by an integer factor, streaming chunk by chunk (NaN aware)"""
+    height, width = tiff_shape(geotiff_path)
+    out_height = -(-height // factor)
+    out_width = -(-width // factor)
+    sums = np.zeros((out_height, out_width), dtype=np.float64)
+    counts = np.zeros((out_height, out_width), dtype=np.int32)
+    
+    for row, col, block in iter_tiff_chunks(geotiff_path, band):
+        valid = np.isfinite(block)
+        rows = (row + np.arange(block.shape[0])) // factor
+        cols = (col + np.arange(block.shape[1])) // factor
+        row_starts = np.flatnonzero(np.diff(rows, prepend=rows[0] - 1))
+        col_starts = np.flatnonzero(np.diff(cols, prepend=cols[0] - 1))
+        
+        block_sums = np.add.reduceat(np.add.reduceat(np.where(valid, block, 0.0), row_starts, axis=0, dtype=np.float64), col_starts, axis=1)
+        block_counts = np.add.reduceat(np.add.reduceat(valid.astype(np.int32), row_starts, axis=0), col_starts, axis=1)
+        sums[rows[0]:rows[-1] + 1, cols[0]:cols[-1] + 1] += block_sums
+        counts[rows[0]:rows[-1] + 1, cols[0]:cols[-1] + 1] += block_counts
+    
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(counts > 0, sums / counts, np.nan).astype(np.float32)
+
+def texture_width_needed(resolution, obj_type="sphere"):
+    """Texture width that gives about one texel per rendered pixel at the current zoom"""
+    if obj_type == "robinson":
+        return resolution
+    
+    return int(math.ceil(2 * math.pi * sphere_pixels_per_radian(resolution)))
+
+def sphere_pixels_per_radian(resolution):
+    """Screen pixels per radian of great circle arc at the view center, the densest spot of the view"""
+    focal = CAMERA_SETTINGS["focal_length"] * (1 + CAMERA_SETTINGS["zoom_level"])
+    tan_half = (CAMERA_SENSOR_WIDTH / 2) / focal
+    # Surface arc seen by the center pixel
+    pixel_arc = (CAMERA_SETTINGS["distance"] - SPHERE_RADIUS) * 2 * tan_half / resolution
+    return SPHERE_RADIUS / pixel_arc
+
+def texture_downsample_factor(geotiff_path, target_width):
+    """Integer area-average factor that keeps the texture at least target_width wide"""
+    _, width = tiff_shape(geotiff_path)
+    return max(1, width // max(1, target_width))
+
+def load_tiff_array(geotiff_path, target_width=None):
+    """Read the data TIFF as a 2D array, area-averaged down to target_width if given
+    
+    With --texture-cache the closest texture pyramid level that is at least
+    target_width wide is returned as a read-only memory map. Point data
+    files are regridded to a texture of target_width.
+    """
+    if is_point_data(geotiff_path):
+        return load_point_array(geotiff_path, target_width)
+    factor = texture_downsample_factor(geotiff_path, target_width) if target_width else 1
+    if CACHE_SETTINGS["pyramids"]:
+        return pyramid_level(geotiff_path, factor)
+    return read_tiff_downsampled(geotiff_path, factor)
+
+
+# ==============================================================================
+# TEXTURE PYRAMID CACHE
+# ==============================================================================
+
+def pyramid_cache_dir():
+    return os.path.join(CACHE_SETTINGS["dir"], "pyramids")
+
+def write_json_atomic(path, data):
+    """Write JSON through a temporary file so readers never see a partial file"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+@contextlib.contextmanager
+def file_lock(path):
+    """Exclusive lock on path + ".lock" around a read-modify-write of a shared file"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(f"{path}.lock", "a+") as f:
+        try:
+            import fcntl
+        except ImportError:
+            # Windows
+            import msvcrt
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+            return
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+def load_pyramid_index():
+    try:
+        with open(os.path.join(pyramid_cache_dir(), "index.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"entries": {}, "hashes": {}, "hits": 0, "misses": 0}
+
+def file_content_hash(path, known_hashes=None, band=0):
+    """Content hash of an input, expressions and NetCDF/Zarr fields hash their sources and the band selection"""
+    if is_expression(path):
+        return expression_hash(path, known_hashes, band)
+    if is_dataset(path):
+        return dataset_hash(path, known_hashes, band)
+    return file_bytes_hash(path, known_hashes)
+
+def file_stamp(path):
+    stat = os.stat(path)
+    return f"{os.path.abspath(path)}|{stat.st_mtime_ns}|{stat.st_size}"
+
+def input_stamp(path):
+    """Cheap identity of the field an input holds
+    
+    Path, mtime and size of its files, plus the operands of an expression or
+    the variable, time step and level of a dataset.
+    """
+    if is_expression(path):
+        spec = load_expression(path)
+        return json.dumps([file_stamp(path), {name: input_stamp(operand) for name, operand in spec["operands"].items()}])
+    if is_dataset(path):
+        field = dataset_field(path)
+        store = store_listing_hash(path) if os.path.isdir(path) else file_stamp(path)
+        return json.dumps([store, field["name"], field["selection"]], sort_keys=True)
+    return file_stamp(path)
+
+def file_bytes_hash(path, known_hashes=None):
+    """SHA-256 of a file, reused from known_hashes while path, mtime and size are unchanged"""
+    stamp = file_stamp(path)
+    if known_hashes is not None and stamp in known_hashes:
+        return known_hashes[stamp]
+    
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(8 * 1024 * 1024), b""):
+            digest.update(block)
+    if known_hashes is not None:
+        known_hashes[stamp] = digest.hexdigest()
+    return digest.hexdigest()
+
+def area_average_2x2(block):
+    """NaN aware 2x2 area average, odd edges average over the cells that exist"""
+    height, width = block.shape
+    padded = np.full((height + height % 2, width + width % 2), np.nan, dtype=np.float32)
+    padded[:height, :width] = block
+    cells = padded.reshape(padded.shape[0] // 2, 2, padded.shape[1] // 2, 2)
+    valid = np.isfinite(cells)
+    counts = valid.sum(axis=(1, 3))
+    sums = np.where(valid, cells, 0.0).sum(axis=(1, 3))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+def build_pyramid(geotiff_path, entry_dir, dtype=None):
+    """Write memory-mappable texture levels (full, 1/2, 1/4, ...) of a TIFF, returns their shapes
+    
+    level_0 is a full resolution copy in the cache dtype, so an entry takes
+    about 4/3 of the uncompressed input size (2/3 with float16) and all
+    levels count against the cache size limit.
+    """
+    dtype = np.dtype(dtype or CACHE_SETTINGS["pyramid_dtype"])
+    os.makedirs(entry_dir, exist_ok=True)
+    
+    height, width = tiff_shape(geotiff_path)
+    level = np.lib.format.open_memmap(os.path.join(entry_dir, "level_0.npy"), mode='w+', dtype=dtype, shape=(height, width))
+    for row, col, block in iter_tiff_chunks(geotiff_path):
+        if dtype == np.float16 and np.abs(block[np.isfinite(block)]).max(initial=0.0) > np.finfo(np.float16).max:
+            # Would become inf, averages of coarser levels too
+            print(f"Texture cache: {os.path.basename(geotiff_path)} exceeds the float16 range, stored as float32")
+            del level
+            return build_pyramid(geotiff_path, entry_dir, np.float32)
+        level[row:row + block.shape[0], col:col + block.shape[1]] = block
+    level.flush()
+    shapes = [level.shape]
+    
+    while level.shape[1] // 2 >= CACHE_SETTINGS["pyramid_min_width"]:
+        height, width = level.shape
+        next_level = np.lib.format.open_memmap(os.path.join(entry_dir, f"level_{len(shapes)}.npy"), mode='w+',
+                                               dtype=dtype, shape=(-(-height // 2), -(-width // 2)))
+        band_rows = max(2, 2 * (TIFF_CHUNK_BYTES // (width * 4 * 2)))
+        for row in range(0, height, band_rows):
+            averaged = area_average_2x2(np.asarray(level[row:row + band_rows], dtype=np.float32))
+            next_level[row // 2:row // 2 + averaged.shape[0]] = averaged
+        next_level.flush()
+        del level
+        level = next_level
+        shapes.append(level.shape)
+    
+    del level
+    return shapes
+
+def evict_pyramids(index, keep_key):
+    """Remove least recently used pyramids until the cache fits its size limit"""
+    entries = index["entries"]
+    total = sum(entry["bytes"] for entry in entries.values())
+    for key in sorted(entries, key=lambda k: entries[k]["last_used"]):
+        if total <= CACHE_SETTINGS["pyramid_max_bytes"]:
+            break
+        if key == keep_key:
+            continue
+        total -= entries[key]["bytes"]
+        remove_pyramid_dir(os.path.join(pyramid_cache_dir(), key))
+        print(f"Texture cache: evicted {os.path.basename(entries[key]['source'])}")
+        del entries[key]
+
+def remove_pyramid_dir(entry_dir):
+    """Move an entry out of the way before deleting it, so no reader finds half of it"""
+    trash_dir = f"{entry_dir}.{os.getpid()}.trash"
+    try:
+        os.replace(entry_dir, trash_dir)
+    except OSError:
+        return
+    shutil.rmtree(trash_dir, ignore_errors=True)
+
+def pyramid_level(geotiff_path, factor):
+    """Texture pyramid level closest to (but not coarser than) a downsampling factor
+    
+    Levels are built in a temporary directory and moved into place, and the
+    index is updated under a lock file, so parallel workers can share the cache.
+    """
+    index_path = os.path.join(pyramid_cache_dir(), "index.json")
+    hashes = load_pyramid_index()["hashes"]
+    key = f"{file_content_hash(geotiff_path, hashes)}_{CACHE_SETTINGS['pyramid_dtype']}"
+    entry_dir = os.path.join(pyramid_cache_dir(), key)
+    
+    # A complete entry directory always has its shapes file, it is moved into place last
+    built = None
+    if not os.path.exists(os.path.join(entry_dir, "shapes.json")):
+        start = time.perf_counter()
+        tmp_dir = f"{entry_dir}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        # Left over from an interrupted eviction or an older cache layout
+        remove_pyramid_dir(entry_dir)
+        shapes = build_pyramid(geotiff_path, tmp_dir)
+        write_json_atomic(os.path.join(tmp_dir, "shapes.json"), shapes)
+        built = {
+            "source": os.path.abspath(geotiff_path),
+            "shapes": shapes,
+            "bytes": sum(os.path.getsize(os.path.join(tmp_dir, f"level_{i}.npy")) for i in range(len(shapes)))
+        }
+        try:
+            os.replace(tmp_dir, entry_dir)
+            print(f"Texture cache: built {len(shapes)} levels for {os.path.basename(geotiff_path)} in {time.perf_counter() - start:.2f}s")
+        except OSError:
+            # Another worker moved the same entry into place first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    
+    with file_lock(index_path):
+        index = load_pyramid_index()
+        index["hashes"].update(hashes)
+        index["hits" if built is None else "misses"] += 1
+        entry = index["entries"].get(key)
+        if entry is None:
+            if built is None:
+                # Built by another worker that has not updated the index yet
+                with open(os.path.join(entry_dir, "shapes.json")) as f:
+                    shapes = json.load(f)
+                built = {
+                    "source": os.path.abspath(geotiff_path),
+                    "shapes": shapes,
+                    "bytes": sum(os.path.getsize(os.path.join(entry_dir, f"level_{i}.npy")) for i in range(len(shapes)))
+                }
+            entry = index["entries"][key] = built
+        entry["last_used"] = time.time()
+        evict_pyramids(index, key)
+        write_json_atomic(index_path, index)
+        
+        # Mapped while locked, an eviction by another worker can only unlink the open file
+        level = min(int(math.log2(factor)), len(entry["shapes"]) - 1)
+        array = np.load(os.path.join(entry_dir, f"level_{level}.npy"), mmap_mode='r')
+    
+    print(f"Texture cache: level {level} {tuple(entry['shapes'][level])} (hits {index['hits']}, misses {index['misses']})")
+    return array
+
+
+# ==============================================================================
+# SPHERE GEOMETRY
+# ==============================================================================
+
+# Edge angle of the icosahedron (radians), halved by every subdivision level
+ICOSAHEDRON_EDGE_ANGLE = math.atan(2.0)
+
+def sphere_edge_angle():
+    """Target edge length (radians of arc) for the output size and zoom"""
+    pixels_per_radian = sphere_pixels_per_radian(render_resolution("sphere", args.lowres)[0])
+    if not WOW_MODE:
+        return GEOMETRY_SETTINGS["edge_px"] / pixels_per_radian
+    
+    # Displaced: finer, but never finer than a texel of the data texture
+    edge_angle = GEOMETRY_SETTINGS["displaced_edge_px"] / pixels_per_radian
+    if args.texture_width:
+        edge_angle = max(edge_angle, 2 * math.pi / args.texture_width)
+    return edge_angle
+
+def icosphere_level(edge_angle):
+    """Subdivision level of an icosahedron with edges closest to edge_angle"""
+    level = round(math.log2(max(ICOSAHEDRON_EDGE_ANGLE / edge_angle, 1.0)))
+    return min(level, GEOMETRY_SETTINGS["max_ico_level"])
+
+def quadsphere_cells(edge_angle):
+    """Cells per cube face edge of a quad-sphere whose edges are at most edge_angle"""
+    cells = math.ceil((math.pi / 2) / edge_angle)
+    return max(1, min(cells, GEOMETRY_SETTINGS["max_quad_cells"]))
+
+def quadsphere_mesh(cells):
+    """Unit quad-sphere (equi-angular cube map), returns (vertices, quad faces) arrays"""
+    # Integer grid on the cube surface, shared edges deduplicated exactly
+    grid = np.arange(cells + 1, dtype=np.int64) * 2 - cells
+    a, b = np.meshgrid(grid, grid, indexing="ij")
+    a, b = a.ravel(), b.ravel()
+    side = np.full_like(a, cells)
+    
+    corners = np.arange(cells)[:, None] * (cells + 1) + np.arange(cells)[None, :]
+    corners = corners.ravel()
+    quad = np.stack([corners, corners + cells + 1, corners + cells + 2, corners + 1], axis=1)
+    
+    points = []
+    faces = []
+    for axis in range(3):
+        for sign in (1, -1):
+            coords = [None, None, None]
+            coords[axis] = side * sign
+            coords[(axis + 1) % 3] = a
+            coords[(axis + 2) % 3] = b
+            faces.append(quad + len(points) * len(a) if sign > 0 else quad[:, ::-1] + len(points) * len(a))
+            points.append(np.stack(coords, axis=1))
+    
+    points = np.concatenate(points)
+    span = 2 * cells + 1
+    keys = ((points[:, 0] + cells) * span + points[:, 1] + cells) * span + points[:, 2] + cells
+    _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    points = points[first]
+    faces = inverse.ravel()[np.concatenate(faces)]
+    
+    # Equi-angular warp keeps the cells close to uniform in size
+    cube = np.tan(points / cells * (math.pi / 4))
+    vertices = cube / np.linalg.norm(cube, axis=1, keepdims=True)
+    return vertices.astype(np.float32), faces.astype(np.int32)
+
+def select_faces(vertices, faces, keep):
+    """Keep the faces where keep is True, dropping unused vertices"""
+    faces = faces[keep]
+    used, inverse = np.unique(faces, return_inverse=True)
+    return vertices[used], inverse.reshape(faces.shape).astype(np.int32)
+
+def cap_mesh(direction, cap_angle, dense_angle, coarse_angle):
+    """Dense patch over the cap around direction plus the coarse rest of the unit sphere
+    
+    The coarse faces overlap the patch by one coarse edge beyond the horizon,
+    so the sphere stays closed for shadows without visible seams.
+    """
+    direction = np.asarray(direction, dtype=np.float64)
+    direction = direction / np.linalg.norm(direction)
+    
+    dense_vertices, dense_faces = quadsphere_mesh(quadsphere_cells(dense_angle))
+    inside = dense_vertices @ direction >= math.cos(cap_angle)
+    dense_vertices, dense_faces = select_faces(dense_vertices, dense_faces, inside[dense_faces].any(axis=1))
+    
+    coarse_vertices, coarse_faces = quadsphere_mesh(quadsphere_cells(coarse_angle))
+    inner = coarse_vertices @ direction >= math.cos(max(cap_angle - coarse_angle, 0.0))
+    coarse_vertices, coarse_faces = select_faces(coarse_vertices, coarse_faces, ~inner[coarse_faces].all(axis=1))
+    
+    vertices = np.concatenate([dense_vertices, coarse_vertices])
+    faces = np.concatenate([dense_faces, coarse_faces + len(dense_vertices)])
+    return vertices, faces
+
+def build_mesh(name, vertices, faces):
+    """Smooth shaded mesh from vertex and face arrays, filled with foreach_set"""
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(vertices))
+    mesh.vertices.foreach_set("co", vertices.ravel())
+    mesh.loops.add(faces.size)
+    mesh.loops.foreach_set("vertex_index", faces.ravel())
+    mesh.polygons.add(len(faces))
+    mesh.polygons.foreach_set("loop_start", np.arange(0, faces.size, faces.shape[1], dtype=np.int32))
+    try:
+        mesh.polygons.foreach_set("loop_total", np.full(len(faces), faces.shape[1], dtype=np.int32))
+    except (AttributeError, TypeError, RuntimeError):
+        pass  # Read-only since Blender 4.0, derived from loop_start
+    mesh.polygons.foreach_set("use_smooth", np.ones(len(faces), dtype=bool))
+    mesh.update(calc_edges=True)
+    mesh.validate()
+    return mesh
+
+def create_mesh_object(name, vertices, faces):
+    """Mesh object from vertex and face arrays"""
+    mesh = build_mesh(name, vertices, faces)
+    obj = bpy.data.objects.new(name, mesh)
+    bpy.context.collection.objects.link(obj)
+    bpy.context.view_layer.objects.active = obj
+    obj.select_set(True)
+    return obj
+
+def apply_cap_geometry(camera):
+    """Swap the sphere mesh for one that is dense only where the camera looks"""
+    sphere = bpy.data.objects["climate_sphere"]
+    start = time.perf_counter()
+    
+    # The sphere sits unrotated at the origin, the camera direction is the cap center
+    direction = np.array(camera.location) / np.linalg.norm(camera.location)
+    cap_angle = visible_cap_angle() + math.radians(GEOMETRY_SETTINGS["cap_margin_deg"])
+    vertices, faces = cap_mesh(direction, cap_angle, sphere_edge_angle(), math.radians(GEOMETRY_SETTINGS["coarse_edge_deg"]))
+    
+    old_mesh = sphere.data
+    mesh = build_mesh("climate_sphere", vertices, faces)
+    for material in old_mesh.materials:
+        mesh.materials.append(material)
+    sphere.data = mesh
+    bpy.data.meshes.remove(old_mesh)
+    
+    print(f"  Cap geometry {camera.name}: {len(faces):,} faces, cap {math.degrees(cap_angle):.1f} deg in {time.perf_counter() - start:.2f}s")
+
+def sphere_render_faces(sphere):
+    """Number of faces Cycles gets, including the SUBSURF render levels"""
+    faces = len(sphere.data.polygons)
+    for modifier in sphere.modifiers:
+        if modifier.type == 'SUBSURF':
+            faces *= 4 ** modifier.render_levels
+    return faces
+
+# ==============================================================================
+# POINT DATA REGRIDDING
+# ==============================================================================
+
+def is_point_data(path):
+    return str(path).lower().endswith(POINT_DATA_EXTENSIONS)
+
+def load_point_data(path):
+    """lat, lon (degrees) and value arrays of a point data .npz"""
+    with np.load(path) as npz:
+        keys = list(npz.keys())
+        lat_key = next(key for key in ("lat", "latitude") if key in keys)
+        lon_key = next(key for key in ("lon", "longitude") if key in keys)
+        value_keys = [key for key in ("value", DISPLAY_COLOR) if key in keys]
+        value_key = value_keys[0] if value_keys else next(key for key in keys if key not in (lat_key, lon_key))
+        lat = np.asarray(npz[lat_key], dtype=np.float64).ravel()
+        lon = np.asarray(npz[lon_key], dtype=np.float64).ravel()
+        values = np.asarray(npz[value_key], dtype=np.float32).ravel()
+    if not (len(lat) == len(lon) == len(values)):
+        raise ValueError(f"{path}: lat, lon and {value_key} differ in length")
+    return lat, lon, values
+
+def unit_vectors(lat, lon):
+    """Points on the unit sphere of lat/lon in degrees"""
+    lat = np.radians(lat)
+    lon = np.radians(lon)
+    return np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1)
+
+def point_grid_width(num_points):
+    """Texture width with about as many texels as points"""
+    return int(round(math.sqrt(2 * num_points)))
+
+def compute_point_weights(lat, lon, shape):
+    """Source point indices and weights of every texel, (h, w, k) each, nearest or inverse distance"""
+    from scipy.spatial import cKDTree
+    
+    height, width = shape
+    tree = cKDTree(unit_vectors(lat, lon))
+    k = 1 if POINT_SETTINGS["method"] == "nearest" else max(1, POINT_SETTINGS["neighbours"])
+    index = np.empty((height, width, k), dtype=np.int32)
+    weight = np.empty((height, width, k), dtype=np.float32)
+    
+    # Texel columns start at the west edge the sphere texture uses
+    texel_lon = texture_west_longitude() + (np.arange(width) + 0.5) * 360.0 / width
+    for row0 in range(0, height, POINT_SETTINGS["band_rows"]):
+        row1 = min(height, row0 + POINT_SETTINGS["band_rows"])
+        texel_lat = 90.0 - (np.arange(row0, row1) + 0.5) * 180.0 / height
+        targets = unit_vectors(*np.meshgrid(texel_lat, texel_lon, indexing="ij"))
+        distance, neighbours = tree.query(targets.reshape(-1, 3), k=k)
+        distance = distance.reshape(row1 - row0, width, k)
+        neighbours = neighbours.reshape(row1 - row0, width, k)
+        
+        if k == 1:
+            band_weight = np.ones(distance.shape)
+        else:
+            # Chord distance, a texel on top of a point takes its value
+            inverse = 1.0 / np.maximum(distance, 1e-12) ** POINT_SETTINGS["power"]
+            band_weight = inverse / inverse.sum(axis=-1, keepdims=True)
+        index[row0:row1] = neighbours
+        weight[row0:row1] = band_weight
+    return index, weight
+
+def point_weights(lat, lon, shape):
+    """Cached regridding weights of a point grid, memory-mapped from the cache directory"""
+    if not CACHE_SETTINGS["enabled"]:
+        return compute_point_weights(lat, lon, shape)
+    
+    # Keyed by the point coordinates, every field on the same grid shares the weights
+    digest = hashlib.sha256()
+    digest.update(lat.tobytes())
+    digest.update(lon.tobytes())
+    method = "nearest" if POINT_SETTINGS["method"] == "nearest" else f"idw{POINT_SETTINGS['neighbours']}p{POINT_SETTINGS['power']:g}"
+    key = f"{digest.hexdigest()[:16]}_{shape[1]}x{shape[0]}_{method}_west{texture_west_longitude():g}"
+    entry_dir = os.path.join(CACHE_SETTINGS["dir"], "regrid", key)
+    index_path = os.path.join(entry_dir, "index.npy")
+    weight_path = os.path.join(entry_dir, "weight.npy")
+    
+    if not (os.path.exists(index_path) and os.path.exists(weight_path)):
+        start = time.perf_counter()
+        index, weight = compute_point_weights(lat, lon, shape)
+        os.makedirs(entry_dir, exist_ok=True)
+        for path, array in ((index_path, index), (weight_path, weight)):
+            tmp_path = f"{path}.{os.getpid()}.tmp.npy"
+            np.save(tmp_path, array)
+            os.replace(tmp_path, path)
+        print(f"Regrid cache miss: {key} built in {time.perf_counter() - start:.2f}s")
+    else:
+        print(f"Regrid cache hit: {key}")
+    
+    return np.load(index_path, mmap_mode='r'), np.load(weight_path, mmap_mode='r')
+
+def load_point_array(path, target_width=None):
+    """Regrid a point data file to a top-down equirectangular array of target_width"""
+    start = time.perf_counter()
+    lat, lon, values = load_point_data(path)
+    width = target_width or point_grid_width(len(values))
+    width += width % 2
+    index, weight = point_weights(lat, lon, (width // 2, width))
+    data = apply_reprojection(values, index, weight)
+    print(f"Regridded {len(values):,} points to {width} x {width // 2} ({POINT_SETTINGS['method']}) in {time.perf_counter() - start:.2f}s")
+    return data
+
+# ==============================================================================
+# NETCDF AND ZARR INPUT
+# ==============================================================================
+
+DATASET_LAT_NAMES = ("lat", "latitude")
+DATASET_LON_NAMES = ("lon", "longitude")
+DATASET_TIME_NAMES = ("time", "valid_time")
+DATASET_LEVEL_NAMES = ("level", "lev", "plev", "pressure_level", "isobaricInhPa", "height")
+
+def is_dataset(path):
+    return str(path).rstrip("/\\").lower().endswith(DATASET_EXTENSIONS)
+
+def find_dimension(dims, names):
+    return next((dim for dim in dims if dim.lower() in names), None)
+
+def texture_west_longitude():
+    """Longitude of the left texture edge that ROTATION_OFFSET expects"""
+    u, _ = sphere_texture_uv(np.array(camera_location(0.0, 0.0, 1.0)))
+    return (-float(u) * 360 + 180) % 360 - 180
+
+def open_dataset(path):
+    """Open a NetCDF file or Zarr store once, closing the least recently used one above max_open"""
+    path = os.path.abspath(path)
+    if path in DATASET_HANDLES:
+        DATASET_HANDLES[path] = DATASET_HANDLES.pop(path)
+        return DATASET_HANDLES[path]
+    
+    import xarray as xr
+    
+    while len(DATASET_HANDLES) >= DATASET_SETTINGS["max_open"]:
+        close_dataset(next(iter(DATASET_HANDLES)))
+    engine = "zarr" if path.rstrip("/\\").lower().endswith(".zarr") else None
+    DATASET_HANDLES[path] = xr.open_dataset(path, engine=engine, chunks=None)
+    return DATASET_HANDLES[path]
+
+def close_dataset(path):
+    """Close a dataset and forget the fields selected from it"""
+    path = os.path.abspath(path)
+    ds = DATASET_HANDLES.pop(path, None)
+    if ds is not None:
+        ds.close()
+    for key in [key for key in DATASET_FIELDS if key[0] == path]:
+        del DATASET_FIELDS[key]
+
+def dataset_field(path, band=0):
+    """Lazily selected (lat, lon) variable of a NetCDF file or Zarr store
+    
+    Nothing is read but coordinates. The variable is --nc-variable, else the
+    variable of the current job if the dataset has it. Returns the array with
+    the row flip (south-up grids), the longitude roll to the texture west edge,
+    the rows per read and the number of time steps (bands).
+    """
+    ds = open_dataset(path)
+    name = DATASET_SETTINGS["variable"] or (DISPLAY_COLOR if DISPLAY_COLOR in ds.data_vars else None)
+    key = (os.path.abspath(path), name, band)
+    if key in DATASET_FIELDS:
+        return DATASET_FIELDS[key]
+    
+    if name is None:
+        candidates = [var for var in ds.data_vars
+                      if find_dimension(ds[var].dims, DATASET_LAT_NAMES) and find_dimension(ds[var].dims, DATASET_LON_NAMES)]
+        if len(candidates) != 1:
+            raise ValueError(f"Choose a variable of {os.path.basename(path)} with --nc-variable: {', '.join(candidates)}")
+        name = candidates[0]
+    
+    da = ds[name]
+    lat_dim = find_dimension(da.dims, DATASET_LAT_NAMES)
+    lon_dim = find_dimension(da.dims, DATASET_LON_NAMES)
+    if lat_dim is None or lon_dim is None:
+        raise ValueError(f"Variable '{name}' has no latitude/longitude dimensions: {da.dims}")
+    
+    selection = {}
+    bands = 1
+    for dim in da.dims:
+        if dim in (lat_dim, lon_dim):
+            continue
+        if dim.lower() in DATASET_TIME_NAMES:
+            selection[dim] = DATASET_SETTINGS["time_index"] + band
+            bands = da.sizes[dim] - DATASET_SETTINGS["time_index"]
+        elif dim.lower() in DATASET_LEVEL_NAMES and DATASET_SETTINGS["level"] is not None:
+            selection[dim] = int(np.abs(da[dim].values - DATASET_SETTINGS["level"]).argmin())
+        elif dim.lower() in DATASET_LEVEL_NAMES or da.sizes[dim] == 1:
+            selection[dim] = 0
+        else:
+            raise ValueError(f"Dimension '{dim}' of '{name}' is neither time nor level")
+    native_rows = da.encoding.get("preferred_chunks", {}).get(lat_dim)
+    da = da.isel(selection).transpose(lat_dim, lon_dim)
+    
+    # Row 0 is the north edge in the texture
+    lat = da[lat_dim].values
+    flip = bool(lat[0] < lat[-1])
+    
+    # Roll a global grid so its first column starts at the texture west edge
+    lon = da[lon_dim].values.astype(np.float64)
+    width = len(lon)
+    step = (lon[-1] - lon[0]) / (width - 1)
+    if step <= 0 or abs(step * width - 360) > step:
+        raise ValueError(f"'{name}' needs a global grid with increasing longitudes ({lon[0]:g} to {lon[-1]:g})")
+    offset = (lon - texture_west_longitude() - step / 2 + 180) % 360 - 180
+    roll = int(np.abs(offset).argmin())
+    
+    # Whole chunks of the store per read
+    rows = max(1, TIFF_CHUNK_BYTES // (width * 4))
+    if native_rows:
+        rows = max(native_rows, rows // native_rows * native_rows)
+    
+    DATASET_FIELDS[key] = {"array": da, "name": name, "selection": selection, "flip": flip, "roll": roll,
+                           "rows_per_chunk": rows, "bands": bands}
+    return DATASET_FIELDS[key]
+
+def iter_dataset_chunks(path, band=0):
+    """Yield (row, 0, block) north-up, west-edge aligned float32 row bands of a dataset variable"""
+    field = dataset_field(path, band)
+    da = field["array"]
+    height = da.shape[0]
+    for row in range(0, height, field["rows_per_chunk"]):
+        end = min(row + field["rows_per_chunk"], height)
+        if field["flip"]:
+            block = da[height - end:height - row].values[::-1]
+        else:
+            block = da[row:end].values
+        yield row, 0, np.roll(np.asarray(block, dtype=np.float32), -field["roll"], axis=1)
+
+def store_listing_hash(path):
+    """Zarr stores are directories of chunk files, keyed by their names, sizes and mtimes"""
+    listing = hashlib.sha256()
+    for root, _, files in sorted(os.walk(path)):
+        for filename in sorted(files):
+            stat = os.stat(os.path.join(root, filename))
+            listing.update(f"{os.path.relpath(os.path.join(root, filename), path)}|{stat.st_size}|{stat.st_mtime_ns}\n".encode())
+    return listing.hexdigest()
+
+def dataset_hash(path, known_hashes=None, band=0):
+    """Cache key of a dataset field: the store content and the selected variable, time step and level"""
+    if os.path.isdir(path):
+        store = store_listing_hash(path)
+    else:
+        store = file_bytes_hash(path, known_hashes)
+    field = dataset_field(path, band)
+    key = {"store": store, "variable": field["name"], "selection": field["selection"], "roll": field["roll"], "flip": field["flip"]}
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+# ==============================================================================
+# EXPRESSION INPUTS
+# ==============================================================================
+
+# Syntax allowed in expressions: arithmetic on operands, numbers and EXPRESSION_FUNCTIONS
+EXPRESSION_NODES = (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Call, ast.Name, ast.Load, ast.Constant,
+                    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.USub, ast.UAdd)
+
+def is_expression(path):
+    return str(path).lower().endswith(EXPRESSION_EXTENSIONS)
+
+def compile_expression(expression, names):
+    """Check an expression against the allowed syntax, returns (code, normalized form)"""
+    tree = ast.parse(expression, mode="eval")
+    for node in ast.walk(tree):
+        if not isinstance(node, EXPRESSION_NODES):
+            raise ValueError(f"Unsupported syntax in '{expression}': {type(node).__name__}")
+        if isinstance(node, ast.Name) and node.id not in names and node.id not in EXPRESSION_FUNCTIONS:
+            raise ValueError(f"Unknown name '{node.id}' in '{expression}'")
+        if isinstance(node, ast.Call) and not (isinstance(node.func, ast.Name) and node.func.id in EXPRESSION_FUNCTIONS):
+            raise ValueError(f"Unsupported call in '{expression}'")
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float)):
+            raise ValueError(f"Unsupported constant in '{expression}': {node.value!r}")
+    return compile(tree, "<expression>", "eval"), ast.dump(tree)
+
+def load_expression(path):
+    """Parse an expression file: {"expression": "(a - b) / b", "operands": {"a": "x.tiff", "b": "y.tiff"}}
+    
+    Relative operand paths are resolved against the expression file directory.
+    """
+    path = os.path.abspath(path)
+    key = (path, os.stat(path).st_mtime_ns)
+    if key not in EXPRESSIONS:
+        with open(path) as f:
+            raw = json.load(f)
+        operands = {}
+        for name, operand in raw["operands"].items():
+            if not name.isidentifier() or name in EXPRESSION_FUNCTIONS:
+                raise ValueError(f"Invalid operand name '{name}' in {path}")
+            if is_point_data(operand):
+                raise ValueError(f"Point data operands are not supported: {operand}")
+            operands[name] = os.path.join(os.path.dirname(path), operand)
+        code, tree = compile_expression(raw["expression"], operands)
+        EXPRESSIONS[key] = {"expression": raw["expression"], "operands": operands, "code": code, "tree": tree}
+    return EXPRESSIONS[key]
+
+def expression_shape(path):
+    """Common (height, width) of the operands"""
+    spec = load_expression(path)
+    shapes = {name: tuple(tiff_shape(operand)) for name, operand in spec["operands"].items()}
+    if len(set(shapes.values())) != 1:
+        raise ValueError(f"Operands of {os.path.basename(path)} differ in size: {shapes}")
+    return next(iter(shapes.values()))
+
+def expression_hash(path, known_hashes=None, band=0):
+    """Cache key of a derived field: the normalized expression and the content hashes of its operands"""
+    spec = load_expression(path)
+    key = {
+        "expression": spec["tree"],
+        "operands": {name: file_content_hash(operand, known_hashes, band) for name, operand in spec["operands"].items()}
+    }
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+def evaluate_expression(code, values):
+    """Evaluate a compiled expression on float32 blocks, non-finite results (division by zero) become NaN"""
+    with np.errstate(all='ignore'):
+        result = eval(code, {"__builtins__": {}}, {**EXPRESSION_FUNCTIONS, **values})
+    shape = next(iter(values.values())).shape
+    result = np.array(np.broadcast_to(result, shape), dtype=np.float32)
+    result[~np.isfinite(result)] = np.nan
+    return result
+
+def iter_tiff_rows(geotiff_path, band=0):
+    """Yield (row, block) full width row bands, assembled from the strips or tiles of iter_tiff_chunks"""
+    width = tiff_shape(geotiff_path)[1]
+    band_row, rows = None, None
+    for row, col, block in iter_tiff_chunks(geotiff_path, band):
+        if row != band_row:
+            if rows is not None:
+                yield band_row, rows
+            band_row = row
+            rows = block if block.shape[1] == width else np.empty((block.shape[0], width), dtype=np.float32)
+        if rows is not block:
+            rows[:, col:col + block.shape[1]] = block
+    if rows is not None:
+        yield band_row, rows
+
+def iter_expression_chunks(path, band=0):
+    """Evaluate an expression file row band by row band, operands may differ in strip and tile layout"""
+    spec = load_expression(path)
+    height, width = expression_shape(path)
+    names = list(spec["operands"])
+    readers = [iter_tiff_rows(spec["operands"][name], band) for name in names]
+    pending = [np.empty((0, width), dtype=np.float32) for _ in names]
+    
+    row = 0
+    while row < height:
+        for i, reader in enumerate(readers):
+            if pending[i].shape[0] == 0:
+                pending[i] = next(reader)[1]
+        rows = min(block.shape[0] for block in pending)
+        yield row, 0, evaluate_expression(spec["code"], {name: block[:rows] for name, block in zip(names, pending)})
+        pending = [block[rows:] for block in pending]
+        row += rows
+    
+    for reader in readers:
+        reader.close()
+
+# ==============================================================================
+# DATA STATISTICS
+# ==============================================================================
+
+def compress_sketch(values, weights, size):
+    """Merge sorted neighbours into at most size equal-weight centroids
+    
+    Compressing the concatenation of two sketches merges them, so chunks,
+    bands and locations can be summarised independently.
+    """
+    order = np.argsort(values, kind="stable")
+    values = values[order].astype(np.float64)
+    weights = weights[order].astype(np.float64)
+    if len(values) <= size:
+        return values, weights
+    cumulative = np.cumsum(weights)
+    bins = np.minimum(((cumulative - weights / 2) / cumulative[-1] * size).astype(np.intp), size - 1)
+    bin_weights = np.bincount(bins, weights, size)
+    bin_values = np.bincount(bins, values * weights, size)
+    keep = bin_weights > 0
+    return bin_values[keep] / bin_weights[keep], bin_weights[keep]
+
+def new_summary():
+    return {"min": math.inf, "max": -math.inf, "sum": 0.0, "weight": 0.0, "count": 0,
+            "values": np.empty(0), "weights": np.empty(0)}
+
+def add_to_summary(summary, values, weights):
+    """Accumulate weighted values into a running summary"""
+    if values.size == 0:
+        return
+    summary["min"] = min(summary["min"], float(values.min()))
+    summary["max"] = max(summary["max"], float(values.max()))
+    summary["sum"] += float(np.dot(values.astype(np.float64), weights))
+    summary["weight"] += float(weights.sum())
+    summary["count"] += int(values.size)
+    summary["values"], summary["weights"] = compress_sketch(
+        np.concatenate([summary["values"], values]), np.concatenate([summary["weights"], weights]),
+        STATS_SETTINGS["sketch_size"])
+
+def finish_summary(summary):
+    """JSON form of a summary"""
+    if summary["count"] == 0:
+        return {"count": 0}
+    return {
+        "min": summary["min"],
+        "max": summary["max"],
+        "mean": summary["sum"] / summary["weight"],
+        "count": summary["count"],
+        "sketch": [summary["values"].tolist(), summary["weights"].tolist()]
+    }
+
+def sketch_percentile(stats, percentile):
+    """Weighted percentile (0-100) from a summary sketch, exact at 0 and 100"""
+    values, weights = (np.asarray(column) for column in stats["sketch"])
+    total = weights.sum()
+    ranks = np.concatenate([[0.0], np.cumsum(weights) - weights / 2, [total]])
+    values = np.concatenate([[stats["min"]], values, [stats["max"]]])
+    return float(np.interp(percentile / 100 * total, ranks, values))
+
+def location_caps():
+    """Texture latitude and longitude (radians) of every location, and the visible cap angle"""
+    centers = {}
+    for name, (lat, lon) in {**CONTINENT_POSITIONS, **INTEREST_POSITIONS}.items():
+        u, v = sphere_texture_uv(np.array(camera_location(lat, lon, 1.0)))
+        centers[name] = ((v - 0.5) * math.pi, (0.5 - u) * 2 * math.pi)
+    return centers, visible_cap_angle()
+
+def compute_data_stats(geotiff_path, band=0):
+    """One streaming pass: cos-latitude weighted summaries, global and per visible location cap"""
+    height, width = tiff_shape(geotiff_path)
+    row_lat = (0.5 - (np.arange(height) + 0.5) / height) * math.pi
+    col_lon = (0.5 - (np.arange(width) + 0.5) / width) * 2 * math.pi
+    row_weight = np.cos(row_lat)
+    centers, cap = location_caps()
+    
+    summaries = {name: new_summary() for name in centers}
+    global_summary = new_summary()
+    for row, col, block in iter_tiff_chunks(geotiff_path, band):
+        lat = row_lat[row:row + block.shape[0]]
+        lon = col_lon[col:col + block.shape[1]]
+        weights = np.broadcast_to(row_weight[row:row + block.shape[0], None], block.shape)
+        valid = np.isfinite(block)
+        add_to_summary(global_summary, block[valid], weights[valid])
+        
+        for name, (lat0, lon0) in centers.items():
+            # Great circle distance within the cap <=> cos(dlon) above a per-row threshold
+            with np.errstate(divide='ignore', invalid='ignore'):
+                threshold = (math.cos(cap) - np.sin(lat) * math.sin(lat0)) / (np.cos(lat) * math.cos(lat0))
+            rows = np.flatnonzero(threshold <= 1.0)
+            if rows.size == 0:
+                continue
+            band_rows = slice(rows[0], rows[-1] + 1)
+            inside = valid[band_rows] & (np.cos(lon - lon0)[None, :] >= threshold[band_rows, None])
+            add_to_summary(summaries[name], block[band_rows][inside], weights[band_rows][inside])
+    
+    return finish_summary(global_summary), {name: finish_summary(summary) for name, summary in summaries.items()}
+
+def stats_cap_key():
+    """Location statistics depend on the visible cap and the texture rotation"""
+    _, cap = location_caps()
+    return f"cap{math.degrees(cap):.3f}_rot{ROTATION_OFFSET['x']:g},{ROTATION_OFFSET['y']:g},{ROTATION_OFFSET['z']:g}"
+
+def data_stats(geotiff_path, band=0):
+    """Statistics of a TIFF band, cached as a sidecar keyed by the file hash
+    
+    Returns {"global": summary, "locations": {cap_key: {location: summary}}},
+    one pass per file and camera setup.
+    """
+    if is_point_data(geotiff_path):
+        raise ValueError("statistics need a TIFF, not point data")
+    
+    cap_key = stats_cap_key()
+    stats = None
+    if CACHE_SETTINGS["enabled"]:
+        stats_dir = os.path.join(CACHE_SETTINGS["dir"], "stats")
+        hashes_path = os.path.join(stats_dir, "hashes.json")
+        try:
+            with open(hashes_path) as f:
+                hashes = json.load(f)
+        except (OSError, ValueError):
+            hashes = {}
+        known = len(hashes)
+        key = file_content_hash(geotiff_path, hashes, band)
+        if len(hashes) != known:
+            write_json_atomic(hashes_path, hashes)
+        
+        sidecar_path = os.path.join(stats_dir, f"{key[:24]}_band{band}.json")
+        try:
+            with open(sidecar_path) as f:
+                stats = json.load(f)
+            if cap_key in stats["locations"]:
+                return stats
+        except (OSError, ValueError, KeyError):
+            stats = None
+    
+    start = time.perf_counter()
+    global_stats, location_stats = compute_data_stats(geotiff_path, band)
+    print(f"Statistics pass over {os.path.basename(geotiff_path)}: {time.perf_counter() - start:.2f}s")
+    stats = stats or {"global": global_stats, "locations": {}}
+    stats["locations"][cap_key] = location_stats
+    if CACHE_SETTINGS["enabled"]:
+        write_json_atomic(sidecar_path, stats)
+    return stats
+
+def auto_range(geotiff_path, variable, location=None):
+    """Value range from the weighted percentiles, symmetric around zero for *_dif colormaps"""
+    stats = data_stats(geotiff_path)
+    summary = stats["global"] if location is None else stats["locations"][stats_cap_key()][location]
+    if summary["count"] == 0:
+        raise ValueError(f"No valid data in {geotiff_path}")
+    
+    low, high = (sketch_percentile(summary, q) for q in STATS_SETTINGS["percentiles"])
+    if low == high:
+        # Mostly constant field, the percentiles collapse
+        low, high = summary["min"], summary["max"]
+    if variable.endswith("_dif"):
+        bound = max(abs(low), abs(high))
+        low, high = -bound, bound
+    if low == high:
+        raise ValueError(f"{os.path.basename(geotiff_path)} is constant ({low:g}), set --vmin/--vmax")
+    return round_range(low, high)
+
+def round_range(low, high):
+    """Widen a range outwards to three significant digits of its span, -0.0 becomes 0.0"""
+    step = 10.0 ** (math.floor(math.log10(high - low)) - 2)
+    decimals = max(0, 2 - math.floor(math.log10(high - low)))
+    # The tolerance keeps exact multiples of the step where they are
+    low = round(math.floor(low / step + 1e-9) * step, decimals) + 0.0
+    high = round(math.ceil(high / step - 1e-9) * step, decimals) + 0.0
+    return low, high
+
+def run_stats():
+    """Print the statistics of the input TIFF, globally and for the visible cap of each location"""
+    stats = data_stats(args.input_tiff)
+    low_q, high_q = STATS_SETTINGS["percentiles"]
+    print(f"Statistics of {args.input_tiff} (cos-latitude weighted)")
+    
+    location_stats = stats["locations"][stats_cap_key()]
+    for name, summary in [("global", stats["global"])] + [(loc, location_stats[loc]) for loc in args.locations]:
+        if summary["count"] == 0:
+            print(f"  {name}: no valid data")
+            continue
+        low, high = sketch_percentile(summary, low_q), sketch_percentile(summary, high_q)
+        print(f"  {name}: min {summary['min']:.4g}, max {summary['max']:.4g}, mean {summary['mean']:.4g}, "
+              f"p{low_q:g} {low:.4g}, p{high_q:g} {high:.4g} ({summary['count']} cells)")
+    print(f"  auto range for {DISPLAY_COLOR}: {auto_range(args.input_tiff, DISPLAY_COLOR)}")
 
 # ==============================================================================
 # MAIN SCRIPT FUNCTIONS
@@ -353,17 +1662,30 @@ def clear_scene():
 
 def create_sphere():
     """Create sphere with subdivision"""
-    bpy.ops.mesh.primitive_uv_sphere_add(radius=1.0, location=(0, 0, 0))
-    sphere = bpy.context.active_object
+    if GEOMETRY_SETTINGS["mesh"] == "icosphere":
+        level = icosphere_level(sphere_edge_angle())
+        bpy.ops.mesh.primitive_ico_sphere_add(subdivisions=level + 1, radius=1.0, location=(0, 0, 0))
+        sphere = bpy.context.active_object
+    elif GEOMETRY_SETTINGS["mesh"] == "quadsphere":
+        vertices, faces = quadsphere_mesh(quadsphere_cells(sphere_edge_angle()))
+        sphere = create_mesh_object("climate_sphere", vertices, faces)
+    elif GEOMETRY_SETTINGS["mesh"] == "cap":
+        # Coarse until apply_cap_geometry() adds the dense patch of a camera
+        vertices, faces = quadsphere_mesh(quadsphere_cells(math.radians(GEOMETRY_SETTINGS["coarse_edge_deg"])))
+        sphere = create_mesh_object("climate_sphere", vertices, faces)
+    else:
+        bpy.ops.mesh.primitive_uv_sphere_add(radius=1.0, location=(0, 0, 0))
+        sphere = bpy.context.active_object
+        
+        subdivision = sphere.modifiers.new(name="Subdivision", type='SUBSURF')
+        subdivision.levels = 3
+        subdivision.render_levels = 6
+    
     sphere.name = "climate_sphere"
     sphere.scale = (2, 2, 2)
     
-    subdivision = sphere.modifiers.new(name="Subdivision", type='SUBSURF')
-    subdivision.levels = 3
-    subdivision.render_levels = 6
-    
     bpy.ops.object.shade_smooth()
-    print("Sphere created with subdivision")
+    print(f"Sphere created ({GEOMETRY_SETTINGS['mesh']}, {sphere_render_faces(sphere):,} render faces)")
     return sphere
 
 def create_robinson_plane():
@@ -418,25 +1740,217 @@ def setup_color_ramp(color_ramp_node, colormap_name):
     
     print(f"✓ Colormap '{colormap_name}' applied with {len(colors)} color stops")
 
-def create_climate_material(obj, geotiff_path, is_robinson=False):
-    """Create climate material - works for both sphere and Robinson"""
-    material_name = "robinson_material" if is_robinson else "climate_material"
-    mat = bpy.data.materials.new(name=material_name)
-    mat.use_nodes = True
-    obj.data.materials.append(mat)
+# Node names used to find the data-dependent nodes again when swapping jobs
+DATA_NODE_NAMES = {
+    "texture": "data_texture",
+    "map_range": "data_map_range",
+    "color_ramp": "data_color_ramp",
+    "decode": "data_decode"
+}
+
+def create_data_image(name, data, source_path):
+    """Create an in-memory float Blender image from a top-down 2D array"""
+    height, width = data.shape
+    img = bpy.data.images.new(name, width=width, height=height, alpha=False, float_buffer=True, is_data=True)
     
-    nodes = mat.node_tree.nodes
-    links = mat.node_tree.links
-    nodes.clear()
+    # Blender stores pixels bottom-up as RGBA
+    rgba = np.empty((height, width, 4), dtype=np.float32)
+    rgba[..., :3] = data[::-1, :, None]
+    rgba[..., 3] = 1.0
+    img.pixels.foreach_set(rgba.ravel())
+    img.update()
+    img["source_path"] = source_path
+    return img
+
+def encode_texture(data, encoding):
+    """Encode a float texture as float16 or scaled uint16, returns (encoded, scale, offset, max_error)
     
-    print(f"Creating {'Robinson' if is_robinson else 'sphere'} material for colormap: {DISPLAY_COLOR}")
+    The material decodes texel * scale + offset, where texel is what Cycles
+    samples: uint16 textures are normalised to [0, 1].
+    """
+    data = np.asarray(data, dtype=np.float32)
+    finite = np.isfinite(data)
+    if not finite.any():
+        raise ValueError("texture has no valid values")
     
-    # Main nodes
-    output = nodes.new(type='ShaderNodeOutputMaterial')
-    output.location = (300, 300)
+    if encoding == "float16":
+        if np.abs(data[finite]).max() > np.finfo(np.float16).max:
+            raise ValueError("values exceed the float16 range, use --texture-encoding uint16")
+        encoded = data.astype(np.float16)
+        scale, offset = 1.0, 0.0
+        decoded = encoded.astype(np.float64)
+    else:
+        low, high = float(data[finite].min()), float(data[finite].max())
+        step = (high - low) / 65534 or 1.0
+        encoded = np.full(data.shape, UINT16_NAN_CODE, dtype=np.uint16)
+        encoded[finite] = np.round((data[finite] - low) / step).astype(np.uint16) + 1
+        scale, offset = step * 65535, low - step
+        decoded = encoded / 65535 * scale + offset
     
-    principled = nodes.new(type='ShaderNodeBsdfPrincipled')
-    principled.location = (-236.5, 430)
+    max_error = float(np.abs(decoded[finite] - data[finite]).max())
+    return encoded, scale, offset, max_error
+
+def create_encoded_image(name, data, source_path):
+    """Write the texture as single channel float16/uint16 TIFF and load it
+    
+    Cycles reads file images itself and keeps one 16 bit channel (2 bytes per
+    texel, an in-memory float image takes 16). Encoded files are cached by
+    content in the cache directory.
+    """
+    import tifffile
+    
+    start = time.perf_counter()
+    key = hashlib.sha256(np.ascontiguousarray(data, dtype=np.float32).data)
+    key.update(f"{data.shape}|{TEXTURE_ENCODING}".encode())
+    path = os.path.join(CACHE_SETTINGS["dir"], "textures", f"{key.hexdigest()[:24]}_{TEXTURE_ENCODING}.tif")
+    
+    if CACHE_SETTINGS["enabled"] and os.path.exists(path):
+        with tifffile.TiffFile(path) as tif:
+            meta = json.loads(tif.pages[0].description)
+    else:
+        encoded, scale, offset, max_error = encode_texture(data, TEXTURE_ENCODING)
+        meta = {"scale": scale, "offset": offset, "max_error": max_error}
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        tifffile.imwrite(tmp_path, encoded, description=json.dumps(meta), metadata=None)
+        os.replace(tmp_path, path)
+    
+    img = bpy.data.images.load(path, check_existing=False)
+    img.name = name
+    img["source_path"] = source_path
+    img["decode_scale"] = meta["scale"]
+    img["decode_offset"] = meta["offset"]
+    
+    value_range = abs(MAP_RANGE["from_max"] - MAP_RANGE["from_min"]) or 1.0
+    print(f"Texture encoded as {TEXTURE_ENCODING} ({data.shape[1]} x {data.shape[0]}, 2 instead of 16 bytes per texel) in {time.perf_counter() - start:.2f}s, "
+          f"max error {meta['max_error']:.3g} ({meta['max_error'] / value_range:.2%} of the value range)")
+    return img
+
+def set_decode_node(node, img):
+    """Point the decode node at the scale and offset of an encoded image"""
+    node.inputs[1].default_value = img.get("decode_scale", 1.0)
+    node.inputs[2].default_value = img.get("decode_offset", 0.0)
+
+def image_source_path(img):
+    """Path of the TIFF an image was loaded or ingested from"""
+    return img.get("source_path") or os.path.abspath(bpy.path.abspath(img.filepath))
+
+def ingest_data_image(geotiff_path):
+    """Stream and area-average the TIFF down to the texture size the render needs
+    
+    Returns None when the full resolution image should be loaded instead.
+    """
+    point_data = is_point_data(geotiff_path)
+    encoded = TEXTURE_ENCODING != "float32"
+    # Blender can load neither encoded textures, expressions nor datasets itself
+    must_ingest = encoded or is_expression(geotiff_path) or is_dataset(geotiff_path)
+    if args.full_texture and not point_data and not must_ingest:
+        return None
+    
+    if VIEWPORT_CROPS:
+        target_width = CROP_SETTINGS["global_width"]
+    else:
+        target_width = args.texture_width or texture_width_needed(render_resolution(RENDER_OBJECT, args.lowres)[0], RENDER_OBJECT)
+    
+    # Point data always goes through the regridding, TIFFs only when they are larger than needed
+    if not point_data:
+        try:
+            factor = texture_downsample_factor(geotiff_path, target_width)
+        except ImportError:
+            if must_ingest:
+                raise
+            print("tifffile not available, loading full resolution texture")
+            return None
+        
+        if factor == 1 and not must_ingest:
+            return None
+    
+    start = time.perf_counter()
+    data = load_tiff_array(geotiff_path, None if args.full_texture and not point_data else target_width)
+    if encoded:
+        img = create_encoded_image(os.path.basename(geotiff_path), data, geotiff_path)
+    else:
+        img = create_data_image(os.path.basename(geotiff_path), data, geotiff_path)
+    print(f"Texture ingested at {data.shape[1]} x {data.shape[0]} in {time.perf_counter() - start:.2f}s")
+    return img
+
+def create_color_image(geotiff_path):
+    """Bake map range and colormap of the data TIFF into an 8 bit sRGB Blender image"""
+    start = time.perf_counter()
+    target_width = args.texture_width or texture_width_needed(render_resolution(RENDER_OBJECT, args.lowres)[0], RENDER_OBJECT)
+    data = load_tiff_array(geotiff_path, target_width)
+    lut = build_colormap_lut(DISPLAY_COLOR)
+    height, width = data.shape
+    
+    img = bpy.data.images.new(f"{os.path.basename(geotiff_path)}_{DISPLAY_COLOR}", width=width, height=height, alpha=True)
+    img.colorspace_settings.name = 'sRGB'
+    
+    # Byte images take display (sRGB) values, bottom-up
+    rgba = np.empty((height, width, 4), dtype=np.float32)
+    for row in range(0, height, 1024):
+        block = apply_colormap_lut(data[::-1][row:row + 1024], lut, MAP_RANGE['from_min'], MAP_RANGE['from_max'])
+        rgba[row:row + 1024, :, :3] = linear_to_srgb(block[..., :3])
+        rgba[row:row + 1024, :, 3] = block[..., 3]
+    img.pixels.foreach_set(rgba.ravel())
+    img.update()
+    img["source_path"] = geotiff_path
+    
+    print(f"Colors baked: {width} x {height} ({DISPLAY_COLOR}, {MAP_RANGE['from_min']:g} to {MAP_RANGE['from_max']:g}) in {time.perf_counter() - start:.2f}s")
+    return img
+
+def load_data_image(geotiff_path):
+    """Load the data TIFF as a Non-Color Blender image, returns None on failure"""
+    if not geotiff_path or not os.path.exists(geotiff_path):
+        print(f"⌧ Texture not found: {geotiff_path}")
+        return None
+    
+    if PREBAKED_COLORS:
+        try:
+            return create_color_image(geotiff_path)
+        except Exception as e:
+            print(f"⌧ Failed to bake colors: {e}")
+            return None
+    
+    try:
+        img = ingest_data_image(geotiff_path) or bpy.data.images.load(geotiff_path)
+    except Exception as e:
+        print(f"⌧ Failed to load texture: {e}")
+        return None
+    
+    # Set to Non-Color for data
+    try:
+        img.colorspace_settings.name = 'Non-Color'
+        print("Image colorspace set to Non-Color")
+    except:
+        try:
+            img.color_space = 'Non-Color'
+            print("Image colorspace set to Non-Color (legacy)")
+        except:
+            print("Could not set colorspace")
+    
+    img["source_stamp"] = input_stamp(geotiff_path)
+    print(f"Texture loaded: {os.path.basename(geotiff_path)}")
+    return img
+
+def create_climate_material(obj, geotiff_path, is_robinson=False):
+    """Create climate material - works for both sphere and Robinson"""
+    material_name = "robinson_material" if is_robinson else "climate_material"
+    mat = bpy.data.materials.new(name=material_name)
+    mat.use_nodes = True
+    obj.data.materials.append(mat)
+    
+    nodes = mat.node_tree.nodes
+    links = mat.node_tree.links
+    nodes.clear()
+    
+    print(f"Creating {'Robinson' if is_robinson else 'sphere'} material for colormap: {DISPLAY_COLOR}")
+    
+    # Main nodes
+    output = nodes.new(type='ShaderNodeOutputMaterial')
+    output.location = (300, 300)
+    
+    principled = nodes.new(type='ShaderNodeBsdfPrincipled')
+    principled.location = (-236.5, 430)
     principled.inputs['Roughness'].default_value = 0.6 if WOW_MODE else 0.95
     
     # Texture nodes
@@ -466,30 +1980,14 @@ def create_climate_material(obj, geotiff_path, is_robinson=False):
         env_tex.location = (-2318.3, 57.9)
         env_tex.label = "Sphere Data"
     
+    data_tex = image_tex if is_robinson else env_tex
+    data_tex.name = DATA_NODE_NAMES["texture"]
+    
     # Load main texture
     geotiff_path = os.path.abspath(geotiff_path)
-    if geotiff_path and os.path.exists(geotiff_path):
-        try:
-            img = bpy.data.images.load(geotiff_path)
-            if is_robinson:
-                image_tex.image = img
-            else:
-                env_tex.image = img
-            
-            # Set to Non-Color for data
-            try:
-                img.colorspace_settings.name = 'Non-Color'
-                print("Image colorspace set to Non-Color")
-            except:
-                try:
-                    img.color_space = 'Non-Color'
-                    print("Image colorspace set to Non-Color (legacy)")
-                except:
-                    print("Could not set colorspace")
-            
-            print(f"Texture loaded: {os.path.basename(geotiff_path)}")
-        except Exception as e:
-            print(f"⌧ Failed to load texture: {e}")
+    img = load_data_image(geotiff_path)
+    if img is not None:
+        data_tex.image = img
     
     # Alpha mask for Robinson
     alpha_tex = None
@@ -522,6 +2020,7 @@ def create_climate_material(obj, geotiff_path, is_robinson=False):
     
     # Data processing nodes
     map_range = nodes.new(type='ShaderNodeMapRange')
+    map_range.name = DATA_NODE_NAMES["map_range"]
     map_range.location = (-1854.1, 341.0)
     map_range.inputs['From Min'].default_value = MAP_RANGE['from_min']
     map_range.inputs['From Max'].default_value = MAP_RANGE['from_max']
@@ -529,6 +2028,7 @@ def create_climate_material(obj, geotiff_path, is_robinson=False):
     map_range.inputs['To Max'].default_value = MAP_RANGE['to_max']
     
     color_ramp = nodes.new(type='ShaderNodeValToRGB')
+    color_ramp.name = DATA_NODE_NAMES["color_ramp"]
     color_ramp.location = (-1678.3, 633.2)
     color_ramp.width = 700
     color_ramp.label = DISPLAY_COLOR
@@ -566,7 +2066,7 @@ def create_climate_material(obj, geotiff_path, is_robinson=False):
         if is_robinson:
             # Robinson connections (Image Texture)
             links.new(tex_coord.outputs['UV'], image_tex.inputs['Vector'])
-            links.new(image_tex.outputs['Color'], map_range.inputs['Value'])
+            data_value = image_tex.outputs['Color']
             
             # Connect alpha mask if available
             if alpha_tex:
@@ -576,22 +2076,59 @@ def create_climate_material(obj, geotiff_path, is_robinson=False):
             # Sphere connections (Environment Texture)
             links.new(tex_coord.outputs['Object'], mapping.inputs['Vector'])
             links.new(mapping.outputs['Vector'], env_tex.inputs['Vector'])
-            links.new(env_tex.outputs['Color'], map_range.inputs['Value'])
+            if VIEWPORT_CROPS:
+                data_value = add_viewport_crop_nodes(nodes, links, mapping, env_tex)
+            else:
+                data_value = env_tex.outputs['Color']
+        
+        if TEXTURE_ENCODING != "float32":
+            # De-quantize float16/uint16 texels back to data values
+            decode = nodes.new(type='ShaderNodeMath')
+            decode.name = DATA_NODE_NAMES["decode"]
+            decode.label = f"Decode {TEXTURE_ENCODING}"
+            decode.location = (-2050, 341.0)
+            decode.operation = 'MULTIPLY_ADD'
+            if data_tex.image is not None:
+                set_decode_node(decode, data_tex.image)
+            links.new(data_value, decode.inputs[0])
+            data_value = decode.outputs['Value']
+        
+        links.new(data_value, map_range.inputs['Value'])
         
         # Common connections
-        links.new(map_range.outputs['Result'], color_ramp.inputs['Fac'])
-        links.new(color_ramp.outputs['Color'], principled.inputs['Base Color'])
-        links.new(color_ramp.outputs['Color'], principled.inputs['Emission Color'])
+        if PREBAKED_COLORS:
+            # Texture already holds the colormapped colors
+            color = data_value
+        elif LUT_TEXTURE:
+            color = add_lut_texture_nodes(nodes, links, map_range.outputs['Result'])
+        else:
+            links.new(map_range.outputs['Result'], color_ramp.inputs['Fac'])
+            color = color_ramp.outputs['Color']
         
-        if WOW_MODE:
-            links.new(color_ramp.outputs['Color'], math_power.inputs[0])
-            links.new(math_power.outputs['Value'], principled.inputs['Emission Strength'])
+        height = color
+        if DATA_PASS:
+            # Relief from the data value, so the lighting passes do not depend on the colormap
+            height = map_range.outputs['Result']
+            # White, non-emitting surface: the diffuse/glossy passes hold pure lighting
+            principled.inputs['Base Color'].default_value = (1.0, 1.0, 1.0, 1.0)
+            principled.inputs['Emission Strength'].default_value = 0.0
+            aov = nodes.new(type='ShaderNodeOutputAOV')
+            aov.location = (300, 0)
+            aov.aov_name = DATA_PASS_AOV
+            links.new(data_value, aov.inputs['Value'])
         else:
-            principled.inputs['Emission Strength'].default_value = 1.0
+            links.new(color, principled.inputs['Base Color'])
+            links.new(color, principled.inputs['Emission Color'])
+            
+            if WOW_MODE:
+                links.new(color, math_power.inputs[0])
+                links.new(math_power.outputs['Value'], principled.inputs['Emission Strength'])
+            else:
+                principled.inputs['Emission Strength'].default_value = 1.0
         
-        links.new(color_ramp.outputs['Color'], bump.inputs['Height'])
+        links.new(height, bump.inputs['Height'])
         links.new(bump.outputs['Normal'], principled.inputs['Normal'])
-        links.new(color_ramp.outputs['Color'], displacement.inputs['Height'])
+        links.new(height, displacement.inputs['Height'])
         links.new(displacement.outputs['Displacement'], output.inputs['Displacement'])
         links.new(principled.outputs['BSDF'], output.inputs['Surface'])
         
@@ -602,6 +2139,162 @@ def create_climate_material(obj, geotiff_path, is_robinson=False):
     
     return mat
 
+def update_climate_material(mat, geotiff_path):
+    """Swap data image, map range and color ramp of an existing climate material"""
+    nodes = mat.node_tree.nodes
+    data_tex = nodes.get(DATA_NODE_NAMES["texture"])
+    map_range = nodes.get(DATA_NODE_NAMES["map_range"])
+    color_ramp = nodes.get(DATA_NODE_NAMES["color_ramp"])
+    
+    # Swap the data image and free the previous one, unless it holds the same field of an unchanged file
+    geotiff_path = os.path.abspath(geotiff_path)
+    old_img = data_tex.image
+    if (PREBAKED_COLORS or old_img is None or not os.path.exists(geotiff_path)
+            or old_img.get("source_stamp") != input_stamp(geotiff_path)):
+        img = load_data_image(geotiff_path)
+        if img is None:
+            return False
+        data_tex.image = img
+        if old_img is not None and old_img.users == 0:
+            bpy.data.images.remove(old_img)
+    
+    decode = nodes.get(DATA_NODE_NAMES["decode"])
+    if decode is not None:
+        set_decode_node(decode, data_tex.image)
+    
+    map_range.inputs['From Min'].default_value = MAP_RANGE['from_min']
+    map_range.inputs['From Max'].default_value = MAP_RANGE['from_max']
+    map_range.inputs['To Min'].default_value = MAP_RANGE['to_min']
+    map_range.inputs['To Max'].default_value = MAP_RANGE['to_max']
+    
+    if LUT_TEXTURE:
+        lut_tex = nodes.get("data_color_lut")
+        old_lut = lut_tex.image
+        lut_tex.image = create_lut_image(DISPLAY_COLOR)
+        lut_tex.label = f"{DISPLAY_COLOR} LUT"
+        if old_lut is not None and old_lut.users == 0:
+            bpy.data.images.remove(old_lut)
+    else:
+        color_ramp.label = DISPLAY_COLOR
+        setup_color_ramp(color_ramp, DISPLAY_COLOR)
+    
+    print(f"Material updated: {os.path.basename(geotiff_path)} ({DISPLAY_COLOR}, {MAP_RANGE['from_min']:g} to {MAP_RANGE['from_max']:g})")
+    return True
+
+def camera_location(lat, lon, distance):
+    """Camera position looking at the sphere center from (lat, lon) in degrees"""
+    lat_rad = math.radians(lat)
+    lon_rad = math.radians(lon)
+    
+    x = distance * math.cos(lat_rad) * math.sin(lon_rad)
+    y = -distance * math.cos(lat_rad) * math.cos(lon_rad)
+    z = distance * math.sin(lat_rad)
+    return x, y, z
+
+def create_lut_image(colormap_name):
+    """1D float image (LUT size x 1) of a colormap LUT"""
+    lut = build_colormap_lut(colormap_name)
+    img = bpy.data.images.new(f"lut_{colormap_name}", width=len(lut), height=1, alpha=True, float_buffer=True, is_data=True)
+    img.pixels.foreach_set(lut.ravel())
+    img.update()
+    return img
+
+def add_lut_texture_nodes(nodes, links, fac):
+    """Color through a 1D LUT image texture, returns the color socket"""
+    size = COLORMAP_SETTINGS["lut_size"]
+    
+    # Hit texel centers: 0 -> first texel, 1 -> last texel
+    lut_coord = nodes.new(type='ShaderNodeMath')
+    lut_coord.operation = 'MULTIPLY_ADD'
+    lut_coord.location = (-1678.3, 200)
+    links.new(fac, lut_coord.inputs[0])
+    lut_coord.inputs[1].default_value = (size - 1) / size
+    lut_coord.inputs[2].default_value = 0.5 / size
+    
+    lut_uv = nodes.new(type='ShaderNodeCombineXYZ')
+    lut_uv.location = (-1478.3, 200)
+    lut_uv.inputs['Y'].default_value = 0.5
+    links.new(lut_coord.outputs['Value'], lut_uv.inputs['X'])
+    
+    lut_tex = nodes.new(type='ShaderNodeTexImage')
+    lut_tex.name = "data_color_lut"
+    lut_tex.label = f"{DISPLAY_COLOR} LUT"
+    lut_tex.location = (-1278.3, 200)
+    lut_tex.extension = 'EXTEND'
+    lut_tex.interpolation = 'Linear'
+    lut_tex.image = create_lut_image(DISPLAY_COLOR)
+    links.new(lut_uv.outputs['Vector'], lut_tex.inputs['Vector'])
+    print(f"✓ Colormap '{DISPLAY_COLOR}' applied as {size} entry LUT texture")
+    return lut_tex.outputs['Color']
+
+def add_viewport_crop_nodes(nodes, links, mapping, env_tex):
+    """Sample a per camera crop texture inside its window and the global texture outside
+    
+    The equirectangular (u, v) of the Environment Texture is rebuilt with math
+    nodes and shifted/scaled into the crop window, whose offsets are set per
+    camera by apply_viewport_crop(). Returns the data value socket.
+    """
+    separate = nodes.new(type='ShaderNodeSeparateXYZ')
+    separate.location = (-2450, -300)
+    links.new(mapping.outputs['Vector'], separate.inputs['Vector'])
+    
+    def math_node(operation, location, *inputs):
+        node = nodes.new(type='ShaderNodeMath')
+        node.operation = operation
+        node.location = location
+        for i, value in enumerate(inputs):
+            if isinstance(value, (int, float)):
+                node.inputs[i].default_value = value
+            else:
+                links.new(value, node.inputs[i])
+        return node
+    
+    # u = 0.5 - atan2(y, x) / 2pi, v = 0.5 + atan2(z, |xy|) / pi
+    atan_u = math_node('ARCTAN2', (-2250, -250), separate.outputs['Y'], separate.outputs['X'])
+    u = math_node('MULTIPLY_ADD', (-2050, -250), atan_u.outputs['Value'], -1 / (2 * math.pi), 0.5)
+    xy = nodes.new(type='ShaderNodeCombineXYZ')
+    xy.location = (-2250, -450)
+    links.new(separate.outputs['X'], xy.inputs['X'])
+    links.new(separate.outputs['Y'], xy.inputs['Y'])
+    xy_length = nodes.new(type='ShaderNodeVectorMath')
+    xy_length.operation = 'LENGTH'
+    xy_length.location = (-2050, -450)
+    links.new(xy.outputs['Vector'], xy_length.inputs[0])
+    atan_v = math_node('ARCTAN2', (-1850, -450), separate.outputs['Z'], xy_length.outputs['Value'])
+    v = math_node('MULTIPLY_ADD', (-1650, -450), atan_v.outputs['Value'], 1 / math.pi, 0.5)
+    
+    # Crop coordinates, u wrapped around the date line
+    crop_u_offset = math_node('SUBTRACT', (-1850, -250), u.outputs['Value'], 0.0)
+    crop_u_offset.name = "crop_u_offset"
+    crop_u_wrap = math_node('WRAP', (-1650, -250), crop_u_offset.outputs['Value'], 1.0, 0.0)
+    crop_u = math_node('MULTIPLY', (-1450, -250), crop_u_wrap.outputs['Value'], 1.0)
+    crop_u.name = "crop_u_scale"
+    crop_v_offset = math_node('SUBTRACT', (-1450, -450), v.outputs['Value'], 0.0)
+    crop_v_offset.name = "crop_v_offset"
+    crop_v = math_node('MULTIPLY', (-1250, -450), crop_v_offset.outputs['Value'], 1.0)
+    crop_v.name = "crop_v_scale"
+    
+    crop_uv = nodes.new(type='ShaderNodeCombineXYZ')
+    crop_uv.location = (-1250, -250)
+    links.new(crop_u.outputs['Value'], crop_uv.inputs['X'])
+    links.new(crop_v.outputs['Value'], crop_uv.inputs['Y'])
+    
+    crop_tex = nodes.new(type='ShaderNodeTexImage')
+    crop_tex.name = "data_crop_texture"
+    crop_tex.label = "Viewport Crop"
+    crop_tex.location = (-1050, -250)
+    crop_tex.extension = 'CLIP'
+    links.new(crop_uv.outputs['Vector'], crop_tex.inputs['Vector'])
+    
+    # Crop inside its window (alpha 1), global texture outside (alpha 0)
+    mix = nodes.new(type='ShaderNodeMix')
+    mix.data_type = 'FLOAT'
+    mix.location = (-2050, 100)
+    links.new(crop_tex.outputs['Alpha'], mix.inputs['Factor'])
+    links.new(env_tex.outputs['Color'], mix.inputs['A'])
+    links.new(crop_tex.outputs['Color'], mix.inputs['B'])
+    return mix.outputs['Result']
+
 def create_continent_cameras():
     """Create cameras for each continent and interest point"""
     cameras = {}
@@ -624,12 +2317,7 @@ def create_continent_cameras():
         print(f"  DOF enabled (f/{aperture_fstop}, focus at sphere surface: {focus_dist} units)")
     
     for location_name, (lat, lon) in selected_positions.items():
-        lat_rad = math.radians(lat)
-        lon_rad = math.radians(lon)
-        
-        x = distance * math.cos(lat_rad) * math.sin(lon_rad)
-        y = -distance * math.cos(lat_rad) * math.cos(lon_rad)
-        z = distance * math.sin(lat_rad)
+        x, y, z = camera_location(lat, lon, distance)
         
         bpy.ops.object.camera_add(location=(x, y, z))
         camera = bpy.context.active_object
@@ -673,24 +2361,22 @@ def create_robinson_camera():
     
     return {"TopView": camera}
 
+def render_resolution(obj_type="sphere", lowres=False):
+    """Output resolution (x, y) for sphere or Robinson"""
+    if obj_type == "robinson":
+        # 4:2 aspect ratio for Robinson
+        return ROBINSON_SETTINGS["resolution_width"], ROBINSON_SETTINGS["resolution_width"] // 2
+    # Square for sphere
+    if lowres:
+        return 200, 200
+    return 2000, 2000
+
 def setup_render_settings(obj_type="sphere", lowres=False):
     """Configure render settings for sphere or Robinson"""
     scene = bpy.context.scene
     
-    if obj_type == "robinson":
-        # 4:2 aspect ratio for Robinson
-        scene.render.resolution_x = ROBINSON_SETTINGS["resolution_width"]
-        scene.render.resolution_y = ROBINSON_SETTINGS["resolution_width"] // 2
-        print(f"Robinson render settings: {scene.render.resolution_x} x {scene.render.resolution_y}")
-    else:
-        # Square for sphere
-        if lowres:
-            scene.render.resolution_x = 200
-            scene.render.resolution_y = 200
-        else:
-            scene.render.resolution_x = 2000
-            scene.render.resolution_y = 2000
-        print(f"Sphere render settings: {scene.render.resolution_x} x {scene.render.resolution_y}")
+    scene.render.resolution_x, scene.render.resolution_y = render_resolution(obj_type, lowres)
+    print(f"{obj_type.capitalize()} render settings: {scene.render.resolution_x} x {scene.render.resolution_y}")
     
     scene.render.resolution_percentage = 100
     scene.render.image_settings.file_format = 'PNG'
@@ -707,6 +2393,11 @@ def setup_render_settings(obj_type="sphere", lowres=False):
     if lowres:
         scene.cycles.samples = 32
     
+    if args.threads_per_worker > 0:
+        scene.render.threads_mode = 'FIXED'
+        scene.render.threads = args.threads_per_worker
+        print(f"  Render threads fixed to {args.threads_per_worker}")
+    
     try:
         cycles_prefs = bpy.context.preferences.addons['cycles'].preferences
         cycles_prefs.compute_device_type = 'CUDA'
@@ -765,37 +2456,6 @@ def format_range_value(value):
     else:
         return f"{value:g}"
 
-def ensure_matplotlib():
-    try:
-        import matplotlib
-        return True
-    except ImportError:
-        try:
-            import subprocess
-            import sys
-            import os
-            
-            if sys.platform == "win32":
-                python_exe = os.path.join(sys.prefix, 'bin', 'python.exe')
-            else:
-                python_exe = os.path.join(sys.prefix, 'bin', 'python3')
-            
-            result = subprocess.call([
-                python_exe, '-m', 'pip', 'install', 
-                'matplotlib', '--user'
-            ])
-            
-            if result == 0:
-                try:
-                    import matplotlib
-                    return True
-                except ImportError:
-                    return False
-            else:
-                return False
-        except Exception:
-            return False
-
 def ensure_pil():
     try:
         from PIL import Image, ImageEnhance
@@ -827,342 +2487,378 @@ def ensure_pil():
         except Exception:
             return False
 
-def create_colorbar_overlay(sphere_image_path, colorbar_image_path, output_path, input_filename=None):
-    if not ensure_pil():
-        return False
+def paste_rgba(dst, src, x, y, mask=None):
+    """Alpha blend src into dst at (x, y) in place, with the semantics of PIL's paste with a mask"""
+    height, width = src.shape[:2]
+    if mask is None:
+        mask = src[..., 3]
+    region = dst[y:y + height, x:x + width]
+    alpha = mask[..., None].astype(np.float32) / 255.0
+    blended = src.astype(np.float32) * alpha + region.astype(np.float32) * (1.0 - alpha)
+    region[:] = np.rint(blended).astype(np.uint8)
+
+def colorbar_panel(colorbar):
+    """Colorbar RGBA array on its theme background box"""
+    if OVERLAY_SETTINGS["background_opacity"] <= 0:
+        return colorbar
     
-    try:
-        from PIL import Image, ImageEnhance, ImageDraw, ImageFont
-        
-        try:
-            sphere_img = Image.open(sphere_image_path).convert('RGBA')
-            colorbar_img = Image.open(colorbar_image_path).convert('RGBA')
-        except FileNotFoundError:
-            return False
-        
-        sphere_width, sphere_height = sphere_img.size
-        colorbar_width, colorbar_height = colorbar_img.size
-        
-        scale_factor = OVERLAY_SETTINGS["colorbar_scale"]
-        new_colorbar_height = int(sphere_height * scale_factor)
-        scale_ratio = new_colorbar_height / colorbar_height
-        new_colorbar_width = int(colorbar_width * scale_ratio)
-        
-        colorbar_resized = colorbar_img.resize((new_colorbar_width, new_colorbar_height), Image.Resampling.LANCZOS)
-        
-        if OVERLAY_SETTINGS["background_opacity"] > 0:
-            bg_padding = 10
-            bg_width = new_colorbar_width + (bg_padding * 2)
-            bg_height = new_colorbar_height + (bg_padding * 2)
-            bg_alpha = int(255 * OVERLAY_SETTINGS["background_opacity"])
-
-            # Use theme background color
-            bg_color_name = OVERLAY_SETTINGS["background_color"]
-            if bg_color_name == "black":
-                bg_rgb = (0, 0, 0, bg_alpha)
-            elif bg_color_name == "white":
-                bg_rgb = (255, 255, 255, bg_alpha)
-            else:
-                bg_rgb = (0, 0, 0, bg_alpha)  # fallback to black
+    bg_padding = 10
+    bg_alpha = int(255 * OVERLAY_SETTINGS["background_opacity"])
+    bg_value = 255 if OVERLAY_SETTINGS["background_color"] == "white" else 0
+    
+    height, width = colorbar.shape[:2]
+    panel = np.empty((height + bg_padding * 2, width + bg_padding * 2, 4), dtype=np.uint8)
+    panel[..., :3] = bg_value
+    panel[..., 3] = bg_alpha
+    paste_rgba(panel, colorbar, bg_padding, bg_padding)
+    return panel
 
-            background = Image.new('RGBA', (bg_width, bg_height), bg_rgb)
-            bg_x = bg_padding
-            bg_y = bg_padding
-            background.paste(colorbar_resized, (bg_x, bg_y), colorbar_resized)
-            colorbar_final = background
-        else:
-            colorbar_final = colorbar_resized
-        
-        padding = OVERLAY_SETTINGS["padding"]
-        position = OVERLAY_SETTINGS["position"]
-        final_colorbar_width, final_colorbar_height = colorbar_final.size
-        
-        if position == "top_right":
-            x = sphere_width - final_colorbar_width - padding
-            y = padding
-        elif position == "top_left":
-            x = padding
-            y = padding
-        elif position == "bottom_right":
-            x = sphere_width - final_colorbar_width - padding
-            y = sphere_height - final_colorbar_height - padding
-        elif position == "bottom_left":
-            x = padding
-            y = sphere_height - final_colorbar_height - padding
-        else:
-            x = sphere_width - final_colorbar_width - padding
-            y = padding
-        
-        x = max(0, min(x, sphere_width - final_colorbar_width))
-        y = max(0, min(y, sphere_height - final_colorbar_height))
-        
-        composite = sphere_img.copy()
-        composite.paste(colorbar_final, (x, y), colorbar_final)
-        
-        if input_filename:
-            filename_prefix = input_filename.split('_')[0]
-            draw = ImageDraw.Draw(composite)
-            
-            text_color = OVERLAY_SETTINGS["colorbar_text"]
-            if text_color == "auto":
-                text_color = "white" if WOW_MODE else "black"
-            
-            if text_color == "white":
-                color_rgb = (255, 255, 255, 255)
-            else:
-                color_rgb = (0, 0, 0, 255)
-            
-            try:
-                font_size = max(24, int(sphere_height * 0.025))
-                font = ImageFont.truetype("arial.ttf", font_size)
-            except:
-                try:
-                    font = ImageFont.truetype("/System/Library/Fonts/Arial.ttf", font_size)
-                except:
-                    try:
-                        font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf", font_size)
-                    except:
-                        font = ImageFont.load_default()
-            
-            text_padding = 30
-            bbox = draw.textbbox((0, 0), filename_prefix, font=font)
-            text_width = bbox[2] - bbox[0]
-            text_height = bbox[3] - bbox[1]
-            
-            text_x = sphere_width - text_width - text_padding
-            text_y = sphere_height - text_height - text_padding
-            
-            draw.text((text_x, text_y), filename_prefix, fill=color_rgb, font=font)
-        
-        composite.save(output_path, 'PNG')
-        
-        sphere_img.close()
-        colorbar_img.close()
-        colorbar_resized.close()
-        if 'background' in locals():
-            background.close()
-        colorbar_final.close()
-        composite.close()
-        
-        return True
-        
-    except Exception:
-        return False
+def overlay_position(image_width, image_height, panel_width, panel_height):
+    """Top-left corner of the colorbar panel for the configured position"""
+    padding = OVERLAY_SETTINGS["padding"]
+    position = OVERLAY_SETTINGS["position"]
+    
+    if position == "top_left":
+        x, y = padding, padding
+    elif position == "bottom_right":
+        x, y = image_width - panel_width - padding, image_height - panel_height - padding
+    elif position == "bottom_left":
+        x, y = padding, image_height - panel_height - padding
+    else:  # top_right
+        x, y = image_width - panel_width - padding, padding
+    
+    x = max(0, min(x, image_width - panel_width))
+    y = max(0, min(y, image_height - panel_height))
+    return x, y
 
-def generate_scientific_colorbars(output_dir, variable_type, from_min, from_max, suffix="" ):
-    """Generate colorbars using the new colormap system"""
-    if not ensure_matplotlib():
-        return
+def composite_overlay(pixels, colorbar, input_filename=None):
+    """Composite colorbar and filename label onto a top-down (h, w, 4) uint8 RGBA image"""
+    from PIL import Image, ImageDraw
     
-    try:
-        import matplotlib
-        matplotlib.use('Agg')
-        
-        import matplotlib.pyplot as plt
-        import matplotlib.colors as mcolors
-        import numpy as np
-        
-        plt.ioff()
-        
-        if not os.path.exists(output_dir):
-            try:
-                os.makedirs(output_dir, exist_ok=True)
-            except OSError:
-                import tempfile
-                output_dir = tempfile.gettempdir()
-        
-        test_file = os.path.join(output_dir, "test_write_permissions.tmp")
-        try:
-            with open(test_file, 'w') as f:
-                f.write("test")
-            os.remove(test_file)
-        except OSError:
-            import tempfile
-            output_dir = tempfile.gettempdir()
-        
-        # Create colormap for matplotlib
-        if is_matplotlib_colormap(variable_type):
-            # Use matplotlib colormap directly
-            cmap = plt.get_cmap(variable_type)
-            print(f"Using matplotlib colormap directly: {variable_type}")
-        else:
-            # Create from custom colormap data
-            colors_data = get_colormap_data(variable_type)
-            if colors_data:
-                positions = [item[0] for item in colors_data]
-                colors = [item[1][:3] for item in colors_data]  # RGB only
-                cmap = mcolors.LinearSegmentedColormap.from_list(variable_type, list(zip(positions, colors)))
-                print(f"Created matplotlib colormap from custom data: {variable_type}")
-            else:
-                print(f"Warning: Could not create colormap for {variable_type}")
-                return
-        
-        for text_color in ['black', 'white']:
-            try:
-                fig, ax = plt.subplots(figsize=(2, 4.8))  
-                fig.patch.set_alpha(0.0)
-                ax.set_facecolor('none')
-                
-                norm = mcolors.Normalize(vmin=from_min, vmax=from_max)
-                cbar = fig.colorbar(
-                    plt.cm.ScalarMappable(norm=norm, cmap=cmap),
-                    ax=ax,
-                    fraction=0.8,
-                    pad=0.1
-                )
-                
-                cbar.ax.tick_params(
-                    colors=text_color, 
-                    labelsize=14,
-                    width=2,
-                    length=6
-                )
-                cbar.outline.set_edgecolor(text_color)
-                cbar.outline.set_linewidth(2)
-                
-                num_ticks = OVERLAY_SETTINGS["colorbar_steps"]
-                tick_values = np.linspace(from_min, from_max, num_ticks)
-                cbar.set_ticks(tick_values)
-                cbar.set_ticklabels([f'{val:.1f}' for val in tick_values])
-                
-                ax.remove()
-                
-                from_min_str = format_range_value(from_min)
-                from_max_str = format_range_value(from_max)
-                filename = f"{variable_type}_colorbar{suffix}_{from_min_str}_{from_max_str}_{text_color}.png"
-                filepath = os.path.join(output_dir, filename)
-                
-                os.makedirs(os.path.dirname(filepath), exist_ok=True)
-                
-                plt.savefig(
-                    filepath,
-                    dpi=300,
-                    bbox_inches='tight',
-                    transparent=True,
-                    pad_inches=0.1,
-                    facecolor='none'
-                )
-                
-            except Exception:
-                try:
-                    import tempfile
-                    alt_filepath = os.path.join(tempfile.gettempdir(), filename)
-                    
-                    plt.savefig(
-                        alt_filepath,
-                        dpi=300,
-                        bbox_inches='tight',
-                        transparent=True,
-                        pad_inches=0.1,
-                        facecolor='none'
-                    )
-                except Exception:
-                    pass
-            
-            finally:
-                try:
-                    plt.close(fig)
-                except:
-                    pass
-        
-        plt.close('all')
+    image_height, image_width = pixels.shape[:2]
+    composite = pixels.copy()
+    
+    # Colorbars are rasterized at their final height, only foreign sizes are resampled
+    target_height = int(image_height * OVERLAY_SETTINGS["colorbar_scale"])
+    if colorbar.shape[0] != target_height:
+        target_width = int(colorbar.shape[1] * target_height / colorbar.shape[0])
+        colorbar = np.asarray(Image.fromarray(colorbar, 'RGBA').resize((target_width, target_height), Image.Resampling.LANCZOS))
+    
+    panel = colorbar_panel(colorbar)
+    x, y = overlay_position(image_width, image_height, panel.shape[1], panel.shape[0])
+    paste_rgba(composite, panel, x, y)
+    
+    if input_filename:
+        filename_prefix = input_filename.split('_')[0]
+        color_value = 255 if get_colorbar_text_color() == "white" else 0
         
-        try:
-            plt.clf()
-            plt.cla()
-        except:
-            pass
+        font = get_font(max(24, int(image_height * 0.025)))
+        bbox = font.getbbox(filename_prefix)
+        text_padding = 30
+        text_x = image_width - (bbox[2] - bbox[0]) - text_padding
+        text_y = image_height - (bbox[3] - bbox[1]) - text_padding
         
-    except Exception:
-        pass
+        # Draw on the label region only, the rest of the image stays in NumPy
+        x0, y0 = max(0, text_x), max(0, text_y)
+        x1, y1 = min(image_width, text_x + bbox[2]), min(image_height, text_y + bbox[3])
+        if x1 > x0 and y1 > y0:
+            label = Image.fromarray(composite[y0:y1, x0:x1], 'RGBA')
+            ImageDraw.Draw(label).text((text_x - x0, text_y - y0), filename_prefix, fill=(color_value, color_value, color_value, 255), font=font)
+            composite[y0:y1, x0:x1] = np.asarray(label)
     
-    finally:
-        try:
-            import gc
-            gc.collect()
-            
-            if 'matplotlib.pyplot' in globals():
-                plt.close('all')
-        except:
-            pass
+    return composite
 
-def create_overlays_for_renders(output_dir, input_filename, suffix, obj_type):
-    if not COLORBAR_OVERLAY:
-        return
+def save_png(pixels, output_path):
+    """Encode a top-down RGBA uint8 array as PNG"""
+    from PIL import Image
+    Image.fromarray(pixels, 'RGBA').save(output_path, 'PNG')
+
+def create_colorbar_overlay(sphere_image_path, colorbar_image_path, output_path, input_filename=None):
+    """Composite a colorbar onto a rendered PNG, raises on failure"""
+    if not ensure_pil():
+        raise RuntimeError("Pillow is not available")
+    from PIL import Image
+    
+    with Image.open(sphere_image_path) as sphere_img:
+        pixels = np.asarray(sphere_img.convert('RGBA'))
+    with Image.open(colorbar_image_path) as colorbar_img:
+        colorbar = np.asarray(colorbar_img.convert('RGBA'))
     
+    save_png(composite_overlay(pixels, colorbar, input_filename), output_path)
+
+def get_colorbar_text_color():
+    """Text color of the colorbar for the current overlay theme"""
     colorbar_text = OVERLAY_SETTINGS["colorbar_text"]
     if colorbar_text == "auto":
         colorbar_text = "white" if WOW_MODE else "black"
+    return colorbar_text
 
-    from_min_str = format_range_value(MAP_RANGE['from_min'])
-    from_max_str = format_range_value(MAP_RANGE['from_max'])
-    colorbar_filename = f"{DISPLAY_COLOR}_colorbar{suffix}_{from_min_str}_{from_max_str}_{colorbar_text}.png"
-    colorbar_path = os.path.join(output_dir, colorbar_filename)
+def colorbar_cache_path(variable_type, from_min, from_max, text_color, height):
+    """Content-addressed cache path of a colorbar, shared by all runs and output directories"""
+    key = hashlib.sha256()
+    key.update(build_colormap_lut(variable_type, 256).tobytes())
+    key.update(repr((from_min, from_max, OVERLAY_SETTINGS["colorbar_steps"], text_color, OVERLAY_SETTINGS["colorbar_scale"], height)).encode())
+    return os.path.join(CACHE_SETTINGS["dir"], "colorbars", f"{variable_type}_{key.hexdigest()[:24]}.png")
+
+FONT_CANDIDATES = [
+    "arial.ttf",
+    "/System/Library/Fonts/Arial.ttf",
+    "/System/Library/Fonts/Supplemental/Arial.ttf",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"
+]
+FONTS = {}  # Loaded PIL fonts by size
+
+def get_font(font_size):
+    """First available TrueType font of FONT_CANDIDATES, cached by size"""
+    if font_size not in FONTS:
+        from PIL import ImageFont
+        
+        for candidate in FONT_CANDIDATES:
+            try:
+                FONTS[font_size] = ImageFont.truetype(candidate, font_size)
+                break
+            except OSError:
+                continue
+        else:
+            FONTS[font_size] = ImageFont.load_default(size=font_size)
+    return FONTS[font_size]
+
+# Colorbar layout as fractions of the colorbar height, measured from the former
+# matplotlib colorbars (2 x 4.8 inch figure, 300 dpi, 14 pt labels, 2 pt lines)
+COLORBAR_LAYOUT = {
+    "padding": 0.0244,      # Transparent border
+    "bar_top": 0.0424,
+    "bar_bottom": 0.9454,
+    "bar_width": 0.0473,
+    "line_width": 0.0068,   # Outline and tick thickness
+    "tick_length": 0.0204,
+    "label_pad": 0.0119,
+    "font_size": 0.0475
+}
+
+def rasterize_colorbar(variable_type, from_min, from_max, text_color, height):
+    """Draw a colorbar straight at its final pixel height with NumPy and PIL"""
+    from PIL import Image, ImageDraw
     
-    if not os.path.exists(colorbar_path):
-        print(f"Colorbar not found: {colorbar_path}")
-        return
+    layout = {key: value * height for key, value in COLORBAR_LAYOUT.items()}
+    line_width = max(1, int(round(layout["line_width"])))
+    font = get_font(max(6, int(round(layout["font_size"]))))
+    text_rgba = (255, 255, 255, 255) if text_color == "white" else (0, 0, 0, 255)
     
-    # Find rendered files to overlay
-    rendered_files = []
+    num_ticks = OVERLAY_SETTINGS["colorbar_steps"]
+    tick_values = np.linspace(from_min, from_max, num_ticks)
+    labels = [f'{val:.1f}' for val in tick_values]
     
-    if obj_type == "sphere":
-        # All continent and interest positions
-        all_positions = {**CONTINENT_POSITIONS, **INTEREST_POSITIONS}
-        selected_positions = {key: all_positions[key] for key in args.locations if key in all_positions}
-        for location_name in selected_positions.keys():
-            if input_filename:
-                filename = f"{input_filename}_{location_name}{suffix}.png"
-            else:
-                filename = f"sphere_{location_name}{suffix}.png"
-            
-            if os.path.exists(os.path.join(output_dir, filename)):
-                rendered_files.append(filename)
+    bar_left = int(round(layout["padding"] + line_width / 2))
+    bar_right = bar_left + int(round(layout["bar_width"]))
+    bar_top = int(round(layout["bar_top"]))
+    bar_bottom = int(round(layout["bar_bottom"]))
+    label_x = bar_right + layout["tick_length"] + layout["label_pad"]
+    label_width = max(font.getlength(label) for label in labels)
+    width = int(math.ceil(label_x + label_width + layout["padding"]))
     
-    else:  # robinson
-        # Robinson has only TopView camera
-        if input_filename:
-            filename = f"{input_filename}_TopView{suffix}.png"
-        else:
-            filename = f"robinson_TopView{suffix}.png"
-        
-        filepath = os.path.join(output_dir, filename)
-        if os.path.exists(filepath):
-            rendered_files.append(filename)
-            print(f"Found Robinson file for overlay: {filename}")
-        else:
-            print(f"Robinson file not found for overlay: {filename}")
+    # Gradient, vmax at the top
+    canvas = np.zeros((height, width, 4), dtype=np.uint8)
+    colors = colorbar_colors(variable_type, 256)
+    fractions = 1.0 - (np.arange(bar_top, bar_bottom) + 0.5 - bar_top) / (bar_bottom - bar_top)
+    rows = colors[np.rint(fractions * (len(colors) - 1)).astype(np.intp)]
+    canvas[bar_top:bar_bottom, bar_left:bar_right, :3] = np.rint(rows[:, None, :] * 255)
+    canvas[bar_top:bar_bottom, bar_left:bar_right, 3] = 255
     
-    if not rendered_files:
-        print(f"No rendered files found for {obj_type} overlay")
-        return
+    img = Image.fromarray(canvas, "RGBA")
+    draw = ImageDraw.Draw(img)
+    half = line_width / 2
+    draw.rectangle([bar_left - half, bar_top - half, bar_right + half - 1, bar_bottom + half - 1], outline=text_rgba, width=line_width)
     
-    success_count = 0
-    for rendered_filename in rendered_files:
-        rendered_path = os.path.join(output_dir, rendered_filename)
-        base_name = rendered_filename.replace('.png', '')
-        composite_filename = f"{base_name}_colorbar.png"
-        composite_path = os.path.join(output_dir, composite_filename)
-        
-        print(f"Creating overlay: {rendered_filename} + colorbar -> {composite_filename}")
-        
-        if create_colorbar_overlay(rendered_path, colorbar_path, composite_path, input_filename):
-            success_count += 1
-            print(f"  Success: {composite_filename}")
-        else:
-            print(f"  Failed: {composite_filename}")
+    for value, label in zip(tick_values, labels):
+        y = bar_bottom - (value - from_min) / (from_max - from_min) * (bar_bottom - bar_top)
+        draw.rectangle([bar_right, y - half, bar_right + layout["tick_length"], y + half - 1], fill=text_rgba)
+        draw.text((label_x, y), label, fill=text_rgba, font=font, anchor="lm")
     
-    print(f"Created {success_count}/{len(rendered_files)} overlay composites for {obj_type}")
+    return img
 
-def render_object_cameras(cameras, input_filename, output_dir, obj_type="sphere"):
-    """Render views from cameras"""
-    data_sphere_dir = os.path.dirname(output_dir)
+def draw_colorbar(filepath, variable_type, from_min, from_max, text_color, height):
+    """Write a single colorbar PNG"""
+    img = rasterize_colorbar(variable_type, from_min, from_max, text_color, height)
     
-    # Ensure output directory exists
-    os.makedirs(output_dir, exist_ok=True)
-    print(f"Output directory: {output_dir}")
+    # Write through a temporary file, the cache is shared between processes
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    tmp_path = f"{filepath}.{os.getpid()}.tmp.png"
+    img.save(tmp_path, 'PNG')
+    os.replace(tmp_path, filepath)
+
+def generate_scientific_colorbars(output_dir, variable_type, from_min, from_max, suffix="", text_colors=("black", "white"), height=None):
+    """Generate colorbars at their overlay size, reusing cached ones"""
+    if not ensure_pil():
+        return
     
-    # Build filename suffix
+    if height is None:
+        height = int(render_resolution(RENDER_OBJECT, args.lowres)[1] * OVERLAY_SETTINGS["colorbar_scale"])
+    
+    os.makedirs(output_dir, exist_ok=True)
+    from_min_str = format_range_value(from_min)
+    from_max_str = format_range_value(from_max)
+    
+    for text_color in text_colors:
+        filename = f"{variable_type}_colorbar{suffix}_{from_min_str}_{from_max_str}_{text_color}.png"
+        filepath = os.path.join(output_dir, filename)
+        
+        try:
+            if not CACHE_SETTINGS["enabled"]:
+                draw_colorbar(filepath, variable_type, from_min, from_max, text_color, height)
+                continue
+            
+            cached_path = colorbar_cache_path(variable_type, from_min, from_max, text_color, height)
+            if os.path.exists(cached_path):
+                print(f"Colorbar cache hit: {filename}")
+            else:
+                draw_colorbar(cached_path, variable_type, from_min, from_max, text_color, height)
+                print(f"Colorbar cache miss: {filename}")
+            
+            if os.path.abspath(cached_path) != os.path.abspath(filepath):
+                if os.path.exists(filepath):
+                    os.remove(filepath)
+                try:
+                    os.link(cached_path, filepath)
+                except OSError:
+                    shutil.copyfile(cached_path, filepath)
+        except Exception as e:
+            print(f"Colorbar failed ({filename}): {e}")
+
+# Display color spaces of the view transforms, used to color manage the
+# render buffer in the compositor the same way PNG saving does
+VIEW_TRANSFORM_COLORSPACES = {
+    "Standard": "sRGB",
+    "Filmic": "Filmic sRGB",
+    "AgX": "AgX Base sRGB",
+    "Khronos PBR Neutral": "Khronos PBR Neutral sRGB",
+}
+SCENE_LINEAR_COLORSPACES = ["Linear Rec.709", "Linear"]
+
+def setup_overlay_compositor():
+    """Route the color managed render to a Viewer node, returns False if the view transform is unsupported"""
+    scene = bpy.context.scene
+    view = scene.view_settings
+    colorspace = VIEW_TRANSFORM_COLORSPACES.get(view.view_transform)
+    if (colorspace is None or scene.display_settings.display_device != "sRGB" or view.look != "None"
+            or view.exposure != 0 or view.gamma != 1 or view.use_curve_mapping):
+        print(f"  View transform {view.view_transform} not supported in memory, overlays are made from the PNGs")
+        return False
+    
+    scene.use_nodes = True
+    tree = scene.node_tree
+    render_layers = tree.nodes.get("Render Layers") or tree.nodes.new(type='CompositorNodeRLayers')
+    
+    viewer = tree.nodes.get("overlay_viewer")
+    if viewer is None:
+        # Straight alpha first, like the PNG writer
+        straight = tree.nodes.new(type='CompositorNodePremulKey')
+        straight.name = "overlay_straight_alpha"
+        straight.mapping = 'PREMUL_TO_STRAIGHT'
+        straight.location = (300, 300)
+        
+        convert = tree.nodes.new(type='CompositorNodeConvertColorSpace')
+        convert.name = "overlay_colorspace"
+        convert.location = (500, 300)
+        for linear in SCENE_LINEAR_COLORSPACES:
+            try:
+                convert.from_color_space = linear
+                break
+            except TypeError:
+                continue
+        try:
+            convert.to_color_space = colorspace
+        except TypeError:
+            print(f"  Color space {colorspace} not available, overlays are made from the PNGs")
+            return False
+        
+        viewer = tree.nodes.new(type='CompositorNodeViewer')
+        viewer.name = "overlay_viewer"
+        viewer.location = (700, 300)
+        if hasattr(viewer, "use_alpha"):
+            viewer.use_alpha = True
+        
+        tree.links.new(render_layers.outputs["Image"], straight.inputs[0])
+        tree.links.new(straight.outputs[0], convert.inputs[0])
+        tree.links.new(convert.outputs[0], viewer.inputs[0])
+    
+    tree.nodes.active = viewer
+    return True
+
+def read_render_pixels():
+    """Color managed pixels of the last render as a top-down (h, w, 4) uint8 RGBA array"""
+    img = bpy.data.images["Viewer Node"]
+    width, height = img.size
+    expected = (bpy.context.scene.render.resolution_x, bpy.context.scene.render.resolution_y)
+    if (width, height) != expected:
+        raise RuntimeError(f"viewer buffer is {width}x{height}, expected {expected[0]}x{expected[1]}")
+    
+    pixels = np.empty(width * height * 4, dtype=np.float32)
+    img.pixels.foreach_get(pixels)
+    pixels = np.clip(pixels.reshape(height, width, 4)[::-1], 0.0, 1.0)
+    return np.rint(pixels * 255.0).astype(np.uint8)
+
+def overlay_colorbar_path(output_dir, suffix):
+    """Path of the colorbar generate_scientific_colorbars wrote for the current settings"""
+    from_min_str = format_range_value(MAP_RANGE['from_min'])
+    from_max_str = format_range_value(MAP_RANGE['from_max'])
+    colorbar_filename = f"{DISPLAY_COLOR}_colorbar{suffix}_{from_min_str}_{from_max_str}_{get_colorbar_text_color()}.png"
+    return os.path.join(output_dir, colorbar_filename)
+
+def start_postprocess_pipeline(num_workers):
+    """Start the overlay worker threads, returns submit(name, task) and finish() -> (done, errors)"""
+    import threading
+    import queue
+    
+    # Bounded: the render loop blocks while num_workers frames are waiting
+    frame_queue = queue.Queue(maxsize=max(1, num_workers))
+    done = []
+    errors = {}
+    lock = threading.Lock()
+    
+    def run_task(name, task):
+        try:
+            task()
+            with lock:
+                done.append(name)
+            print(f"  Saved: {name}")
+        except Exception as e:
+            with lock:
+                errors[name] = f"{type(e).__name__}: {e}"
+            print(f"  Overlay failed ({name}): {type(e).__name__}: {e}")
+    
+    def worker_loop():
+        while True:
+            item = frame_queue.get()
+            if item is None:
+                break
+            run_task(*item)
+    
+    threads = [threading.Thread(target=worker_loop, daemon=True) for _ in range(max(0, num_workers))]
+    for thread in threads:
+        thread.start()
+    
+    def submit(name, task):
+        if threads:
+            frame_queue.put((name, task))
+        else:
+            run_task(name, task)
+    
+    def finish():
+        for _ in threads:
+            frame_queue.put(None)
+        for thread in threads:
+            thread.join()
+        return done, errors
+    
+    return submit, finish
+
+def composite_render_pixels(pixels, colorbar, composite_path, input_filename):
+    """Overlay task for pixels taken from the render buffer"""
+    save_png(composite_overlay(pixels, colorbar, input_filename), composite_path)
+
+def build_filename_suffix(obj_type="sphere", include_range=True):
+    """Build the filename suffix from the current render settings"""
     suffix = ""
     if WOW_MODE:
         suffix += "_wow"
@@ -1178,52 +2874,1706 @@ def render_object_cameras(cameras, input_filename, output_dir, obj_type="sphere"
         fstop_str = f"{CAMERA_SETTINGS['aperture_fstop']:.1f}".replace('.', '')
         suffix += f"_dof_f{fstop_str}"
     
-    from_min_str = format_range_value(MAP_RANGE['from_min'])
-    from_max_str = format_range_value(MAP_RANGE['from_max'])
-    suffix += f"_{from_min_str}_{from_max_str}"
+    if include_range:
+        from_min_str = format_range_value(MAP_RANGE['from_min'])
+        from_max_str = format_range_value(MAP_RANGE['from_max'])
+        suffix += f"_{from_min_str}_{from_max_str}"
     
     # Add object type to suffix
     if obj_type == "robinson":
         suffix += "_robinson"
     
+    return suffix
+
+def build_output_name(input_filename, location_name, suffix, obj_type="sphere"):
+    """Build the PNG filename of a single rendered view"""
+    if input_filename:
+        return f"{input_filename}_{location_name}{suffix}.png"
+    return f"{obj_type}_{location_name}{suffix}.png"
+
+def render_object_cameras(cameras, input_filename, output_dir, obj_type="sphere", frame=None, input_path=None):
+    """Render views from cameras, returns the written paths by location (numbered with frame if given)
+    
+    With --incremental and the input_path given, views whose outputs match the
+    build manifest are skipped.
+    """
+    if DATA_PASS:
+        return render_data_passes(cameras, input_filename, output_dir, obj_type)
+    
+    data_sphere_dir = os.path.dirname(output_dir)
+    
+    # Ensure output directory exists
+    os.makedirs(output_dir, exist_ok=True)
+    print(f"Output directory: {output_dir}")
+    
+    # Build filename suffix
+    suffix = build_filename_suffix(obj_type)
     print(f"  Filename suffix: {suffix}")
     
+    # Colorbars first, the overlays are composited while the next view renders
+    colorbar_path = None
+    colorbar = None
+    if COLORBAR_OVERLAY:
+        print("Generating colorbars...")
+        generate_scientific_colorbars(
+            output_dir, 
+            DISPLAY_COLOR,  # Changed from DISPLAY_VARIABLE
+            MAP_RANGE['from_min'], 
+            MAP_RANGE['from_max'], 
+            suffix,
+            text_colors=[get_colorbar_text_color()]
+        )
+        colorbar_path = overlay_colorbar_path(output_dir, suffix)
+        if not os.path.exists(colorbar_path):
+            print(f"Colorbar not found: {colorbar_path}")
+            colorbar_path = None
+        elif setup_overlay_compositor():
+            from PIL import Image
+            with Image.open(colorbar_path) as colorbar_img:
+                colorbar = np.asarray(colorbar_img.convert('RGBA'))
+    write_plain = colorbar is None or not OVERLAY_SETTINGS["overlay_only"]
+    
+    manifest = None
+    if INCREMENTAL_BUILD and input_path:
+        manifest = load_build_manifest(output_dir)
+        input_hash = file_content_hash(input_path, manifest["hashes"])
+    skipped = 0
+    
+    rendered = {}
+    composites = {}
+    if colorbar_path:
+        submit, finish = start_postprocess_pipeline(OVERLAY_SETTINGS["postprocess_workers"])
+    try:
+        for location_name, camera in cameras.items():
+            output_name = build_output_name(input_filename, location_name, suffix, obj_type)
+            if frame is not None:
+                output_name = output_name.replace(".png", f"_{frame:04d}.png")
+            output_path = os.path.join(output_dir, output_name)
+            composite_name = output_name.replace('.png', '_colorbar.png')
+            composite_path = os.path.join(output_dir, composite_name)
+            
+            if manifest is not None:
+                view_key = view_build_key(input_hash, obj_type, location_name, camera, frame)
+                overlay_key = overlay_build_key(view_key, input_filename)
+                plain_done = not write_plain or is_up_to_date(manifest, output_dir, output_name, view_key)
+                overlay_done = not colorbar_path or is_up_to_date(manifest, output_dir, composite_name, overlay_key)
+                if plain_done and write_plain:
+                    rendered[location_name] = output_path
+                if plain_done and overlay_done:
+                    rendered.setdefault(location_name, composite_path)
+                    skipped += 1
+                    print(f"  Up to date: {location_name}")
+                    continue
+                if plain_done and write_plain:
+                    # Only the overlay changed, composite it from the existing render
+                    submit(composite_name, lambda o=output_path, c=composite_path: create_colorbar_overlay(o, colorbar_path, c, input_filename))
+                    composites[composite_name] = (location_name, composite_path, overlay_key)
+                    continue
+            
+            bpy.context.scene.camera = camera
+            if VIEWPORT_CROPS:
+                apply_viewport_crop(location_name)
+            if GEOMETRY_SETTINGS["mesh"] == "cap":
+                apply_cap_geometry(camera)
+            apply_auto_border(camera)
+            bpy.context.scene.render.filepath = output_path
+            
+            print(f"  Rendering {location_name}...")
+            
+            try:
+                bpy.ops.render.render(write_still=write_plain)
+                if write_plain:
+                    rendered[location_name] = output_path
+                    print(f"  Saved: {output_name}")
+                    if manifest is not None:
+                        # Recorded per view, an interrupted run resumes after the last finished one
+                        record_build_outputs(output_dir, {output_name: view_key}, manifest["hashes"])
+                
+                if colorbar_path:
+                    if colorbar is not None:
+                        pixels = read_render_pixels()
+                        submit(composite_name, lambda p=pixels, c=composite_path: composite_render_pixels(p, colorbar, c, input_filename))
+                    else:
+                        submit(composite_name, lambda o=output_path, c=composite_path: create_colorbar_overlay(o, colorbar_path, c, input_filename))
+                    composites[composite_name] = (location_name, composite_path, overlay_key if manifest is not None else None)
+            except Exception as e:
+                print(f"  Failed: {e}")
+    finally:
+        if colorbar_path:
+            done, errors = finish()
+            if manifest is not None and done:
+                record_build_outputs(output_dir, {name: composites[name][2] for name in done}, manifest["hashes"])
+    
+    print(f"All {obj_type} renders complete! Check: {output_dir}")
+    if skipped:
+        print(f"  {skipped}/{len(cameras)} views up to date, not rendered")
+    
+    if colorbar_path:
+        for composite_name in done:
+            location_name, composite_path, _ = composites[composite_name]
+            rendered.setdefault(location_name, composite_path)
+        print(f"Created {len(done)}/{len(composites)} overlay composites for {obj_type}")
+        for composite_name, error in errors.items():
+            print(f"  {composite_name}: {error}")
+    
+    return rendered
+
+# ==============================================================================
+# DATA PASS AND OFFLINE RECOLORING
+# ==============================================================================
+
+# Render Layers outputs written for a data pass
+DATA_PASS_OUTPUTS = [DATA_PASS_AOV, "Image", "DiffDir", "DiffInd", "GlossDir", "GlossInd"]
+# View transform of data passes, the only one the recoloring reproduces (plain sRGB transfer)
+DATA_PASS_VIEW_TRANSFORM = "Standard"
+
+def setup_data_pass_compositor():
+    """Enable lighting passes plus the data AOV and route them to an EXR file output node"""
+    scene = bpy.context.scene
+    view_layer = bpy.context.view_layer
+    
+    view = scene.view_settings
+    if view.view_transform != DATA_PASS_VIEW_TRANSFORM:
+        print(f"  View transform {view.view_transform} set to {DATA_PASS_VIEW_TRANSFORM} for the data pass")
+    view.view_transform = DATA_PASS_VIEW_TRANSFORM
+    view.look = "None"
+    view.exposure = 0.0
+    view.gamma = 1.0
+    view.use_curve_mapping = False
+    
+    view_layer.use_pass_diffuse_direct = True
+    view_layer.use_pass_diffuse_indirect = True
+    view_layer.use_pass_glossy_direct = True
+    view_layer.use_pass_glossy_indirect = True
+    if DATA_PASS_AOV not in view_layer.aovs:
+        aov = view_layer.aovs.add()
+        aov.name = DATA_PASS_AOV
+        aov.type = 'VALUE'
+    
+    scene.use_nodes = True
+    tree = scene.node_tree
+    render_layers = tree.nodes.get("Render Layers") or tree.nodes.new(type='CompositorNodeRLayers')
+    
+    file_output = tree.nodes.get("data_pass_output")
+    if file_output is None:
+        file_output = tree.nodes.new(type='CompositorNodeOutputFile')
+        file_output.name = "data_pass_output"
+        file_output.location = (400, -300)
+        file_output.format.file_format = 'OPEN_EXR'
+        file_output.format.color_depth = '32'
+        file_output.format.color_mode = 'RGBA'
+        file_output.file_slots.clear()
+        for pass_name in DATA_PASS_OUTPUTS:
+            file_output.file_slots.new(f"{pass_name}_")
+            tree.links.new(render_layers.outputs[pass_name], file_output.inputs[-1])
+    
+    return file_output
+
+def read_exr_pixels(path):
+    """Read an EXR written by the compositor into a top-down (h, w, 4) float32 array"""
+    img = bpy.data.images.load(path)
+    width, height = img.size
+    pixels = np.empty(width * height * 4, dtype=np.float32)
+    img.pixels.foreach_get(pixels)
+    bpy.data.images.remove(img)
+    return pixels.reshape(height, width, 4)[::-1]
+
+def render_data_passes(cameras, input_filename, output_dir, obj_type="sphere"):
+    """Render raw data value and lighting passes per camera into .npz files"""
+    os.makedirs(output_dir, exist_ok=True)
+    file_output = setup_data_pass_compositor()
+    suffix = build_filename_suffix(obj_type, include_range=False)
+    
+    rendered = {}
     for location_name, camera in cameras.items():
         bpy.context.scene.camera = camera
+        if VIEWPORT_CROPS:
+            apply_viewport_crop(location_name)
+        if GEOMETRY_SETTINGS["mesh"] == "cap":
+            apply_cap_geometry(camera)
+        apply_auto_border(camera)
+        pass_dir = os.path.join(output_dir, f".passes_{location_name}")
+        file_output.base_path = pass_dir
         
-        if input_filename:
-            output_name = f"{input_filename}_{location_name}{suffix}.png"
-        else:
-            output_name = f"{obj_type}_{location_name}{suffix}.png"
+        print(f"  Rendering data pass {location_name}...")
+        try:
+            bpy.ops.render.render(write_still=False)
+            
+            passes = {}
+            for pass_name in DATA_PASS_OUTPUTS:
+                pass_path = sorted(glob.glob(os.path.join(pass_dir, f"{pass_name}_*.exr")))[-1]
+                passes[pass_name] = read_exr_pixels(pass_path)
+                os.remove(pass_path)
+            os.rmdir(pass_dir)
+            
+            # Un-premultiply pixel coverage at the limb
+            alpha = passes["Image"][..., 3]
+            coverage = np.where(alpha > 0, alpha, 1.0)[..., None]
+            value = passes[DATA_PASS_AOV][..., 0] / coverage[..., 0]
+            light = (passes["DiffDir"][..., :3] + passes["DiffInd"][..., :3]) / coverage
+            gloss = (passes["GlossDir"][..., :3] + passes["GlossInd"][..., :3]) / coverage
+            
+            output_name = build_output_name(input_filename, location_name, suffix, obj_type).replace(".png", "_datapass.npz")
+            output_path = os.path.join(output_dir, output_name)
+            np.savez_compressed(
+                output_path,
+                value=value.astype(np.float32),
+                light=light.astype(np.float16),
+                gloss=gloss.astype(np.float16),
+                alpha=alpha.astype(np.float16),
+                emission=np.float32(DATA_PASS_EMISSION),
+                view_transform=np.array(DATA_PASS_VIEW_TRANSFORM),
+                input_filename=np.array(input_filename or obj_type),
+                location=np.array(location_name),
+                suffix=np.array(suffix)
+            )
+            rendered[location_name] = output_path
+            print(f"  Saved: {output_name}")
+        except Exception as e:
+            print(f"  Failed: {e}")
+    
+    print(f"All {obj_type} data passes complete! Recolor with --recolor, check: {output_dir}")
+    return rendered
+
+def parse_recolor_variants(spec):
+    """Parse "variable:vmin:vmax,..." into a list of (variable, vmin, vmax)"""
+    if not spec:
+        return [(args.variable, args.vmin, args.vmax)]
+    
+    variants = []
+    for item in spec.split(","):
+        variable, vmin, vmax = item.strip().split(":")
+        check_value_range(float(vmin), float(vmax))
+        variants.append((variable, float(vmin), float(vmax)))
+    return variants
+
+def recolor_data_pass(npz_path, output_dir, variants, luts):
+    """Apply colormaps and value ranges to a data pass without Blender"""
+    from PIL import Image
+    
+    data = np.load(npz_path)
+    value = data["value"]
+    light = data["light"].astype(np.float32)
+    gloss = data["gloss"].astype(np.float32)
+    alpha = data["alpha"].astype(np.float32)
+    emission = float(data["emission"])
+    # Older data passes do not record it and used the scene's view transform
+    view_transform = str(data["view_transform"]) if "view_transform" in data.files else "unknown"
+    if view_transform != DATA_PASS_VIEW_TRANSFORM:
+        raise ValueError(f"{os.path.basename(npz_path)} was rendered with the {view_transform} view transform, "
+                         f"render the data pass again to recolor it")
+    base_name = f"{data['input_filename']}_{data['location']}{data['suffix']}"
+    
+    written = []
+    for variable, vmin, vmax in variants:
+        color = apply_colormap_lut(value, luts[variable], vmin, vmax)[..., :3]
+        rgb = linear_to_srgb(color * (light + emission) + gloss)
         
+        rgba = np.empty(value.shape + (4,), dtype=np.uint8)
+        rgba[..., :3] = np.rint(rgb * 255)
+        rgba[..., 3] = np.rint(np.clip(alpha, 0.0, 1.0) * 255)
+        
+        output_name = f"{base_name}_{format_range_value(vmin)}_{format_range_value(vmax)}_{variable}.png"
         output_path = os.path.join(output_dir, output_name)
-        bpy.context.scene.render.filepath = output_path
+        Image.fromarray(rgba, "RGBA").save(output_path)
+        written.append(output_path)
+    
+    return written
+
+def run_recolor():
+    """Recolor one data pass file or every data pass in a directory"""
+    if os.path.isdir(args.input_tiff):
+        npz_paths = sorted(glob.glob(os.path.join(args.input_tiff, "*_datapass.npz")))
+    else:
+        npz_paths = [args.input_tiff]
+    variants = parse_recolor_variants(args.recolor)
+    luts = {variable: build_colormap_lut(variable) for variable, _, _ in variants}
+    os.makedirs(args.output_dir, exist_ok=True)
+    
+    start = time.perf_counter()
+    count = 0
+    for npz_path in npz_paths:
+        view_start = time.perf_counter()
+        written = recolor_data_pass(npz_path, args.output_dir, variants, luts)
+        count += len(written)
+        print(f"  {os.path.basename(npz_path)}: {len(written)} images in {time.perf_counter() - view_start:.2f}s")
+    print(f"Recolored {count} images from {len(npz_paths)} data passes in {time.perf_counter() - start:.2f}s")
+
+
+# ==============================================================================
+# VIEWPORT CROPS
+# ==============================================================================
+
+def visible_cap_angle(zoom_level=None):
+    """Geocentric angular radius of the sphere cap a camera can see (radians)"""
+    zoom_level = CAMERA_SETTINGS["zoom_level"] if zoom_level is None else zoom_level
+    distance = CAMERA_SETTINGS["distance"]
+    focal = CAMERA_SETTINGS["focal_length"] * (1 + zoom_level)
+    # Image corners have the widest view angle
+    corner_angle = math.atan(math.sqrt(2) * (CAMERA_SENSOR_WIDTH / 2) / focal)
+    horizon = math.acos(SPHERE_RADIUS / distance)
+    
+    if distance * math.sin(corner_angle) >= SPHERE_RADIUS:
+        return horizon
+    return min(horizon, math.asin(distance * math.sin(corner_angle) / SPHERE_RADIUS) - corner_angle)
+
+def visible_texture_window(lat, lon):
+    """Texture window (u0, u1, v0, v1) of the sphere cap seen from a camera at (lat, lon)
+    
+    u1 can exceed 1 when the window crosses the texture seam.
+    """
+    center = np.array(camera_location(lat, lon, 1.0))
+    cap = visible_cap_angle()
+    
+    # Points on the cap boundary
+    helper = [0.0, 0.0, 1.0] if abs(center[2]) < 0.9 else [1.0, 0.0, 0.0]
+    e1 = np.cross(center, helper)
+    e1 /= np.linalg.norm(e1)
+    e2 = np.cross(center, e1)
+    phi = np.linspace(0, 2 * math.pi, CROP_SETTINGS["boundary_samples"], endpoint=False)[:, None]
+    boundary = center * math.cos(cap) + (e1 * np.cos(phi) + e2 * np.sin(phi)) * math.sin(cap)
+    
+    u, v = sphere_texture_uv(np.vstack([center, boundary]))
+    margin = CROP_SETTINGS["margin"]
+    v0 = max(0.0, v.min() - margin)
+    v1 = min(1.0, v.max() + margin)
+    
+    # Texture poles inside the cap need the full longitude range
+    rotation = euler_xyz_matrix(ROTATION_OFFSET)
+    for pole_v, pole in ((1.0, [0.0, 0.0, 1.0]), (0.0, [0.0, 0.0, -1.0])):
+        pole_direction = (np.array(pole) @ rotation) * np.array([1.0, -1.0, 1.0])
+        if pole_direction @ center >= math.cos(cap):
+            v0, v1 = min(v0, pole_v), max(v1, pole_v)
+            return 0.0, 1.0, v0, v1
+    
+    # Smallest u interval around the center that holds the whole boundary
+    du = (u - u[0] + 0.5) % 1.0 - 0.5
+    u0 = (u[0] + du.min() - margin) % 1.0
+    width = min(1.0, du.max() - du.min() + 2 * margin)
+    return u0, u0 + width, v0, v1
+
+def crop_source(geotiff_path, target_width):
+    """Texture at target_width for the viewport crops of an input
+    
+    With --texture-cache the pyramid level is memory-mapped anyway, without it
+    the input is read and downsampled once and reused for every camera.
+    """
+    if CACHE_SETTINGS["pyramids"]:
+        return load_tiff_array(geotiff_path, target_width)
+    key = (input_stamp(geotiff_path), target_width)
+    if CROP_SOURCE.get("key") != key:
+        # Only the last input is kept, crops of one input are rendered together
+        CROP_SOURCE.clear()
+        CROP_SOURCE.update(key=key, data=load_tiff_array(geotiff_path, target_width))
+    return CROP_SOURCE["data"]
+
+def read_texture_window(geotiff_path, window, target_width):
+    """Read the texels of a window at target_width texture resolution, returns (data, exact window)"""
+    source = crop_source(geotiff_path, target_width)
+    height, width = source.shape
+    u0, u1, v0, v1 = window
+    
+    col0 = int(math.floor(u0 * width))
+    col1 = min(col0 + width, int(math.ceil(u1 * width)))
+    row0 = int(math.floor((1.0 - v1) * height))
+    row1 = int(math.ceil((1.0 - v0) * height))
+    
+    cols = np.arange(col0, col1) % width
+    data = np.asarray(source[row0:row1])[:, cols].astype(np.float32)
+    return data, (col0 / width, col1 / width, 1.0 - row1 / height, 1.0 - row0 / height)
+
+def apply_viewport_crop(location_name):
+    """Load the crop texture of the window a camera sees into the climate material"""
+    material = bpy.data.materials["climate_material"]
+    nodes = material.node_tree.nodes
+    geotiff_path = image_source_path(nodes[DATA_NODE_NAMES["texture"]].image)
+    lat, lon = {**CONTINENT_POSITIONS, **INTEREST_POSITIONS}[location_name]
+    
+    start = time.perf_counter()
+    window = visible_texture_window(lat, lon)
+    target_width = args.texture_width or texture_width_needed(render_resolution("sphere", args.lowres)[0])
+    data, (u0, u1, v0, v1) = read_texture_window(geotiff_path, window, target_width)
+    
+    crop_tex = nodes["data_crop_texture"]
+    old_img = crop_tex.image
+    crop_tex.image = create_data_image(f"crop_{location_name}", data, geotiff_path)
+    if old_img is not None and old_img.users == 0:
+        bpy.data.images.remove(old_img)
+    
+    nodes["crop_u_offset"].inputs[1].default_value = u0
+    nodes["crop_u_scale"].inputs[1].default_value = 1.0 / (u1 - u0)
+    nodes["crop_v_offset"].inputs[1].default_value = v0
+    nodes["crop_v_scale"].inputs[1].default_value = 1.0 / (v1 - v0)
+    
+    coverage = (u1 - u0) * (v1 - v0)
+    print(f"  Viewport crop {location_name}: {data.shape[1]} x {data.shape[0]} ({coverage:.0%} of the globe) in {time.perf_counter() - start:.2f}s")
+
+
+# ==============================================================================
+# AUTO BORDER
+# ==============================================================================
+
+def projected_sphere_bounds(position, forward, right, up, focal, sensor_width, resolution, radius, margin_px=0.0):
+    """Screen bounds (min_x, max_x, min_y, max_y) of a sphere around the origin, 0-1 from the bottom left"""
+    to_center = -np.asarray(position, dtype=np.float64)
+    distance = np.linalg.norm(to_center)
+    if distance <= radius:
+        return 0.0, 1.0, 0.0, 1.0
+    
+    # Silhouette circle: tangent points of the view cone
+    axis = to_center / distance
+    helper = [0.0, 0.0, 1.0] if abs(axis[2]) < 0.9 else [1.0, 0.0, 0.0]
+    e1 = np.cross(axis, helper)
+    e1 /= np.linalg.norm(e1)
+    e2 = np.cross(axis, e1)
+    circle_center = axis * (distance - radius ** 2 / distance)
+    circle_radius = radius * math.sqrt(distance ** 2 - radius ** 2) / distance
+    phi = np.linspace(0, 2 * math.pi, BORDER_SETTINGS["silhouette_samples"], endpoint=False)[:, None]
+    points = circle_center + (e1 * np.cos(phi) + e2 * np.sin(phi)) * circle_radius
+    
+    depth = points @ forward
+    if np.any(depth <= 0):
+        return 0.0, 1.0, 0.0, 1.0
+    
+    # Sensor fit AUTO: the sensor width spans the larger image side
+    width, height = resolution
+    scale = focal / sensor_width * max(width, height)
+    px = points @ right / depth * scale + width / 2
+    py = points @ up / depth * scale + height / 2
+    
+    margin = BORDER_SETTINGS["margin_px"] + margin_px
+    return (max(0.0, (px.min() - margin) / width), min(1.0, (px.max() + margin) / width),
+            max(0.0, (py.min() - margin) / height), min(1.0, (py.max() + margin) / height))
+
+def defocus_radius(focal, fstop, focus_distance, distance):
+    """Circle of confusion radius on the sensor (mm) of a point at distance (scene units, meters)"""
+    aperture = focal / fstop
+    return aperture * focal * abs(distance - focus_distance) / distance / max(focus_distance * 1000 - focal, 1e-6) / 2
+
+def apply_auto_border(camera):
+    """Restrict rendering to the projected sphere bounds, returns the rendered fraction of the frame"""
+    render = bpy.context.scene.render
+    if not AUTO_BORDER or RENDER_OBJECT != "sphere" or camera.data.type != 'PERSP':
+        render.use_border = False
+        return 1.0
+    
+    radius = SPHERE_RADIUS + (BORDER_SETTINGS["displacement"] if WOW_MODE else 0.0)
+    bpy.context.view_layer.update()  # matrix_world of freshly created cameras
+    matrix = np.array(camera.matrix_world)
+    position = matrix[:3, 3]
+    right, up, forward = matrix[:3, 0], matrix[:3, 1], -matrix[:3, 2]
+    
+    sensor_width = camera.data.sensor_width
+    resolution = (render.resolution_x, render.resolution_y)
+    
+    # The defocused limb spreads beyond the silhouette
+    blur_px = 0.0
+    if camera.data.dof.use_dof:
+        limb_distance = math.sqrt(max(np.dot(position, position) - radius ** 2, 0.0))
+        blur = defocus_radius(camera.data.lens, camera.data.dof.aperture_fstop, camera.data.dof.focus_distance, limb_distance)
+        blur_px = blur / sensor_width * max(resolution)
+    
+    min_x, max_x, min_y, max_y = projected_sphere_bounds(position, forward, right, up, camera.data.lens,
+                                                         sensor_width, resolution, radius, blur_px)
+    
+    render.use_border = True
+    render.use_crop_to_border = False  # Output padded back to the full frame
+    render.border_min_x, render.border_max_x = min_x, max_x
+    render.border_min_y, render.border_max_y = min_y, max_y
+    return (max_x - min_x) * (max_y - min_y)
+
+# ==============================================================================
+# INCREMENTAL REBUILD
+# ==============================================================================
+
+SCRIPT_VERSION = {}  # Content hash of this script, computed once
+
+def script_version():
+    """SHA-256 of this script, any code change invalidates the build manifest"""
+    if "hash" not in SCRIPT_VERSION:
+        try:
+            SCRIPT_VERSION["hash"] = file_content_hash(os.path.abspath(__file__))
+        except (NameError, OSError):
+            SCRIPT_VERSION["hash"] = "unknown"
+    return SCRIPT_VERSION["hash"]
+
+def build_manifest_path(output_dir):
+    return os.path.join(output_dir, BUILD_MANIFEST_FILENAME)
+
+def load_build_manifest(output_dir):
+    try:
+        with open(build_manifest_path(output_dir)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"outputs": {}, "hashes": {}}
+
+def record_build_outputs(output_dir, keys, hashes):
+    """Add output keys to the manifest, reloaded under a lock so parallel workers on the same directory keep their entries"""
+    with file_lock(build_manifest_path(output_dir)):
+        manifest = load_build_manifest(output_dir)
+        manifest["outputs"].update(keys)
+        manifest["hashes"].update(hashes)
+        write_json_atomic(build_manifest_path(output_dir), manifest)
+
+def view_build_key(input_hash, obj_type, location_name, camera, frame=None):
+    """Key of a rendered view: input content, every setting that changes the pixels and the script version"""
+    scene = bpy.context.scene
+    colormap = get_custom_colormap(DISPLAY_COLOR) if is_custom_colormap(DISPLAY_COLOR) else COLORMAP_SETTINGS["ramp_stops"]
+    settings = {
+        "input": input_hash,
+        "script": script_version(),
+        "object": obj_type,
+        "location": location_name,
+        "frame": frame,
+        "map_range": MAP_RANGE,
+        "camera": CAMERA_SETTINGS,
+        "rotation": ROTATION_OFFSET,
+        "wow": WOW_MODE,
+        "variable": DISPLAY_COLOR,
+        "colormap": colormap,
+        "lut": [COLORMAP_SETTINGS["lut_size"], PREBAKED_COLORS, LUT_TEXTURE],
+        "texture": [args.texture_width, args.full_texture, VIEWPORT_CROPS, CACHE_SETTINGS["pyramid_dtype"], TEXTURE_ENCODING],
+        "points": POINT_SETTINGS,
+        "geometry": GEOMETRY_SETTINGS,
+        "resolution": [scene.render.resolution_x, scene.render.resolution_y, scene.render.resolution_percentage],
+        "samples": scene.cycles.samples,
+        "view": [scene.view_settings.view_transform, scene.view_settings.look],
+        "camera_matrix": [[round(value, 6) for value in row] for row in camera.matrix_world],
+        "lens": camera.data.lens
+    }
+    return hashlib.sha256(json.dumps(settings, sort_keys=True, default=str).encode()).hexdigest()
+
+def overlay_build_key(view_key, input_filename):
+    """Key of an overlay composite: its view plus the overlay layout"""
+    overlay = {key: value for key, value in OVERLAY_SETTINGS.items() if key not in ("overlay_only", "postprocess_workers")}
+    settings = [view_key, overlay, get_colorbar_text_color(), input_filename]
+    return hashlib.sha256(json.dumps(settings, sort_keys=True).encode()).hexdigest()
+
+def is_up_to_date(manifest, output_dir, output_name, key):
+    return manifest["outputs"].get(output_name) == key and os.path.exists(os.path.join(output_dir, output_name))
+
+# ==============================================================================
+# FAST PREVIEW (NUMPY, NO BLENDER)
+# ==============================================================================
+
+def euler_xyz_matrix(rotation):
+    """Rotation matrix of an XYZ euler rotation given in degrees"""
+    x, y, z = (math.radians(rotation[axis]) for axis in ("x", "y", "z"))
+    rot_x = np.array([[1, 0, 0], [0, math.cos(x), -math.sin(x)], [0, math.sin(x), math.cos(x)]])
+    rot_y = np.array([[math.cos(y), 0, math.sin(y)], [0, 1, 0], [-math.sin(y), 0, math.cos(y)]])
+    rot_z = np.array([[math.cos(z), -math.sin(z), 0], [math.sin(z), math.cos(z), 0], [0, 0, 1]])
+    return rot_z @ rot_y @ rot_x
+
+def sphere_texture_uv(points):
+    """Equirectangular (u, v) of object space points, same as Mapping + Environment Texture nodes"""
+    vectors = (points * np.array([1.0, -1.0, 1.0])) @ euler_xyz_matrix(ROTATION_OFFSET).T
+    u = 0.5 - np.arctan2(vectors[..., 1], vectors[..., 0]) / (2 * math.pi)
+    v = 0.5 + np.arctan2(vectors[..., 2], np.hypot(vectors[..., 0], vectors[..., 1])) / math.pi
+    return u, v
+
+def sample_equirectangular(data, u, v):
+    """Nearest-neighbour lookup of a top-down equirectangular array"""
+    height, width = data.shape
+    cols = np.clip((u * width).astype(np.intp), 0, width - 1)
+    rows = np.clip(((1.0 - v) * height).astype(np.intp), 0, height - 1)
+    return data[rows, cols]
+
+def camera_basis(lat, lon):
+    """Camera position, forward, right and up vectors like create_continent_cameras()"""
+    position = np.array(camera_location(lat, lon, CAMERA_SETTINGS["distance"]))
+    forward = -position / np.linalg.norm(position)
+    
+    # Track -Z to the sphere with Y up, fall back to world Y at the poles
+    right = np.cross(forward, [0.0, 0.0, 1.0])
+    if np.linalg.norm(right) < 1e-6:
+        right = np.cross(forward, [0.0, 1.0, 0.0])
+    right /= np.linalg.norm(right)
+    up = np.cross(right, forward)
+    return position, forward, right, up
+
+def preview_light_directions():
+    """Sun directions (pointing to the light) and strengths matching add_lighting()"""
+    lights = [(np.array([0.0, 0.0, 1.0]), 0.5)]
+    if WOW_MODE:
+        lights.append((np.array([0.0, 0.0, -1.0]), 0.5))
+    return lights
+
+def render_preview(data, lut, lat, lon, size, projection="perspective"):
+    """Ray trace the data sphere for one view, returns an (size, size, 4) uint8 RGBA image"""
+    position, forward, right, up = camera_basis(lat, lon)
+    focal = CAMERA_SETTINGS["focal_length"] * (1 + CAMERA_SETTINGS["zoom_level"])
+    tan_half = (CAMERA_SENSOR_WIDTH / 2) / focal
+    
+    ndc = (np.arange(size) + 0.5) / size * 2 - 1
+    screen_x, screen_y = np.meshgrid(ndc, -ndc)
+    offsets = screen_x[..., None] * right + screen_y[..., None] * up
+    
+    if projection == "orthographic":
+        # Same framing as the perspective camera at the sphere center
+        half_width = CAMERA_SETTINGS["distance"] * tan_half
+        origins = position + offsets * half_width
+        directions = np.broadcast_to(forward, origins.shape)
+    else:
+        origins = np.broadcast_to(position, offsets.shape)
+        directions = forward + offsets * tan_half
+        directions = directions / np.linalg.norm(directions, axis=-1, keepdims=True)
+    
+    # Ray-sphere intersection around the origin
+    b = np.einsum("ijk,ijk->ij", origins, directions)
+    c = np.einsum("ijk,ijk->ij", origins, origins) - SPHERE_RADIUS ** 2
+    discriminant = b * b - c
+    hit = discriminant >= 0
+    t = -b - np.sqrt(np.where(hit, discriminant, 0.0))
+    normals = (origins + directions * t[..., None]) / SPHERE_RADIUS
+    
+    u, v = sphere_texture_uv(normals[hit])
+    color = apply_colormap_lut(sample_equirectangular(data, u, v), lut, MAP_RANGE["from_min"], MAP_RANGE["from_max"])[:, :3]
+    
+    # Emission plus Lambert diffuse from the sun lights
+    shading = np.full(len(color), DATA_PASS_EMISSION)
+    for direction, strength in preview_light_directions():
+        shading += strength * np.clip(normals[hit] @ direction, 0.0, None) / math.pi
+    
+    rgba = np.zeros((size, size, 4), dtype=np.uint8)
+    rgba[hit, :3] = np.rint(linear_to_srgb(color * shading[:, None]) * 255)
+    rgba[hit, 3] = 255
+    return rgba
+
+def run_preview():
+    """Render preview PNGs of all selected views without Blender"""
+    from PIL import Image
+    
+    start = time.perf_counter()
+    jobs = load_job_list(args.input_tiff) if is_job_list(args.input_tiff) else [job_from_args()]
+    all_positions = {**CONTINENT_POSITIONS, **INTEREST_POSITIONS}
+    
+    for job in jobs:
+        job_start = time.perf_counter()
+        apply_job_settings(job)
+        data = load_tiff_array(job["input_tiff"], texture_width_needed(args.preview_size))
+        lut = build_colormap_lut(DISPLAY_COLOR)
+        input_filename = os.path.splitext(os.path.basename(job["input_tiff"]))[0]
+        suffix = build_filename_suffix("sphere") + "_preview"
+        os.makedirs(job["output_dir"], exist_ok=True)
+        print(f"Preview {input_filename} loaded in {time.perf_counter() - job_start:.2f}s")
+        
+        for location_name in job["locations"]:
+            view_start = time.perf_counter()
+            lat, lon = all_positions[location_name]
+            rgba = render_preview(data, lut, lat, lon, args.preview_size, args.preview)
+            output_name = build_output_name(input_filename, location_name, suffix)
+            Image.fromarray(rgba, "RGBA").save(os.path.join(job["output_dir"], output_name))
+            print(f"  {output_name} ({time.perf_counter() - view_start:.2f}s)")
+    
+    print(f"Previews complete in {time.perf_counter() - start:.2f}s")
+
+
+# ==============================================================================
+# FLAT MAP REPROJECTION (NUMPY, NO BLENDER)
+# ==============================================================================
+
+# Robinson table: parallel length and distance from the equator, 0-90 degrees in 5 degree steps
+ROBINSON_TABLE_X = np.array([1.0000, 0.9986, 0.9954, 0.9900, 0.9822, 0.9730, 0.9600, 0.9427, 0.9216, 0.8962,
+                             0.8679, 0.8350, 0.7986, 0.7597, 0.7186, 0.6732, 0.6213, 0.5722, 0.5322])
+ROBINSON_TABLE_Y = np.array([0.0000, 0.0620, 0.1240, 0.1860, 0.2480, 0.3100, 0.3720, 0.4340, 0.4958, 0.5571,
+                             0.6176, 0.6769, 0.7346, 0.7903, 0.8435, 0.8936, 0.9394, 0.9761, 1.0000])
+ROBINSON_TABLE_LAT = np.radians(np.arange(0, 91, 5))
+EQUAL_EARTH_COEFFICIENTS = (1.340264, -0.081106, 0.000893, 0.003796)
+
+def project_forward(projection, lat, lon, center=(0.0, 0.0)):
+    """Map coordinates (x, y) of lat/lon in radians, unit sphere"""
+    if projection == "robinson":
+        x_factor = np.interp(np.abs(lat), ROBINSON_TABLE_LAT, ROBINSON_TABLE_X)
+        y_factor = np.interp(np.abs(lat), ROBINSON_TABLE_LAT, ROBINSON_TABLE_Y)
+        return 0.8487 * x_factor * lon, 1.3523 * y_factor * np.sign(lat)
+    
+    if projection == "mollweide":
+        # Newton iteration for the auxiliary angle, 2t + sin(2t) = pi sin(lat)
+        theta = np.asarray(lat, dtype=np.float64).copy()
+        for _ in range(FLATMAP_SETTINGS["newton_steps"] * 2):
+            step = (2 * theta + np.sin(2 * theta) - math.pi * np.sin(lat)) / np.maximum(2 + 2 * np.cos(2 * theta), 1e-12)
+            theta -= step
+        return 2 * math.sqrt(2) / math.pi * lon * np.cos(theta), math.sqrt(2) * np.sin(theta)
+    
+    if projection == "equalearth":
+        a1, a2, a3, a4 = EQUAL_EARTH_COEFFICIENTS
+        theta = np.arcsin(math.sqrt(3) / 2 * np.sin(lat))
+        t2 = theta ** 2
+        t6 = t2 ** 3
+        x = 2 * math.sqrt(3) * lon * np.cos(theta) / (3 * (9 * a4 * t6 * t2 + 7 * a3 * t6 + 3 * a2 * t2 + a1))
+        y = theta * (a4 * t6 * t2 + a3 * t6 + a2 * t2 + a1)
+        return x, y
+    
+    if projection == "orthographic":
+        lat0, lon0 = np.radians(center)
+        x = np.cos(lat) * np.sin(lon - lon0)
+        y = math.cos(lat0) * np.sin(lat) - math.sin(lat0) * np.cos(lat) * np.cos(lon - lon0)
+        return x, y
+    
+    raise ValueError(f"Unknown projection: {projection}")
+
+def project_inverse(projection, x, y, center=(0.0, 0.0)):
+    """lat/lon in radians of map coordinates, plus a mask of points on the globe"""
+    if projection == "robinson":
+        lat = np.interp(np.abs(y) / 1.3523, ROBINSON_TABLE_Y, ROBINSON_TABLE_LAT) * np.sign(y)
+        lon = x / (0.8487 * np.interp(np.abs(lat), ROBINSON_TABLE_LAT, ROBINSON_TABLE_X))
+        valid = (np.abs(y) <= 1.3523) & (np.abs(lon) <= math.pi)
+        return lat, lon, valid
+    
+    if projection == "mollweide":
+        theta = np.arcsin(np.clip(y / math.sqrt(2), -1.0, 1.0))
+        lat = np.arcsin(np.clip((2 * theta + np.sin(2 * theta)) / math.pi, -1.0, 1.0))
+        lon = math.pi * x / (2 * math.sqrt(2) * np.maximum(np.cos(theta), 1e-12))
+        valid = (np.abs(y) <= math.sqrt(2)) & (np.abs(lon) <= math.pi)
+        return lat, lon, valid
+    
+    if projection == "equalearth":
+        a1, a2, a3, a4 = EQUAL_EARTH_COEFFICIENTS
+        theta_max = math.pi / 3
+        theta = np.asarray(y, dtype=np.float64).copy()
+        for _ in range(FLATMAP_SETTINGS["newton_steps"]):
+            t2 = theta ** 2
+            t6 = t2 ** 3
+            value = theta * (a4 * t6 * t2 + a3 * t6 + a2 * t2 + a1) - y
+            slope = 9 * a4 * t6 * t2 + 7 * a3 * t6 + 3 * a2 * t2 + a1
+            theta = np.clip(theta - value / slope, -theta_max, theta_max)
+        t2 = theta ** 2
+        t6 = t2 ** 3
+        slope = 9 * a4 * t6 * t2 + 7 * a3 * t6 + 3 * a2 * t2 + a1
+        lat = np.arcsin(np.clip(2 * np.sin(theta) / math.sqrt(3), -1.0, 1.0))
+        lon = 3 * x * slope / (2 * math.sqrt(3) * np.cos(theta))
+        y_max = theta_max * (a4 * theta_max ** 8 + a3 * theta_max ** 6 + a2 * theta_max ** 2 + a1)
+        valid = (np.abs(y) <= y_max) & (np.abs(lon) <= math.pi)
+        return lat, lon, valid
+    
+    if projection == "orthographic":
+        lat0, lon0 = np.radians(center)
+        rho = np.hypot(x, y)
+        valid = rho <= 1.0
+        c = np.arcsin(np.clip(rho, 0.0, 1.0))
+        safe_rho = np.where(rho > 0, rho, 1.0)
+        lat = np.arcsin(np.clip(np.cos(c) * math.sin(lat0) + y * np.sin(c) * math.cos(lat0) / safe_rho, -1.0, 1.0))
+        lon = lon0 + np.arctan2(x * np.sin(c), rho * np.cos(c) * math.cos(lat0) - y * np.sin(c) * math.sin(lat0))
+        lon = (lon + math.pi) % (2 * math.pi) - math.pi
+        return lat, lon, valid
+    
+    raise ValueError(f"Unknown projection: {projection}")
+
+def projection_extent(projection):
+    """Half width and half height of the map in unit sphere coordinates"""
+    if projection == "orthographic":
+        return 1.0, 1.0
+    x_max, _ = project_forward(projection, np.array(0.0), np.array(math.pi))
+    _, y_max = project_forward(projection, np.array(math.pi / 2), np.array(0.0))
+    return float(x_max), float(y_max)
+
+def flatmap_shape(projection, width):
+    """Output (height, width) with the aspect ratio of the projection"""
+    x_max, y_max = projection_extent(projection)
+    return int(round(width * y_max / x_max)), width
+
+def compute_reprojection_maps(projection, source_shape, output_shape, method, center=(0.0, 0.0)):
+    """Source pixel indices and weights of every output pixel, (h, w, k) each, -1 outside the globe"""
+    source_height, source_width = source_shape
+    height, width = output_shape
+    x_max, y_max = projection_extent(projection)
+    
+    x = ((np.arange(width) + 0.5) / width * 2 - 1) * x_max
+    y = (1 - (np.arange(height) + 0.5) / height * 2) * y_max
+    lat, lon, valid = project_inverse(projection, x[None, :], y[:, None], center)
+    
+    # Continuous source pixel coordinates, pixel centers at .5, columns from the west edge the sphere uses
+    col = ((np.degrees(lon) - texture_west_longitude()) % 360.0) / 360.0 * source_width - 0.5
+    row = (90.0 - np.degrees(lat)) / 180.0 * source_height - 0.5
+    
+    if method == "nearest":
+        cols = np.rint(col).astype(np.int64) % source_width
+        rows = np.clip(np.rint(row).astype(np.int64), 0, source_height - 1)
+        index = (rows * source_width + cols)[..., None]
+        weight = np.ones(index.shape, dtype=np.float32)
+    else:
+        col0 = np.floor(col)
+        row0 = np.floor(row)
+        fc = (col - col0)[..., None]
+        fr = (row - row0)[..., None]
+        # Wrap around the date line, clamp at the poles
+        cols = (col0.astype(np.int64)[..., None] + np.array([0, 1, 0, 1])) % source_width
+        rows = np.clip(row0.astype(np.int64)[..., None] + np.array([0, 0, 1, 1]), 0, source_height - 1)
+        index = rows * source_width + cols
+        weight = np.concatenate([(1 - fc) * (1 - fr), fc * (1 - fr), (1 - fc) * fr, fc * fr], axis=-1).astype(np.float32)
+    
+    index = np.where(valid[..., None], index, -1).astype(np.int32)
+    weight = np.where(valid[..., None], weight, 0.0).astype(np.float32)
+    return index, weight
+
+def reprojection_maps(projection, source_shape, output_shape, method, center=(0.0, 0.0)):
+    """Cached index and weight maps, memory-mapped from the cache directory"""
+    if not CACHE_SETTINGS["enabled"]:
+        return compute_reprojection_maps(projection, source_shape, output_shape, method, center)
+    
+    center_str = f"_{center[0]:g}_{center[1]:g}" if projection == "orthographic" else ""
+    key = f"{projection}{center_str}_{source_shape[1]}x{source_shape[0]}_{output_shape[1]}x{output_shape[0]}_{method}_west{texture_west_longitude():g}"
+    entry_dir = os.path.join(CACHE_SETTINGS["dir"], "reprojection", key)
+    index_path = os.path.join(entry_dir, "index.npy")
+    weight_path = os.path.join(entry_dir, "weight.npy")
+    
+    if not (os.path.exists(index_path) and os.path.exists(weight_path)):
+        start = time.perf_counter()
+        index, weight = compute_reprojection_maps(projection, source_shape, output_shape, method, center)
+        os.makedirs(entry_dir, exist_ok=True)
+        for path, array in ((index_path, index), (weight_path, weight)):
+            tmp_path = f"{path}.{os.getpid()}.tmp.npy"
+            np.save(tmp_path, array)
+            os.replace(tmp_path, path)
+        print(f"Reprojection cache miss: {key} built in {time.perf_counter() - start:.2f}s")
+    else:
+        print(f"Reprojection cache hit: {key}")
+    
+    return np.load(index_path, mmap_mode='r'), np.load(weight_path, mmap_mode='r')
+
+def apply_reprojection(data, index, weight):
+    """Resample a top-down source array with index/weight maps, NaN outside the globe and where all inputs are NaN"""
+    values = np.asarray(data, dtype=np.float32).reshape(-1)[np.maximum(index, 0)]
+    weight = np.where(np.isnan(values), 0.0, weight)
+    total = weight.sum(axis=-1)
+    result = np.nansum(values * weight, axis=-1) / np.where(total > 0, total, 1.0)
+    return np.where(total > 0, result, np.nan).astype(np.float32)
+
+def run_flatmap():
+    """Reproject every input to the selected flat map and color it with NumPy"""
+    from PIL import Image
+    
+    start = time.perf_counter()
+    projection = FLATMAP_SETTINGS["projection"]
+    jobs = load_job_list(args.input_tiff) if is_job_list(args.input_tiff) else [job_from_args()]
+    all_positions = {**CONTINENT_POSITIONS, **INTEREST_POSITIONS}
+    output_shape = flatmap_shape(projection, FLATMAP_SETTINGS["width"])
+    
+    for job in jobs:
+        job_start = time.perf_counter()
+        apply_job_settings(job)
+        # World maps show the equator across the full width, orthographic magnifies the center by pi
+        data = load_tiff_array(job["input_tiff"], int(output_shape[1] * (math.pi if projection == "orthographic" else 1.0)))
+        lut = build_colormap_lut(DISPLAY_COLOR)
+        input_filename = os.path.splitext(os.path.basename(job["input_tiff"]))[0]
+        os.makedirs(job["output_dir"], exist_ok=True)
         
-        print(f"  Rendering {location_name}...")
+        views = [(name, all_positions[name]) for name in job["locations"]] if projection == "orthographic" else [(None, (0.0, 0.0))]
+        colorbar = None
+        if COLORBAR_OVERLAY:
+            height = int(output_shape[0] * OVERLAY_SETTINGS["colorbar_scale"])
+            colorbar = np.asarray(rasterize_colorbar(DISPLAY_COLOR, MAP_RANGE["from_min"], MAP_RANGE["from_max"], get_colorbar_text_color(), height))
+        
+        for location_name, center in views:
+            view_start = time.perf_counter()
+            index, weight = reprojection_maps(projection, data.shape, output_shape, FLATMAP_SETTINGS["resample"], center)
+            values = apply_reprojection(data, index, weight)
+            
+            rgba = np.zeros(output_shape + (4,), dtype=np.uint8)
+            on_globe = index[..., 0] >= 0
+            colors = apply_colormap_lut(values[on_globe], lut, MAP_RANGE["from_min"], MAP_RANGE["from_max"])
+            rgba[on_globe, :3] = np.rint(linear_to_srgb(colors[:, :3]) * 255)
+            rgba[on_globe, 3] = 255
+            
+            name = f"{location_name}_{projection}" if location_name else projection
+            range_str = f"{format_range_value(MAP_RANGE['from_min'])}_{format_range_value(MAP_RANGE['from_max'])}"
+            output_name = f"{input_filename}_{name}_{range_str}.png"
+            Image.fromarray(rgba, "RGBA").save(os.path.join(job["output_dir"], output_name))
+            if colorbar is not None:
+                save_png(composite_overlay(rgba, colorbar, input_filename), os.path.join(job["output_dir"], output_name.replace(".png", "_colorbar.png")))
+            print(f"  {output_name} ({time.perf_counter() - view_start:.2f}s)")
+        
+        print(f"Flat maps of {input_filename} done in {time.perf_counter() - job_start:.2f}s")
+    
+    print(f"Flat maps complete in {time.perf_counter() - start:.2f}s")
+
+
+# ==============================================================================
+# BENCHMARKS
+# ==============================================================================
+
+# Render variants compared by --benchmark, as global settings to switch
+BENCHMARK_VARIANTS = {
+    "prebaked": [
+        ("nodes", {"PREBAKED_COLORS": False}),
+        ("prebaked", {"PREBAKED_COLORS": True})
+    ],
+    # Labels "<group>/<variant>" are compared to the first variant of their group
+    "border": [
+        (f"zoom{zoom:g}/{label}", {"AUTO_BORDER": enabled, "CAMERA_SETTINGS": {**CAMERA_SETTINGS, "zoom_level": zoom}})
+        for zoom in (-0.5, -0.25, 0.0, 0.55)
+        for label, enabled in (("full", False), ("border", True))
+    ],
+    "mesh": [
+        (mesh, {"GEOMETRY_SETTINGS": {**GEOMETRY_SETTINGS, "mesh": mesh}})
+        for mesh in ("uv", "icosphere", "quadsphere", "cap")
+    ]
+}
+
+RENDER_STATS = {"peak_mb": 0.0}
+
+def record_render_stats(stats):
+    """render_stats handler, remembers the peak memory Cycles reports"""
+    match = re.search(r"Peak[: ]*([\d.]+)\s*([MG])", str(stats))
+    if match:
+        peak = float(match.group(1)) * (1024 if match.group(2) == "G" else 1)
+        RENDER_STATS["peak_mb"] = max(RENDER_STATS["peak_mb"], peak)
+
+def image_memory_mb():
+    """Pixel memory of all loaded images"""
+    total = 0
+    for img in bpy.data.images:
+        total += img.size[0] * img.size[1] * img.channels * (4 if img.is_float else 1)
+    return total / 1024 ** 2
+
+def benchmark_views(cameras):
+    """Render every camera without saving, returns (location, seconds, peak MB, rendered frame fraction) rows"""
+    rows = []
+    for location_name, camera in cameras.items():
+        bpy.context.scene.camera = camera
+        if VIEWPORT_CROPS:
+            apply_viewport_crop(location_name)
+        if GEOMETRY_SETTINGS["mesh"] == "cap":
+            apply_cap_geometry(camera)
+        border = apply_auto_border(camera)
+        RENDER_STATS["peak_mb"] = 0.0
+        start = time.perf_counter()
+        bpy.ops.render.render(write_still=False)
+        rows.append((location_name, time.perf_counter() - start, RENDER_STATS["peak_mb"], border))
+    return rows
+
+def benchmark_scene_sync(camera):
+    """Time and peak memory of a 1 sample render at 1% size: scene export, displacement and BVH build"""
+    scene = bpy.context.scene
+    samples, percentage = scene.cycles.samples, scene.render.resolution_percentage
+    scene.camera = camera
+    scene.cycles.samples = 1
+    scene.render.resolution_percentage = 1
+    RENDER_STATS["peak_mb"] = 0.0
+    start = time.perf_counter()
+    bpy.ops.render.render(write_still=False)
+    elapsed = time.perf_counter() - start
+    scene.cycles.samples, scene.render.resolution_percentage = samples, percentage
+    return elapsed, RENDER_STATS["peak_mb"]
+
+def run_benchmark():
+    """Render the selected views once per variant and compare time and memory"""
+    bpy.app.handlers.render_stats.append(record_render_stats)
+    geotiff_path = os.path.abspath(args.input_tiff)
+    defaults = {name: globals()[name] for _, settings in BENCHMARK_VARIANTS[args.benchmark] for name in settings}
+    results = {}
+    
+    for label, settings in BENCHMARK_VARIANTS[args.benchmark]:
+        print(f"BENCHMARK {args.benchmark}: {label}")
+        globals().update(settings)
+        for img in list(bpy.data.images):
+            bpy.data.images.remove(img)
+        start = time.perf_counter()
+        _, cameras = build_scene(geotiff_path)
+        setup_time = time.perf_counter() - start
+        sync_time, sync_peak = benchmark_scene_sync(next(iter(cameras.values())))
+        rows = benchmark_views(cameras)
+        sphere = bpy.data.objects.get("climate_sphere")
+        results[label] = {
+            "setup_s": setup_time,
+            "bvh_s": sync_time,
+            "bvh_peak_mb": sync_peak,
+            "faces": sphere_render_faces(sphere) if sphere else 0,
+            "image_mb": image_memory_mb(),
+            "samples": bpy.context.scene.cycles.samples,
+            "views": {location: {"render_s": seconds, "peak_mb": peak, "border": border} for location, seconds, peak, border in rows}
+        }
+    
+    globals().update(defaults)
+    bpy.app.handlers.render_stats.remove(record_render_stats)
+    
+    baselines = {}
+    print(f"BENCHMARK SUMMARY ({args.benchmark})")
+    for label, result in results.items():
+        render_total = sum(view["render_s"] for view in result["views"].values())
+        peak = max((view["peak_mb"] for view in result["views"].values()), default=0.0)
+        baseline = baselines.setdefault(label.rpartition("/")[0], render_total)
+        print(f"  {label:>10}: setup {result['setup_s']:.2f}s, render {render_total:.2f}s ({baseline / render_total:.2f}x), "
+              f"peak {peak:.0f} MB, images {result['image_mb']:.0f} MB, {result['samples']} samples")
+        print(f"  {'':>10}  scene sync + BVH {result['bvh_s']:.2f}s (peak {result['bvh_peak_mb']:.0f} MB), {result['faces']:,} faces")
+        for location_name, view in result["views"].items():
+            print(f"  {'':>10}  {location_name}: {view['render_s']:.2f}s, peak {view['peak_mb']:.0f} MB, {view['border']:.0%} of the frame traced")
+    
+    os.makedirs(args.output_dir, exist_ok=True)
+    write_json_atomic(os.path.join(args.output_dir, f"benchmark_{args.benchmark}.json"), results)
+
+
+# ==============================================================================
+# BATCH JOB MODE
+# ==============================================================================
+
+BATCH_JOB_EXTENSIONS = (".json", ".csv")
+
+def is_job_list(path):
+    """Check if the input is a batch job list instead of a TIFF"""
+    return os.path.splitext(path)[1].lower() in BATCH_JOB_EXTENSIONS
+
+def load_job_list(job_path):
+    """Load render jobs from a JSON or CSV file
+    
+    Every job needs an "input_tiff", all other fields ("output_dir", "variable",
+    "vmin", "vmax", "locations") fall back to the command line arguments.
+    Relative TIFF paths are resolved against the job file directory.
+    """
+    if job_path.lower().endswith(".json"):
+        with open(job_path) as f:
+            raw_jobs = json.load(f)
+        if isinstance(raw_jobs, dict):
+            raw_jobs = raw_jobs["jobs"]
+    else:
+        with open(job_path, newline="") as f:
+            raw_jobs = [{key: value for key, value in row.items() if value not in (None, "")}
+                        for row in csv.DictReader(f)]
+    
+    job_dir = os.path.dirname(os.path.abspath(job_path))
+    jobs = []
+    for i, raw in enumerate(raw_jobs):
+        if "input_tiff" not in raw:
+            raise ValueError(f"Job {i} in {job_path} has no input_tiff")
+        jobs.append(normalize_job(raw, job_dir))
+    
+    print(f"Loaded {len(jobs)} jobs from {job_path}")
+    return jobs
+
+def normalize_job(raw, base_dir):
+    """Fill missing job fields from the command line, relative TIFF paths are resolved against base_dir"""
+    input_tiff = raw["input_tiff"]
+    if not os.path.isabs(input_tiff):
+        input_tiff = os.path.join(base_dir, input_tiff)
+    
+    return {
+        "input_tiff": input_tiff,
+        "output_dir": raw.get("output_dir", args.output_dir),
+        "variable": raw.get("variable", args.variable),
+        "vmin": float(raw.get("vmin", args.vmin)),
+        "vmax": float(raw.get("vmax", args.vmax)),
+        "locations": parse_locations(raw.get("locations", args.locations))
+    }
+
+def apply_job_settings(job):
+    """Point the global render settings at a job"""
+    global DISPLAY_COLOR
+    
+    if not (is_custom_colormap(job["variable"]) or is_matplotlib_colormap(job["variable"])):
+        raise ValueError(f"Unknown variable/colormap '{job['variable']}'")
+    
+    DISPLAY_COLOR = job["variable"]
+    if args.auto_range:
+        job["vmin"], job["vmax"] = auto_range(job["input_tiff"], job["variable"])
+    check_value_range(job["vmin"], job["vmax"])
+    MAP_RANGE["from_min"] = job["vmin"]
+    MAP_RANGE["from_max"] = job["vmax"]
+    args.locations = job["locations"]
+
+def build_scene(geotiff_path):
+    """Clear the scene and build object, material, cameras and render settings"""
+    print("1. Clearing scene...")
+    clear_scene()
+    print("2. Adding lighting...")
+    add_lighting()
+    
+    if RENDER_OBJECT == "sphere":
+        print("3. Creating SPHERE...")
+        obj = create_sphere()
+        material = create_climate_material(obj, geotiff_path, is_robinson=False)
+        cameras = create_continent_cameras()
+        setup_render_settings("sphere", args.lowres)
+    else:
+        print("3. Creating ROBINSON...")
+        obj = create_robinson_plane()
+        material = create_climate_material(obj, geotiff_path, is_robinson=True)
+        cameras = create_robinson_camera()
+        setup_render_settings("robinson")
+    
+    return material, cameras
+
+def run_batch(job_path):
+    """Build the scene once and render every job of a job list"""
+    batch_start = time.perf_counter()
+    jobs = load_job_list(job_path)
+    if not jobs:
+        print("No jobs to render")
+        return
+    
+    # Scene is built for the first job, cameras for all locations of all jobs
+    apply_job_settings(jobs[0])
+    all_locations = []
+    for job in jobs:
+        all_locations += [loc for loc in job["locations"] if loc not in all_locations]
+    args.locations = all_locations
+    
+    material, cameras = build_scene(jobs[0]["input_tiff"])
+    
+    setup_time = time.perf_counter() - batch_start
+    print(f"Scene setup: {setup_time:.2f}s")
+    
+    job_times = []
+    for i, job in enumerate(jobs):
+        job_start = time.perf_counter()
+        input_filename = os.path.splitext(os.path.basename(job["input_tiff"]))[0]
+        print(f"4. Job {i + 1}/{len(jobs)}: {input_filename} ({job['variable']}, {job['vmin']:g} to {job['vmax']:g})")
         
         try:
-            bpy.ops.render.render(write_still=True)
-            print(f"  Saved: {output_name}")
+            apply_job_settings(job)
+            if not update_climate_material(material, job["input_tiff"]):
+                raise RuntimeError(f"could not load {job['input_tiff']}")
+            
+            if RENDER_OBJECT == "sphere":
+                job_cameras = {loc: cameras[loc] for loc in job["locations"] if loc in cameras}
+            else:
+                job_cameras = cameras
+            
+            render_object_cameras(job_cameras, input_filename, job["output_dir"], RENDER_OBJECT, input_path=job["input_tiff"])
+            status = "ok"
         except Exception as e:
-            print(f"  Failed: {e}")
+            status = f"failed: {e}"
+        
+        job_time = time.perf_counter() - job_start
+        job_times.append(job_time)
+        print(f"  Job {i + 1} {status} ({job_time:.2f}s)")
     
-    print(f"All {obj_type} renders complete! Check: {output_dir}")
+    total_time = time.perf_counter() - batch_start
+    print("BATCH SUMMARY")
+    for job, job_time in zip(jobs, job_times):
+        print(f"  {os.path.basename(job['input_tiff'])} {job['variable']} [{job['vmin']:g}, {job['vmax']:g}]: {job_time:.2f}s")
+    print(f"  Scene setup: {setup_time:.2f}s (once)")
+    print(f"  Total: {total_time:.2f}s for {len(jobs)} jobs, {total_time / len(jobs):.2f}s per job amortised")
+
+# ==============================================================================
+# TIME SERIES ANIMATION
+# ==============================================================================
+
+ANIMATION_TIMINGS_FILENAME = "animation_timings.json"
+
+def animation_frames(path):
+    """(tiff path, band) of every frame: all bands of a TIFF (time steps of a dataset), or of the sorted TIFFs of a directory"""
+    if os.path.isdir(path) and not is_dataset(path):
+        paths = sorted(glob.glob(os.path.join(path, "*.tif")) + glob.glob(os.path.join(path, "*.tiff")))
+    else:
+        paths = [path]
+    return [(tiff_path, band) for tiff_path in paths for band in range(tiff_band_count(tiff_path))]
+
+def load_animation_frame(tiff_path, band, target_width):
+    """Downsampled band as bottom-up RGBA float32 pixels, ready for foreach_set"""
+    data = read_tiff_downsampled(tiff_path, texture_downsample_factor(tiff_path, target_width), band)
+    rgba = np.empty(data.shape + (4,), dtype=np.float32)
+    rgba[..., :3] = data[::-1, :, None]
+    rgba[..., 3] = 1.0
+    return rgba
+
+def run_animation():
+    """Render a numbered frame sequence, swapping only the texture pixels between frames"""
+    from concurrent.futures import ThreadPoolExecutor
     
-    # Generate colorbars and overlays
-    if COLORBAR_OVERLAY:
-        print("Generating colorbars and overlays...")
-        generate_scientific_colorbars(
-            output_dir, 
-            DISPLAY_COLOR,  # Changed from DISPLAY_VARIABLE
-            MAP_RANGE['from_min'], 
-            MAP_RANGE['from_max'], 
-            suffix,
-        )
-        create_overlays_for_renders(output_dir, input_filename, suffix, obj_type)
+    start = time.perf_counter()
+    frames = animation_frames(args.input_tiff)
+    if not frames:
+        print(f"No frames found in {args.input_tiff}")
+        return
+    print(f"Animation: {len(frames)} frames")
+    
+    # Both bake or crop the first band only
+    global PREBAKED_COLORS, VIEWPORT_CROPS, TEXTURE_ENCODING
+    if PREBAKED_COLORS or VIEWPORT_CROPS:
+        print("  --prebaked-colors and --viewport-crops are not supported for animations, using the data texture")
+        PREBAKED_COLORS = VIEWPORT_CROPS = False
+    # Frames are uploaded as float pixels
+    TEXTURE_ENCODING = "float32"
+    
+    input_filename = os.path.splitext(os.path.basename(os.path.normpath(args.input_tiff)))[0]
+    target_width = args.texture_width or texture_width_needed(render_resolution(RENDER_OBJECT, args.lowres)[0], RENDER_OBJECT)
+    
+    # The scene, BVH and material stay alive, only the image pixels change
+    material, cameras = build_scene(frames[0][0])
+    bpy.context.scene.render.use_persistent_data = True
+    data_tex = material.node_tree.nodes[DATA_NODE_NAMES["texture"]]
+    image = None
+    
+    timings = []
+    with ThreadPoolExecutor(max_workers=1) as prefetch:
+        pending = prefetch.submit(load_animation_frame, *frames[0], target_width)
+        for frame, (tiff_path, band) in enumerate(frames, start=1):
+            frame_start = time.perf_counter()
+            rgba = pending.result()
+            wait_time = time.perf_counter() - frame_start
+            
+            # Downsample the next frame while this one renders
+            if frame < len(frames):
+                pending = prefetch.submit(load_animation_frame, *frames[frame], target_width)
+            
+            upload_start = time.perf_counter()
+            height, width = rgba.shape[:2]
+            if image is None or tuple(image.size) != (width, height):
+                old_image = data_tex.image
+                image = bpy.data.images.new("animation_frame", width=width, height=height, alpha=False, float_buffer=True, is_data=True)
+                image.colorspace_settings.name = 'Non-Color'
+                data_tex.image = image
+                if old_image is not None and old_image.users == 0:
+                    bpy.data.images.remove(old_image)
+            image.pixels.foreach_set(rgba.ravel())
+            image.update()
+            image["source_path"] = tiff_path
+            upload_time = time.perf_counter() - upload_start
+            
+            render_start = time.perf_counter()
+            render_object_cameras(cameras, input_filename, args.output_dir, RENDER_OBJECT, frame=frame, input_path=tiff_path)
+            render_time = time.perf_counter() - render_start
+            
+            timings.append({
+                "frame": frame,
+                "source": os.path.basename(tiff_path),
+                "band": band,
+                "prefetch_wait_s": wait_time,
+                "upload_s": upload_time,
+                "render_s": render_time,
+                "total_s": time.perf_counter() - frame_start
+            })
+            print(f"FRAME {frame}/{len(frames)} {os.path.basename(tiff_path)}[{band}]: wait {wait_time:.2f}s, "
+                  f"upload {upload_time:.2f}s, render {render_time:.2f}s")
+    
+    total_time = time.perf_counter() - start
+    os.makedirs(args.output_dir, exist_ok=True)
+    write_json_atomic(os.path.join(args.output_dir, ANIMATION_TIMINGS_FILENAME), {"total_s": total_time, "frames": timings})
+    print(f"Animation complete: {len(frames)} frames in {total_time:.2f}s ({total_time / len(frames):.2f}s per frame)")
+
+
+# ==============================================================================
+# RENDER FARM (MULTI-PROCESS)
+# ==============================================================================
+
+FARM_RESULT_PREFIX = "FARM_RESULT "
+FARM_TIMINGS_FILENAME = "render_timings.json"
+
+def job_from_args():
+    """Single job built from the command line arguments"""
+    return {
+        "input_tiff": os.path.abspath(args.input_tiff),
+        "output_dir": args.output_dir,
+        "variable": args.variable,
+        "vmin": args.vmin,
+        "vmax": args.vmax,
+        "locations": list(args.locations)
+    }
+
+def timing_key(location_name):
+    """Key under which render times of a view are remembered"""
+    resolution = "lowres" if args.lowres else "full"
+    mode = "wow" if WOW_MODE else "std"
+    return f"{RENDER_OBJECT}:{location_name}:{resolution}:{mode}:zoom{CAMERA_SETTINGS['zoom_level']:g}"
+
+def load_render_timings(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_render_timings(path, timings):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(timings, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def strip_cli_options(argv, options):
+    """Remove options (with their values) from an argument list"""
+    stripped = []
+    skip = False
+    for arg in argv:
+        if skip:
+            skip = False
+            continue
+        if arg in options:
+            skip = True
+            continue
+        if arg.split("=", 1)[0] in options:
+            continue
+        stripped.append(arg)
+    return stripped
+
+def run_worker():
+    """Render farm worker: render (job, camera) tasks read as JSON lines from stdin"""
+    material = None
+    cameras = None
+    farm_locations = list(args.locations)
+    
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        task = json.loads(line)
+        job = task["job"]
+        location_name = task["location"]
+        start = time.perf_counter()
+        render_start = None
+        
+        try:
+            apply_job_settings(job)
+            if material is None:
+                # Cameras for every location of the farm, not only this job
+                args.locations = farm_locations
+                material, cameras = build_scene(job["input_tiff"])
+            elif not update_climate_material(material, job["input_tiff"]):
+                raise RuntimeError(f"could not load {job['input_tiff']}")
+            
+            # Restrict overlays to this view
+            args.locations = [location_name]
+            input_filename = os.path.splitext(os.path.basename(job["input_tiff"]))[0]
+            render_start = time.perf_counter()
+            rendered = render_object_cameras({location_name: cameras[location_name]},
+                                             input_filename, job["output_dir"], RENDER_OBJECT, input_path=job["input_tiff"])
+            if location_name not in rendered:
+                raise RuntimeError("render failed")
+            result = {"status": "ok", "path": rendered[location_name]}
+        except Exception as e:
+            result = {"status": "failed", "error": str(e)}
+        
+        # Scene setup is reported apart so the first view of a worker does not look slow
+        end = time.perf_counter()
+        render_start = render_start or end
+        result["setup"] = render_start - start
+        result["time"] = end - render_start
+        print(FARM_RESULT_PREFIX + json.dumps(result), flush=True)
+
+def run_farm():
+    """Render farm driver: shard (job, camera) pairs over parallel Blender workers"""
+    import subprocess
+    import threading
+    import queue
+    
+    farm_start = time.perf_counter()
+    if is_job_list(args.input_tiff):
+        jobs = load_job_list(args.input_tiff)
+    else:
+        jobs = [job_from_args()]
+    
+    # One task per (job, camera), output names are identical to the serial path
+    tasks = []
+    all_locations = []
+    for job in jobs:
+        locations = job["locations"] if RENDER_OBJECT == "sphere" else ["TopView"]
+        for location_name in locations:
+            tasks.append({"job": job, "location": location_name, "attempt": 0})
+            if location_name not in all_locations:
+                all_locations.append(location_name)
+    if not tasks:
+        print("Render farm: no views to render")
+        return
+    
+    # Longest first, views without a past timing are scheduled as the slowest
+    timings_path = os.path.join(args.output_dir, FARM_TIMINGS_FILENAME)
+    timings = load_render_timings(timings_path)
+    known = [timings[timing_key(loc)] for loc in all_locations if timing_key(loc) in timings]
+    default_estimate = max(known) if known else 0.0
+    tasks.sort(key=lambda task: timings.get(timing_key(task["location"]), default_estimate), reverse=True)
+    
+    num_workers = min(args.workers, len(tasks))
+    threads = args.threads_per_worker or max(1, (os.cpu_count() or 1) // num_workers)
+    print(f"Render farm: {len(tasks)} views on {num_workers} workers x {threads} threads")
+    
+    worker_argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else sys.argv[1:]
+    worker_argv = strip_cli_options(worker_argv, {"--workers", "--threads-per-worker", "--locations", "--retries"})
+    worker_cmd = [bpy.app.binary_path, "-b", "-P", os.path.abspath(__file__), "--", *worker_argv,
+                  "--worker", "--threads-per-worker", str(threads), "--locations", ",".join(all_locations)]
+    
+    task_queue = queue.Queue()
+    for task in tasks:
+        task_queue.put(task)
+    lock = threading.Lock()
+    state = {"pending": len(tasks)}
+    results = []
+    os.makedirs(args.output_dir, exist_ok=True)
+    
+    def start_worker(worker_id):
+        log = open(os.path.join(args.output_dir, f"farm_worker_{worker_id}.log"), "a")
+        proc = subprocess.Popen(worker_cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                stderr=subprocess.STDOUT, text=True, bufsize=1)
+        return proc, log
+    
+    def read_result(proc, log):
+        for line in proc.stdout:
+            if line.startswith(FARM_RESULT_PREFIX):
+                return json.loads(line[len(FARM_RESULT_PREFIX):])
+            log.write(line)
+        return None
+    
+    def finish(task, result):
+        with lock:
+            if result["status"] == "ok" or task["attempt"] >= args.retries:
+                state["pending"] -= 1
+                results.append((task, result))
+                if result["status"] == "ok":
+                    key = timing_key(task["location"])
+                    old = timings.get(key)
+                    timings[key] = result["time"] if old is None else 0.5 * (old + result["time"])
+                return
+        task["attempt"] += 1
+        print(f"  Retrying {task['location']} ({os.path.basename(task['job']['input_tiff'])}), attempt {task['attempt']}: {result.get('error')}")
+        task_queue.put(task)
+    
+    def worker_loop(worker_id):
+        proc, log = start_worker(worker_id)
+        while True:
+            with lock:
+                if state["pending"] == 0:
+                    break
+            try:
+                task = task_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            
+            message = {"job": task["job"], "location": task["location"]}
+            try:
+                proc.stdin.write(json.dumps(message) + "\n")
+                proc.stdin.flush()
+                result = read_result(proc, log)
+            except OSError:
+                result = None
+            
+            if result is None:
+                # Worker died, restart it and retry the task
+                result = {"status": "failed", "error": f"worker {worker_id} exited", "setup": 0.0, "time": 0.0}
+                proc.kill()
+                proc.wait()
+                log.close()
+                proc, log = start_worker(worker_id)
+            else:
+                print(f"  [worker {worker_id}] {task['location']} ({os.path.basename(task['job']['input_tiff'])}): {result['status']} in {result['time']:.2f}s (setup {result['setup']:.2f}s)")
+            finish(task, result)
+        
+        proc.stdin.close()
+        proc.wait()
+        log.close()
+    
+    worker_threads = [threading.Thread(target=worker_loop, args=(i,)) for i in range(num_workers)]
+    for thread in worker_threads:
+        thread.start()
+    for thread in worker_threads:
+        thread.join()
+    
+    save_render_timings(timings_path, timings)
+    
+    failed = [(task, result) for task, result in results if result["status"] != "ok"]
+    total_time = time.perf_counter() - farm_start
+    busy_time = sum(result["setup"] + result["time"] for _, result in results)
+    print("RENDER FARM SUMMARY")
+    print(f"  {len(results) - len(failed)}/{len(results)} views rendered in {total_time:.2f}s ({busy_time:.2f}s worker time)")
+    for task, result in failed:
+        print(f"  Failed after {task['attempt'] + 1} attempts: {task['location']} ({task['job']['input_tiff']}): {result.get('error')}")
+
+# ==============================================================================
+# RENDER DAEMON
+# ==============================================================================
+
+def serve_job(request, material, cameras):
+    """Render one daemon job on the warm scene, returns the result message"""
+    start = time.perf_counter()
+    job = normalize_job(request, os.getcwd())
+    apply_job_settings(job)
+    if RENDER_OBJECT == "sphere":
+        unknown = [loc for loc in job["locations"] if loc not in cameras]
+        if unknown:
+            raise ValueError(f"Unknown locations: {', '.join(unknown)}")
+        job_cameras = {loc: cameras[loc] for loc in job["locations"]}
+    else:
+        job_cameras = cameras
+    
+    if not update_climate_material(material, job["input_tiff"]):
+        raise RuntimeError(f"could not load {job['input_tiff']}")
+    load_time = time.perf_counter() - start
+    
+    input_filename = os.path.splitext(os.path.basename(job["input_tiff"]))[0]
+    paths = render_object_cameras(job_cameras, input_filename, job["output_dir"], RENDER_OBJECT, input_path=job["input_tiff"])
+    missing = [loc for loc in job_cameras if loc not in paths]
+    
+    total_time = time.perf_counter() - start
+    result = {
+        "status": "failed" if missing else "ok",
+        "paths": paths,
+        "load_s": round(load_time, 3),
+        "render_s": round(total_time - load_time, 3),
+        "total_s": round(total_time, 3)
+    }
+    if missing:
+        result["error"] = f"render failed: {', '.join(missing)}"
+    return result
+
+def claim_socket_path(socket_path):
+    """Remove a stale daemon socket, refuse other files and sockets a daemon still listens on"""
+    import socket
+    import stat
+    
+    try:
+        mode = os.lstat(socket_path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise RuntimeError(f"{socket_path} exists and is not a socket")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(socket_path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            # Left over from a daemon that did not shut down cleanly
+            os.remove(socket_path)
+            return
+    raise RuntimeError(f"A render daemon is already listening on {socket_path}")
+
+def run_server(socket_path):
+    """Render daemon: keep the scene warm and render JSON line jobs received on a Unix socket"""
+    import socket
+    
+    claim_socket_path(socket_path)
+    setup_start = time.perf_counter()
+    job = job_from_args()
+    apply_job_settings(job)
+    # Cameras for every known location, jobs pick theirs
+    args.locations = list({**CONTINENT_POSITIONS, **INTEREST_POSITIONS})
+    material, cameras = build_scene(job["input_tiff"])
+    setup_time = time.perf_counter() - setup_start
+    
+    claim_socket_path(socket_path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen(8)
+    socket_inode = os.stat(socket_path).st_ino
+    print(f"Render daemon listening on {socket_path} (scene setup {setup_time:.2f}s)")
+    
+    jobs_done = 0
+    request_count = 0
+    running = True
+    try:
+        while running:
+            conn, _ = server.accept()
+            try:
+                with conn, conn.makefile("r") as reader, conn.makefile("w") as writer:
+                    for line in reader:
+                        line = line.strip()
+                        if not line:
+                            continue
+                        request_count += 1
+                        try:
+                            request = json.loads(line)
+                            command = request.get("command", "render")
+                            if command == "shutdown":
+                                running = False
+                                result = {"status": "ok"}
+                            elif command == "ping":
+                                result = {"status": "ok", "scene_setup_s": round(setup_time, 3), "jobs": jobs_done}
+                            elif command == "render":
+                                result = serve_job(request, material, cameras)
+                                jobs_done += 1
+                            else:
+                                raise ValueError(f"Unknown command '{command}'")
+                        except Exception as e:
+                            result = {"status": "failed", "error": str(e)}
+                        
+                        print(f"  Request {request_count}: {result['status']} ({result.get('total_s', 0):.2f}s)")
+                        writer.write(json.dumps(result) + "\n")
+                        writer.flush()
+                        if not running:
+                            break
+            except OSError as e:
+                # Client went away, keep serving
+                print(f"  Connection closed: {e}")
+    finally:
+        server.close()
+        # Only remove the socket if it is still ours
+        try:
+            if os.stat(socket_path).st_ino == socket_inode:
+                os.remove(socket_path)
+        except OSError:
+            pass
+        print(f"Render daemon stopped after {jobs_done} jobs")
+
+def run_submit(socket_path):
+    """Daemon client: send the job (or job list) given on the command line and print the results"""
+    import socket
+    
+    jobs = load_job_list(args.input_tiff) if is_job_list(args.input_tiff) else [job_from_args()]
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        with client.makefile("r") as reader, client.makefile("w") as writer:
+            for job in jobs:
+                # The daemon resolves paths against its own working directory
+                job["output_dir"] = os.path.abspath(job["output_dir"])
+                writer.write(json.dumps(job) + "\n")
+                writer.flush()
+                result = json.loads(reader.readline())
+                
+                name = os.path.basename(job["input_tiff"])
+                if result["status"] != "ok":
+                    print(f"{name}: {result['status']} {result.get('error')}")
+                if "total_s" in result:
+                    print(f"{name}: {result['total_s']:.2f}s (load {result['load_s']:.2f}s, render {result['render_s']:.2f}s)")
+                    for location_name, path in result["paths"].items():
+                        print(f"  {location_name}: {path}")
 
 def main():
     print("CLIMATE GLOBE GENERATOR")
     
+    if args.build_luts:
+        build_all_colormap_luts()
+        return
+    
+    if args.recolor is not None:
+        run_recolor()
+        return
+    
+    if args.stats:
+        run_stats()
+        return
+    
+    # Zarr stores are directories, directories of TIFFs are animations
+    single_input = os.path.isfile(args.input_tiff) or (is_dataset(args.input_tiff) and os.path.exists(args.input_tiff))
+    if args.auto_range and single_input and not is_job_list(args.input_tiff):
+        args.vmin, args.vmax = MAP_RANGE["from_min"], MAP_RANGE["from_max"] = auto_range(args.input_tiff, DISPLAY_COLOR)
+        print(f"Auto range: {args.vmin:g} to {args.vmax:g}")
+    
+    if args.preview:
+        run_preview()
+        return
+    
+    if args.flatmap:
+        run_flatmap()
+        return
+    
+    if args.submit:
+        run_submit(args.submit)
+        return
+    
+    if bpy is None:
+        print("ERROR: Blender (bpy) not available, run inside Blender or use --preview/--recolor/--flatmap/--submit")
+        return
+    
+    if args.serve:
+        run_server(args.serve)
+        return
+    
+    if args.worker:
+        run_worker()
+        return
+    
+    if args.benchmark:
+        run_benchmark()
+        return
+    
+    if args.animate:
+        run_animation()
+        return
+    
+    if args.workers > 0:
+        run_farm()
+        return
+    
+    if is_job_list(args.input_tiff):
+        run_batch(args.input_tiff)
+        return
+    
     # 1. Clear scene
     print("1. Clearing scene...")
     clear_scene()
@@ -1248,7 +4598,7 @@ def main():
         # 4. Setup render settings and render
         print("4. Rendering SPHERE...")
         setup_render_settings("sphere", args.lowres)
-        render_object_cameras(cameras, input_filename, args.output_dir, "sphere")
+        render_object_cameras(cameras, input_filename, args.output_dir, "sphere", input_path=geotiff_path)
         bpy.ops.wm.save_as_mainfile(filepath="./blendertest.blend")
         
     elif RENDER_OBJECT == "robinson":
@@ -1268,7 +4618,7 @@ def main():
         # 4. Setup render settings and render
         print("4. Rendering ROBINSON...")
         setup_render_settings("robinson")
-        render_object_cameras(cameras, robinson_filename, args.output_dir, "robinson")
+        render_object_cameras(cameras, robinson_filename, args.output_dir, "robinson", input_path=geotiff_path)
     
     else:
         print(f"ERROR: Invalid RENDER_OBJECT '{RENDER_OBJECT}'. Use 'sphere' or 'robinson'")
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# render_sphere parses its command line at import time
+sys.argv = ["render_sphere.py", "input.tiff", "output", "--no-cache"]
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,101 @@
+import json
+import multiprocessing
+import os
+
+import numpy as np
+import pytest
+import tifffile
+
+import render_sphere as rs
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setitem(rs.CACHE_SETTINGS, "dir", str(tmp_path / "cache"))
+    monkeypatch.setitem(rs.CACHE_SETTINGS, "enabled", True)
+    monkeypatch.setitem(rs.CACHE_SETTINGS, "pyramids", True)
+    monkeypatch.setitem(rs.CACHE_SETTINGS, "pyramid_min_width", 16)
+    return tmp_path / "cache"
+
+
+def write_field(path, width=128, seed=0):
+    data = np.random.default_rng(seed).normal(size=(width // 2, width)).astype(np.float32)
+    tifffile.imwrite(path, data)
+    return str(path), data
+
+
+def read_index(cache_dir):
+    with open(cache_dir / "pyramids" / "index.json") as f:
+        return json.load(f)
+
+
+def test_pyramid_levels_average_the_source(cache_dir, tmp_path):
+    path, data = write_field(tmp_path / "a.tif")
+    assert np.array_equal(rs.pyramid_level(path, 1), data)
+    half = rs.pyramid_level(path, 2)
+    assert half.shape == (32, 64)
+    assert np.allclose(half, data.reshape(32, 2, 64, 2).mean(axis=(1, 3)), atol=1e-6)
+    assert rs.pyramid_level(path, 64).shape[1] == 16
+    
+    index = read_index(cache_dir)
+    assert (index["hits"], index["misses"]) == (2, 1)
+    assert not [name for name in os.listdir(cache_dir / "pyramids") if name.endswith(".tmp")]
+
+
+def test_pyramid_key_follows_content(cache_dir, tmp_path):
+    path, _ = write_field(tmp_path / "a.tif")
+    rs.pyramid_level(path, 1)
+    write_field(tmp_path / "a.tif", seed=1)
+    rs.pyramid_level(path, 1)
+    assert len(read_index(cache_dir)["entries"]) == 2
+
+
+def test_pyramid_rebuilds_incomplete_entry(cache_dir, tmp_path):
+    path, data = write_field(tmp_path / "a.tif")
+    rs.pyramid_level(path, 1)
+    entry_dir = cache_dir / "pyramids" / next(iter(read_index(cache_dir)["entries"]))
+    os.remove(entry_dir / "shapes.json")
+    assert np.array_equal(rs.pyramid_level(path, 1), data)
+    assert read_index(cache_dir)["misses"] == 2
+
+
+def test_float16_levels_fall_back_to_float32_out_of_range(cache_dir, tmp_path, monkeypatch):
+    monkeypatch.setitem(rs.CACHE_SETTINGS, "pyramid_dtype", "float16")
+    path, data = write_field(tmp_path / "a.tif")
+    assert rs.pyramid_level(path, 1).dtype == np.float16
+    data[40, 7] = 101325.0
+    tifffile.imwrite(tmp_path / "b.tif", data)
+    level = rs.pyramid_level(str(tmp_path / "b.tif"), 1)
+    assert level.dtype == np.float32
+    assert np.isfinite(rs.pyramid_level(str(tmp_path / "b.tif"), 2)).all()
+
+
+def test_pyramids_are_opt_in(tmp_path, monkeypatch):
+    monkeypatch.setitem(rs.CACHE_SETTINGS, "dir", str(tmp_path / "cache"))
+    monkeypatch.setitem(rs.CACHE_SETTINGS, "enabled", True)
+    assert rs.args.texture_cache is False
+    path, data = write_field(tmp_path / "a.tif")
+    assert np.array_equal(rs.load_tiff_array(path, 128), data)
+    assert not os.path.exists(tmp_path / "cache" / "pyramids")
+
+
+def build_in_worker(cache, path):
+    rs.CACHE_SETTINGS.update({"dir": cache, "enabled": True, "pyramids": True, "pyramid_min_width": 16})
+    rs.pyramid_level(path, 2)
+
+
+def test_parallel_workers_keep_all_index_entries(cache_dir, tmp_path):
+    paths = [write_field(tmp_path / f"{i}.tif", seed=i)[0] for i in range(6)]
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=build_in_worker, args=(str(cache_dir), path)) for path in paths + paths]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert all(worker.exitcode == 0 for worker in workers)
+    
+    index = read_index(cache_dir)
+    assert len(index["entries"]) == 6
+    assert index["hits"] + index["misses"] == 12
+    for key in index["entries"]:
+        assert os.path.exists(cache_dir / "pyramids" / key / "shapes.json")
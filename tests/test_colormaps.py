@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+import render_sphere as rs
+
+
+@pytest.mark.parametrize("vmin, vmax", [(1.0, 1.0), (0.0, float("nan")), (float("-inf"), 1.0)])
+def test_degenerate_value_range_is_rejected(vmin, vmax):
+    with pytest.raises(ValueError):
+        rs.check_value_range(vmin, vmax)
+
+
+def test_reversed_value_range_is_allowed():
+    rs.check_value_range(10.0, -10.0)
+
+
+def test_recolor_variants_validate_ranges():
+    assert rs.parse_recolor_variants("t2m:-30:30") == [("t2m", -30.0, 30.0)]
+    with pytest.raises(ValueError):
+        rs.parse_recolor_variants("t2m:5:5")
+
+
+def test_apply_job_settings_rejects_equal_range():
+    job = {"input_tiff": "x.tiff", "output_dir": "out", "variable": "t2m", "vmin": 2.0, "vmax": 2.0, "locations": ["Europe"]}
+    with pytest.raises(ValueError):
+        rs.apply_job_settings(job)
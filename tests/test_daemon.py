@@ -0,0 +1,53 @@
+import os
+import socket
+
+import numpy as np
+import pytest
+import tifffile
+
+import render_sphere as rs
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    # Unix socket paths are limited to about 100 characters
+    path = f"/tmp/render_sphere_test_{os.getpid()}.sock"
+    yield path
+    if os.path.lexists(path):
+        os.remove(path)
+
+
+def test_claim_refuses_regular_files(socket_path):
+    with open(socket_path, "w") as f:
+        f.write("keep me")
+    with pytest.raises(RuntimeError, match="not a socket"):
+        rs.claim_socket_path(socket_path)
+    assert open(socket_path).read() == "keep me"
+
+
+def test_claim_refuses_live_daemon(socket_path):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+        server.bind(socket_path)
+        server.listen(1)
+        with pytest.raises(RuntimeError, match="already listening"):
+            rs.claim_socket_path(socket_path)
+        assert os.path.exists(socket_path)
+
+
+def test_claim_removes_stale_socket(socket_path):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+        server.bind(socket_path)
+    rs.claim_socket_path(socket_path)
+    assert not os.path.lexists(socket_path)
+    rs.claim_socket_path(socket_path)
+
+
+def test_input_stamp_changes_when_rewritten_in_place(tmp_path):
+    path = str(tmp_path / "nightly.tif")
+    tifffile.imwrite(path, np.zeros((4, 8), dtype=np.float32))
+    stamp = rs.input_stamp(path)
+    assert rs.input_stamp(path) == stamp
+    tifffile.imwrite(path, np.ones((4, 8), dtype=np.float32))
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert rs.input_stamp(path) != stamp
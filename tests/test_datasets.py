@@ -0,0 +1,137 @@
+import types
+
+import numpy as np
+import pytest
+
+import render_sphere as rs
+
+xr = pytest.importorskip("xarray")
+pytest.importorskip("netCDF4")
+
+
+@pytest.fixture(autouse=True)
+def fresh_handles(monkeypatch):
+    monkeypatch.setattr(rs, "DATASET_HANDLES", {})
+    monkeypatch.setattr(rs, "DATASET_FIELDS", {})
+    monkeypatch.setitem(rs.DATASET_SETTINGS, "variable", None)
+    yield
+    for ds in rs.DATASET_HANDLES.values():
+        ds.close()
+
+
+def write_dataset(path):
+    """South-up -180..180 grid with two variables and three time steps"""
+    lat = np.linspace(-89.5, 89.5, 18)
+    lon = np.linspace(-175, 175, 36)
+    time = np.arange(3)
+    t = np.arange(3 * 18 * 36, dtype=np.float32).reshape(3, 18, 36)
+    ds = xr.Dataset({"t": (("time", "lat", "lon"), t), "p": (("time", "lat", "lon"), -t)},
+                    coords={"time": time, "lat": lat, "lon": lon})
+    ds.to_netcdf(path)
+    return str(path), t
+
+
+def read_field(path, band=0):
+    height, width = rs.tiff_shape(path)
+    data = np.empty((height, width), dtype=np.float32)
+    for row, col, block in rs.iter_dataset_chunks(path, band):
+        data[row:row + block.shape[0], col:col + block.shape[1]] = block
+    return data
+
+
+def texture_order(t):
+    """North-up, rolled from -180 to the texture west edge"""
+    west = rs.texture_west_longitude()
+    return np.roll(t[::-1], -int(round((west + 180) / 10)) % 36, axis=1)
+
+
+def test_variable_follows_the_job(tmp_path, monkeypatch):
+    path, t = write_dataset(tmp_path / "a.nc")
+    monkeypatch.setattr(rs, "DISPLAY_COLOR", "t")
+    assert np.array_equal(read_field(path), texture_order(t[0]))
+    t_hash = rs.file_content_hash(path)
+    
+    monkeypatch.setattr(rs, "DISPLAY_COLOR", "p")
+    assert np.array_equal(read_field(path), texture_order(-t[0]))
+    assert rs.file_content_hash(path) != t_hash
+    assert len(rs.DATASET_HANDLES) == 1
+
+
+def test_hash_and_chunks_follow_the_band(tmp_path, monkeypatch):
+    path, t = write_dataset(tmp_path / "a.nc")
+    monkeypatch.setattr(rs, "DISPLAY_COLOR", "t")
+    assert np.array_equal(read_field(path, 2), texture_order(t[2]))
+    assert rs.file_content_hash(path, band=2) != rs.file_content_hash(path, band=0)
+    assert rs.tiff_band_count(path) == 3
+
+
+def test_least_recently_used_dataset_is_closed(tmp_path, monkeypatch):
+    monkeypatch.setattr(rs, "DISPLAY_COLOR", "t")
+    monkeypatch.setitem(rs.DATASET_SETTINGS, "max_open", 1)
+    first, _ = write_dataset(tmp_path / "a.nc")
+    second, _ = write_dataset(tmp_path / "b.nc")
+    closed = []
+    monkeypatch.setattr(xr.Dataset, "close", lambda ds: closed.append(ds))
+    ds = rs.open_dataset(first)
+    rs.dataset_field(first)
+    rs.dataset_field(second)
+    assert len(closed) == 1 and closed[0] is ds
+    assert list(rs.DATASET_HANDLES) == [str(tmp_path / "b.nc")]
+    assert all(key[0] != str(tmp_path / "a.nc") for key in rs.DATASET_FIELDS)
+
+
+class FakeImage(dict):
+    users = 1
+    
+    def __init__(self, data):
+        super().__init__()
+        self.data = data
+        self.colorspace_settings = types.SimpleNamespace(name=None)
+    
+    def __bool__(self):
+        return True
+
+
+class FakeNodes(dict):
+    def get(self, name):
+        return dict.get(self, name)
+
+
+def fake_material():
+    socket = lambda: types.SimpleNamespace(default_value=None)
+    nodes = FakeNodes({
+        rs.DATA_NODE_NAMES["texture"]: types.SimpleNamespace(image=None),
+        rs.DATA_NODE_NAMES["map_range"]: types.SimpleNamespace(inputs={name: socket() for name in ("From Min", "From Max", "To Min", "To Max")}),
+        rs.DATA_NODE_NAMES["color_ramp"]: types.SimpleNamespace(label=None),
+    })
+    return types.SimpleNamespace(node_tree=types.SimpleNamespace(nodes=nodes))
+
+
+def test_jobs_on_one_dataset_swap_the_texture(tmp_path, monkeypatch):
+    path = tmp_path / "era.nc"
+    lat = np.linspace(89.5, -89.5, 18)
+    lon = np.linspace(5, 355, 36)
+    t2m = np.full((18, 36), 280.0, dtype=np.float32)
+    xr.Dataset({"t2m": (("lat", "lon"), t2m), "tp": (("lat", "lon"), t2m * 0 + 3.0)},
+               coords={"lat": lat, "lon": lon}).to_netcdf(path)
+    
+    loads = []
+    def ingest(geotiff_path):
+        loads.append(geotiff_path)
+        return FakeImage(read_field(geotiff_path))
+    monkeypatch.setattr(rs, "ingest_data_image", ingest)
+    monkeypatch.setattr(rs, "setup_color_ramp", lambda node, name: None)
+    monkeypatch.setattr(rs, "MAP_RANGE", dict(rs.MAP_RANGE))
+    
+    material = fake_material()
+    data_tex = material.node_tree.nodes[rs.DATA_NODE_NAMES["texture"]]
+    jobs = [{"input_tiff": str(path), "variable": name, "vmin": 0.0, "vmax": 300.0, "locations": ["Europe"]}
+            for name in ("t2m", "tp", "tp")]
+    seen = []
+    for job in jobs:
+        rs.apply_job_settings(job)
+        assert rs.update_climate_material(material, job["input_tiff"])
+        seen.append(float(data_tex.image.data.mean()))
+    assert seen == [280.0, 3.0, 3.0]
+    # The third job reuses the texture of the second
+    assert len(loads) == 2
@@ -0,0 +1,68 @@
+import json
+
+import numpy as np
+import pytest
+import tifffile
+
+import render_sphere as rs
+
+
+@pytest.fixture
+def operands(tmp_path):
+    rng = np.random.default_rng(0)
+    a = rng.normal(280, 10, (64, 128)).astype(np.float32)
+    b = rng.normal(275, 10, (64, 128)).astype(np.float32)
+    b[5, :10] = 0.0
+    # Different layouts: strips and tiles
+    tifffile.imwrite(tmp_path / "a.tif", a, rowsperstrip=5)
+    tifffile.imwrite(tmp_path / "b.tif", b, tile=(16, 16), compression="zlib")
+    return a, b
+
+
+def write_expression(tmp_path, expression, name="field.expr"):
+    path = tmp_path / name
+    path.write_text(json.dumps({"expression": expression, "operands": {"a": "a.tif", "b": "b.tif"}}))
+    return str(path)
+
+
+def read_field(path):
+    height, width = rs.tiff_shape(path)
+    data = np.empty((height, width), dtype=np.float32)
+    for row, col, block in rs.iter_tiff_chunks(path):
+        data[row:row + block.shape[0], col:col + block.shape[1]] = block
+    return data
+
+
+@pytest.mark.parametrize("expression", ["__import__('os')", "a.real", "a[0]", "'text'", "c + a", "lambda: a", "a if b else a"])
+def test_rejects_unsupported_syntax(expression):
+    with pytest.raises(ValueError):
+        rs.compile_expression(expression, {"a": None, "b": None})
+
+
+def test_anomaly_matches_numpy_across_layouts(tmp_path, operands):
+    a, b = operands
+    path = write_expression(tmp_path, "(a - b) / b * 100")
+    assert rs.tiff_shape(path) == (64, 128)
+    result = read_field(path)
+    with np.errstate(all="ignore"):
+        expected = (a - b) / b * 100
+    expected[~np.isfinite(expected)] = np.nan
+    assert np.array_equal(result, expected, equal_nan=True)
+    # Division by zero became NaN
+    assert np.isnan(result[5, :10]).all()
+
+
+def test_functions_and_constants_broadcast():
+    code, _ = rs.compile_expression("mean(a, b) - 273.15", {"a": None, "b": None})
+    values = {"a": np.full((2, 3), 280.0, dtype=np.float32), "b": np.full((2, 3), 290.0, dtype=np.float32)}
+    assert np.allclose(rs.evaluate_expression(code, values), 11.85)
+    code, _ = rs.compile_expression("1.5", {"a": None})
+    assert rs.evaluate_expression(code, {"a": np.zeros((2, 2), dtype=np.float32)}).shape == (2, 2)
+
+
+def test_hash_follows_expression_and_operands(tmp_path, operands):
+    first = rs.file_content_hash(write_expression(tmp_path, "a - b"))
+    assert rs.file_content_hash(write_expression(tmp_path, "(a)  -  b", "same.expr")) == first
+    assert rs.file_content_hash(write_expression(tmp_path, "b - a", "other.expr")) != first
+    tifffile.imwrite(tmp_path / "a.tif", operands[0] + 1)
+    assert rs.file_content_hash(write_expression(tmp_path, "a - b")) != first
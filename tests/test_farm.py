@@ -0,0 +1,14 @@
+import json
+
+import render_sphere as rs
+
+
+def test_farm_without_views_returns(tmp_path, monkeypatch, capsys):
+    job_path = tmp_path / "jobs.json"
+    job_path.write_text(json.dumps({"jobs": []}))
+    monkeypatch.setattr(rs.args, "input_tiff", str(job_path))
+    monkeypatch.setattr(rs.args, "output_dir", str(tmp_path / "out"))
+    monkeypatch.setattr(rs.args, "workers", 4)
+    monkeypatch.setattr(rs.args, "threads_per_worker", None)
+    rs.run_farm()
+    assert "no views to render" in capsys.readouterr().out
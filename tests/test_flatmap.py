@@ -0,0 +1,65 @@
+import math
+
+import numpy as np
+import pytest
+
+import render_sphere as rs
+
+
+def blob_grid(lat, lon, height=180, width=360):
+    """Equirectangular texture (west edge as the sphere expects) with a 3 x 3 cell blob at lat/lon"""
+    data = np.zeros((height, width), dtype=np.float32)
+    row = int((90.0 - lat) / 180.0 * height)
+    col = int(((lon - rs.texture_west_longitude()) % 360.0) / 360.0 * width)
+    data[row - 1:row + 2, col - 1:col + 2] = 1.0
+    return data
+
+
+@pytest.mark.parametrize("projection", ["robinson", "mollweide", "equalearth"])
+def test_projection_round_trip(projection):
+    lat = np.radians(np.linspace(-80, 80, 17))[:, None]
+    lon = np.radians(np.linspace(-170, 170, 35))[None, :]
+    x, y = rs.project_forward(projection, lat, lon)
+    lat_back, lon_back, valid = rs.project_inverse(projection, x, y)
+    assert valid.all()
+    np.testing.assert_allclose(lat_back, np.broadcast_to(lat, lat_back.shape), atol=1e-6)
+    np.testing.assert_allclose(lon_back, np.broadcast_to(lon, lon_back.shape), atol=1e-6)
+
+
+@pytest.mark.parametrize("projection", ["robinson", "mollweide", "equalearth"])
+def test_world_map_places_blob(projection):
+    lat, lon = 50.0, 10.0
+    shape = rs.flatmap_shape(projection, 720)
+    index, weight = rs.compute_reprojection_maps(projection, (180, 360), shape, "nearest")
+    image = rs.apply_reprojection(blob_grid(lat, lon), index, weight)
+    row, col = np.unravel_index(np.nanargmax(image), image.shape)
+    
+    x, y = rs.project_forward(projection, np.radians(lat), np.radians(lon))
+    x_max, y_max = rs.projection_extent(projection)
+    expected_col = (x / x_max + 1) / 2 * shape[1]
+    expected_row = (1 - y / y_max) / 2 * shape[0]
+    assert abs(col - expected_col) < 4
+    assert abs(row - expected_row) < 4
+
+
+def test_orthographic_centers_location():
+    lat, lon = rs.CONTINENT_POSITIONS["Europe"]
+    index, weight = rs.compute_reprojection_maps("orthographic", (180, 360), (200, 200), "bilinear", center=(lat, lon))
+    image = rs.apply_reprojection(blob_grid(lat, lon), index, weight)
+    row, col = np.unravel_index(np.nanargmax(image), image.shape)
+    assert abs(row - 100) < 5 and abs(col - 100) < 5
+
+
+def test_preview_sees_same_texel_as_flatmap():
+    """The sphere texture lookup of a camera direction hits the blob the flat map places there"""
+    lat, lon = 50.0, 10.0
+    data = blob_grid(lat, lon)
+    u, v = rs.sphere_texture_uv(np.array(rs.camera_location(lat, lon, 1.0)))
+    assert rs.sample_equirectangular(data, np.array([u]), np.array([v]))[0] == 1.0
+
+
+def test_reprojection_outside_globe_is_nan():
+    index, weight = rs.compute_reprojection_maps("mollweide", (90, 180), (50, 100), "bilinear")
+    image = rs.apply_reprojection(np.ones((90, 180), dtype=np.float32), index, weight)
+    assert math.isnan(image[0, 0])
+    assert image[25, 50] == pytest.approx(1.0)
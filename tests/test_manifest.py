@@ -0,0 +1,46 @@
+import multiprocessing
+
+import render_sphere as rs
+
+
+def record_in_worker(output_dir, worker):
+    for view in range(20):
+        rs.record_build_outputs(output_dir, {f"w{worker}_v{view}.png": f"key{view}"}, {f"stamp{worker}": "hash"})
+
+
+def test_record_build_outputs_merges(tmp_path):
+    rs.record_build_outputs(str(tmp_path), {"a.png": "1"}, {"s": "h"})
+    rs.record_build_outputs(str(tmp_path), {"b.png": "2", "a.png": "3"}, {})
+    manifest = rs.load_build_manifest(str(tmp_path))
+    assert manifest == {"outputs": {"a.png": "3", "b.png": "2"}, "hashes": {"s": "h"}}
+
+
+def test_overlay_key_follows_layout_not_worker_options(monkeypatch):
+    key = rs.overlay_build_key("view", "t2m_2002")
+    assert rs.overlay_build_key("view", "t2m_2003") != key
+    assert rs.overlay_build_key("other view", "t2m_2002") != key
+    monkeypatch.setitem(rs.OVERLAY_SETTINGS, "postprocess_workers", 7)
+    monkeypatch.setitem(rs.OVERLAY_SETTINGS, "overlay_only", True)
+    assert rs.overlay_build_key("view", "t2m_2002") == key
+    monkeypatch.setitem(rs.OVERLAY_SETTINGS, "position", "bottom_left")
+    assert rs.overlay_build_key("view", "t2m_2002") != key
+
+
+def test_up_to_date_needs_key_and_file(tmp_path):
+    manifest = {"outputs": {"a.png": "k"}, "hashes": {}}
+    assert not rs.is_up_to_date(manifest, str(tmp_path), "a.png", "k")
+    (tmp_path / "a.png").write_bytes(b"png")
+    assert rs.is_up_to_date(manifest, str(tmp_path), "a.png", "k")
+    assert not rs.is_up_to_date(manifest, str(tmp_path), "a.png", "changed")
+
+
+def test_parallel_workers_keep_all_outputs(tmp_path):
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=record_in_worker, args=(str(tmp_path), i)) for i in range(6)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    manifest = rs.load_build_manifest(str(tmp_path))
+    assert len(manifest["outputs"]) == 120
+    assert len(manifest["hashes"]) == 6
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+import render_sphere as rs
+
+pytest.importorskip("scipy")
+
+
+def gaussian_points(count=20000, seed=0):
+    """Random points with a blob of value 1 around 50N 10E"""
+    rng = np.random.default_rng(seed)
+    lat = np.degrees(np.arcsin(rng.uniform(-1, 1, count)))
+    lon = rng.uniform(-180, 180, count)
+    center = rs.unit_vectors(50.0, 10.0)
+    values = (rs.unit_vectors(lat, lon) @ center > np.cos(np.radians(5))).astype(np.float32)
+    return lat, lon, values
+
+
+@pytest.mark.parametrize("method", ["nearest", "idw"])
+def test_regridded_blob_matches_sphere_lookup(monkeypatch, method):
+    monkeypatch.setitem(rs.POINT_SETTINGS, "method", method)
+    lat, lon, values = gaussian_points()
+    index, weight = rs.compute_point_weights(lat, lon, (90, 180))
+    data = rs.apply_reprojection(values, index, weight)
+    
+    # The texel the sphere samples for a camera over the blob holds the blob
+    u, v = rs.sphere_texture_uv(np.array(rs.camera_location(50.0, 10.0, 1.0)))
+    assert rs.sample_equirectangular(data, np.array([u]), np.array([v]))[0] > 0.9
+    # and the opposite side of the globe does not
+    u, v = rs.sphere_texture_uv(np.array(rs.camera_location(-50.0, -170.0, 1.0)))
+    assert rs.sample_equirectangular(data, np.array([u]), np.array([v]))[0] < 0.1
+
+
+def test_idw_weights_are_normalised(monkeypatch):
+    monkeypatch.setitem(rs.POINT_SETTINGS, "method", "idw")
+    lat, lon, _ = gaussian_points(2000)
+    _, weight = rs.compute_point_weights(lat, lon, (16, 32))
+    np.testing.assert_allclose(weight.sum(axis=-1), 1.0, rtol=1e-5)
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+from PIL import Image
+
+import render_sphere as rs
+
+
+def write_data_pass(path, **extra):
+    value = np.array([[-30.0, 0.0], [30.0, np.nan]], dtype=np.float32)
+    fields = dict(
+        value=value,
+        light=np.full((2, 2, 3), 0.5, dtype=np.float16),
+        gloss=np.zeros((2, 2, 3), dtype=np.float16),
+        alpha=np.ones((2, 2), dtype=np.float16),
+        emission=np.float32(0.0),
+        input_filename=np.array("t2m"),
+        location=np.array("Europe"),
+        suffix=np.array("_zoom00"),
+    )
+    fields.update(extra)
+    np.savez_compressed(path, **fields)
+    return str(path)
+
+
+def test_recolor_applies_lut_lighting_and_srgb(tmp_path):
+    path = write_data_pass(tmp_path / "a_datapass.npz", view_transform=np.array("Standard"))
+    lut = rs.build_colormap_lut("t2m", 256)
+    written = rs.recolor_data_pass(path, str(tmp_path), [("t2m", -30.0, 30.0)], {"t2m": lut})
+    rgba = np.asarray(Image.open(written[0]))
+    expected = np.rint(rs.linear_to_srgb(lut[-1, :3] * 0.5) * 255)
+    assert np.abs(rgba[1, 0, :3].astype(int) - expected).max() <= 1
+    assert (rgba[..., 3] == 255).all()
+
+
+@pytest.mark.parametrize("extra", [{"view_transform": np.array("AgX")}, {}])
+def test_recolor_refuses_other_view_transforms(tmp_path, extra):
+    path = write_data_pass(tmp_path / "a_datapass.npz", **extra)
+    with pytest.raises(ValueError, match="view transform"):
+        rs.recolor_data_pass(path, str(tmp_path), [("t2m", -30.0, 30.0)], {"t2m": rs.build_colormap_lut("t2m", 256)})
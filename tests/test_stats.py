@@ -0,0 +1,93 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+import tifffile
+
+import render_sphere as rs
+
+
+def write_field(path, data):
+    tifffile.imwrite(path, np.asarray(data, dtype=np.float32))
+    return str(path)
+
+
+def latitude_field(height=180, width=360):
+    lat = 90 - (np.arange(height) + 0.5) * 180 / height
+    return np.repeat(lat[:, None], width, axis=1)
+
+
+def test_weighted_percentiles_follow_the_area(tmp_path):
+    stats = rs.data_stats(write_field(tmp_path / "lat.tif", latitude_field()))["global"]
+    assert stats["mean"] == pytest.approx(0.0, abs=1e-6)
+    # Area below latitude x is (1 + sin x) / 2
+    assert rs.sketch_percentile(stats, 98) == pytest.approx(np.degrees(np.arcsin(0.96)), abs=0.5)
+    assert rs.sketch_percentile(stats, 0) == stats["min"]
+    assert rs.sketch_percentile(stats, 100) == stats["max"]
+
+
+def test_sketch_merge_matches_single_pass():
+    rng = np.random.default_rng(0)
+    values = rng.normal(size=100000)
+    weights = rng.uniform(0.1, 1.0, values.size)
+    whole = rs.compress_sketch(values, weights, 512)
+    halves = [rs.compress_sketch(values[part], weights[part], 512) for part in (slice(0, 50000), slice(50000, None))]
+    merged = rs.compress_sketch(np.concatenate([h[0] for h in halves]), np.concatenate([h[1] for h in halves]), 512)
+    for sketch in (whole, merged):
+        summary = {"min": values.min(), "max": values.max(), "sketch": [sketch[0], sketch[1]]}
+        assert rs.sketch_percentile(summary, 50) == pytest.approx(0.0, abs=0.02)
+
+
+def test_auto_range_symmetric_for_differences(tmp_path):
+    low, high = rs.auto_range(write_field(tmp_path / "lat.tif", latitude_field()), "t2m_dif")
+    assert low == -high
+    assert high >= 73.7
+
+
+def test_auto_range_keeps_narrow_ranges_apart(tmp_path):
+    data = 1013.2 + latitude_field() / 90 * 0.3 + 0.3
+    low, high = rs.auto_range(write_field(tmp_path / "p.tif", data), "viridis")
+    assert low < high
+    assert low <= 1013.3 and high >= 1013.7
+
+
+def test_auto_range_mostly_constant_falls_back_to_min_max(tmp_path):
+    data = np.zeros((90, 180))
+    data[45, 90] = 1.0
+    low, high = rs.auto_range(write_field(tmp_path / "c.tif", data), "t2m_dif")
+    assert (low, high) == (-1.0, 1.0)
+    assert str(low) != "-0.0"
+
+
+def test_auto_range_constant_field_raises(tmp_path):
+    with pytest.raises(ValueError, match="constant"):
+        rs.auto_range(write_field(tmp_path / "k.tif", np.full((90, 180), 5.0)), "viridis")
+
+
+def test_round_range_rounds_outwards():
+    assert rs.round_range(1013.23, 1013.78) == (1013.23, 1013.78)
+    assert rs.round_range(1013.2345, 1013.7812) == (1013.234, 1013.782)
+    assert rs.round_range(-73.74, 73.74) == (-74.0, 74.0)
+    low, _ = rs.round_range(-0.0, 2.0)
+    assert str(low) == "0.0"
+
+
+@pytest.mark.parametrize("text, expected", [("2,98", (2.0, 98.0)), ("0,100", (0.0, 100.0)), (" 5, 95", (5.0, 95.0))])
+def test_percentiles_parse(text, expected):
+    assert rs.parse_percentiles(text) == expected
+
+
+@pytest.mark.parametrize("text", ["98,2", "5", "a,b", "-1,50", "50,101", "1,2,3"])
+def test_bad_percentiles_are_rejected(text):
+    with pytest.raises(ValueError, match="--auto-range"):
+        rs.parse_percentiles(text)
+
+
+def test_bad_percentiles_are_a_usage_error(tmp_path):
+    script = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "render_sphere.py")
+    result = subprocess.run([sys.executable, script, "in.tif", str(tmp_path), "--auto-range", "98,2"],
+                            capture_output=True, text=True)
+    assert result.returncode == 2
+    assert "--auto-range percentiles" in result.stderr
@@ -0,0 +1,72 @@
+import os
+
+import numpy as np
+import pytest
+import tifffile
+
+import render_sphere as rs
+
+
+def test_crops_without_cache_read_the_input_once(tmp_path, monkeypatch):
+    path = str(tmp_path / "crop.tif")
+    tifffile.imwrite(path, np.arange(64 * 128, dtype=np.float32).reshape(64, 128))
+    reads = []
+    load = rs.load_tiff_array
+    monkeypatch.setattr(rs, "load_tiff_array", lambda *a: reads.append(a) or load(*a))
+    monkeypatch.setattr(rs, "CROP_SOURCE", {})
+    
+    full = load(path, 128)
+    for window in [(0.0, 0.25, 0.5, 1.0), (0.9, 1.1, 0.0, 0.5)]:
+        data, (u0, u1, v0, v1) = rs.read_texture_window(path, window, 128)
+        cols = np.arange(round(u0 * 128), round(u1 * 128)) % 128
+        assert np.array_equal(data, full[round((1 - v1) * 64):round((1 - v0) * 64)][:, cols])
+    assert len(reads) == 1
+
+
+def test_uint16_encoding_round_trip():
+    data = np.linspace(-30, 30, 1000, dtype=np.float32).reshape(10, 100)
+    data[0, :5] = np.nan
+    encoded, scale, offset, max_error = rs.encode_texture(data, "uint16")
+    assert encoded.dtype == np.uint16
+    assert (encoded[0, :5] == rs.UINT16_NAN_CODE).all()
+    decoded = encoded / 65535 * scale + offset
+    finite = np.isfinite(data)
+    step = 60 / 65534
+    assert np.abs(decoded[finite] - data[finite]).max() <= step / 2 + 1e-6
+    assert max_error <= step / 2 + 1e-6
+
+
+def test_float16_encoding_round_trip():
+    data = np.array([[-30.25, 0.0, 15.5, np.nan]], dtype=np.float32)
+    encoded, scale, offset, max_error = rs.encode_texture(data, "float16")
+    assert (scale, offset, max_error) == (1.0, 0.0, 0.0)
+    assert np.array_equal(encoded.astype(np.float32), data, equal_nan=True)
+
+
+def test_encoding_rejects_unrepresentable_textures():
+    with pytest.raises(ValueError, match="no valid values"):
+        rs.encode_texture(np.full((2, 2), np.nan), "uint16")
+    with pytest.raises(ValueError, match="float16 range"):
+        rs.encode_texture(np.array([[1e6]]), "float16")
+
+
+def test_lut_maps_range_ends_and_clamps():
+    lut = rs.build_colormap_lut("t2m", 256)
+    colors = rs.apply_colormap_lut(np.array([-30.0, 30.0, -100.0, 100.0, np.nan]), lut, -30.0, 30.0)
+    assert np.array_equal(colors[0], lut[0])
+    assert np.array_equal(colors[1], lut[-1])
+    assert np.array_equal(colors[2], lut[0])
+    assert np.array_equal(colors[3], lut[-1])
+    # Missing values take the low end, like the MapRange node
+    assert np.array_equal(colors[4], lut[0])
+
+
+def test_lut_disk_cache_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setitem(rs.CACHE_SETTINGS, "dir", str(tmp_path))
+    monkeypatch.setitem(rs.CACHE_SETTINGS, "enabled", True)
+    monkeypatch.setattr(rs, "COLORMAP_LUTS", {})
+    built = rs.build_colormap_lut("t2m_dif", 512)
+    assert os.path.exists(rs.colormap_lut_path("t2m_dif", 512))
+    monkeypatch.setattr(rs, "COLORMAP_LUTS", {})
+    assert np.array_equal(rs.build_colormap_lut("t2m_dif", 512), built)
+    assert built.shape == (512, 4) and built.dtype == np.float32